@@ -0,0 +1,118 @@
+"""
+Benchmark: NumPy analytics engine vs the per-endpoint ORM queries
+
+Builds a throwaway SQLite database, loads N synthetic transactions for one
+user and times the chart computations both ways.
+
+    python benchmarks/analytics_vs_orm.py --sizes 10000 100000 1000000
+"""
+from __future__ import annotations
+
+import argparse
+import os
+import random
+import tempfile
+import time
+from datetime import date, datetime, timedelta
+from decimal import Decimal
+
+from harness import setup_django, timed
+
+
+def populate(size: int, seed: int = 42):
+    from django.contrib.auth.models import User
+    from django.utils import timezone
+    from finwise_app.models import Account, Category, Transaction
+    from finwise_app.services.categorization_service import create_default_categories
+
+    rnd = random.Random(seed)
+    user = User.objects.create_user(f'bench_{size}', password='bench-password')
+    create_default_categories()
+    category_ids = list(Category.objects.values_list('id', flat=True)) + [None]
+    accounts = [
+        Account.objects.create(user=user, type='BANK', account_id=f'{size}-{i}', name=f'Account {i}')
+        for i in range(3)
+    ]
+    now = timezone.now()
+    batch = []
+    for i in range(size):
+        batch.append(Transaction(
+            account=accounts[i % len(accounts)],
+            fitid=f'{size}-{i}',
+            posted_date=now - timedelta(minutes=rnd.randint(0, 60 * 24 * 730)),
+            amount=Decimal(rnd.randint(-25000, 9000)) / 100,
+            category_id=rnd.choice(category_ids),
+            is_categorized=True,
+        ))
+        if len(batch) == 5000:
+            Transaction.objects.bulk_create(batch)
+            batch = []
+    if batch:
+        Transaction.objects.bulk_create(batch)
+    return user
+
+
+def orm_path(user):
+    """The chart queries as the API views issued them before the analytics engine"""
+    from django.db.models import Sum
+    from django.db.models.functions import TruncDate
+    from django.utils import timezone
+    from finwise_app.models import Account, Budget, Transaction
+
+    cutoff = timezone.now() - timedelta(days=30)
+    list(Transaction.objects.filter(
+        account__user=user, posted_date__gte=cutoff, amount__lt=0, category__isnull=False
+    ).values('category__name', 'category__color').annotate(total=Sum('amount')).order_by('total'))
+
+    list(Transaction.objects.filter(
+        account__user=user, posted_date__gte=cutoff, amount__lt=0
+    ).annotate(day=TruncDate('posted_date')).values('day').annotate(total=Sum('amount')).order_by('day'))
+
+    current = (date.today() - timedelta(days=180)).replace(day=1)
+    while current <= date.today():
+        nxt = date(current.year + (current.month == 12), current.month % 12 + 1, 1)
+        start = timezone.make_aware(datetime.combine(current, datetime.min.time()))
+        end = timezone.make_aware(datetime.combine(nxt, datetime.min.time()))
+        base = Transaction.objects.filter(account__user=user, posted_date__gte=start, posted_date__lt=end)
+        base.filter(amount__gt=0).aggregate(total=Sum('amount'))
+        base.filter(amount__lt=0).aggregate(total=Sum('amount'))
+        current = nxt
+
+    for account in Account.objects.filter(user=user):
+        account.transactions.aggregate(total=Sum('amount'))
+
+    for budget in Budget.objects.filter(user=user, month=date.today().replace(day=1)):
+        budget.get_spent_amount()
+
+
+def frame_path(user):
+    from finwise_app.services.dashboard_service import build_dashboard_data
+    build_dashboard_data(user)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--sizes', type=int, nargs='+', default=[10_000, 100_000, 1_000_000])
+    parser.add_argument('--repeat', type=int, default=3)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        setup_django(os.path.join(tmp, 'bench.sqlite3'))
+        from finwise_app.services import analytics
+
+        print(f"{'rows':>10} {'orm':>10} {'frame cold':>12} {'frame warm':>12} {'speedup':>9}")
+        for size in args.sizes:
+            user = populate(size)
+            orm = timed(orm_path, user, repeat=args.repeat)
+
+            analytics.clear_frames()
+            start = time.perf_counter()
+            frame_path(user)
+            cold = time.perf_counter() - start
+
+            warm = timed(frame_path, user, repeat=args.repeat)
+            print(f'{size:>10} {orm:>9.3f}s {cold:>11.3f}s {warm:>11.3f}s {orm / warm:>8.1f}x')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,181 @@
+"""
+Benchmark: async chart API views vs the same payloads as sync views under ASGI
+
+Drives Django's ASGI application in-process (the same handler uvicorn
+calls, so each request gets its own thread-sensitive context) with N
+concurrent requests per level, and compares the async ``/api/*`` views with
+sync views serving the same payloads. Reports throughput, p50/p95 and the
+peak number of threads alive, which is what the sync views cost under ASGI.
+
+    python benchmarks/async_api.py --rows 20000 --concurrency 1 8 32 --requests 400
+
+For numbers from a real server run benchmarks/loadtest.py against uvicorn.
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+import os
+import statistics
+import sys
+import tempfile
+import threading
+import time
+import types
+
+from harness import setup_django
+
+ENDPOINTS = [
+    ('budgets', '/api/budgets/'),
+    ('spending_by_category', '/api/spending-by-category/'),
+    ('spending_trend', '/api/spending-trend/'),
+    ('income_vs_expenses', '/api/income-vs-expenses/'),
+    ('account_balance', '/api/account-balance/'),
+    ('dashboard', '/api/dashboard/'),
+]
+
+
+def install_sync_urls() -> None:
+    """Serve the sync payload functions under /sync/... next to the app's URLs"""
+    from django.conf import settings
+    from django.contrib.auth.decorators import login_required
+    from django.http import JsonResponse
+    from django.urls import include, path
+    from finwise_app.services import dashboard_service as ds
+
+    payloads = {
+        'budgets': lambda user: ds.budgets_payload(user),
+        'spending_by_category': lambda user: ds.spending_by_category_payload(user, 30),
+        'spending_trend': lambda user: ds.spending_trend_payload(user, 30),
+        'income_vs_expenses': lambda user: ds.income_vs_expenses_payload(user, 6),
+        'account_balance': lambda user: ds.account_balance_payload(user),
+        'dashboard': lambda user: ds.build_dashboard_data(user),
+    }
+
+    @login_required
+    def sync_view(request, name):
+        return JsonResponse(payloads[name](request.user))
+
+    module = types.ModuleType('bench_async_urls')
+    module.urlpatterns = [
+        path('sync/<str:name>/', sync_view),
+        path('', include('finwise_app.urls')),
+    ]
+    sys.modules[module.__name__] = module
+    settings.ROOT_URLCONF = module.__name__
+
+
+async def asgi_get(app, path: str, cookie: str) -> tuple[int, float]:
+    """One GET through the ASGI app; returns (status, seconds)"""
+    done = asyncio.Event()
+    status = 0
+    sent_request = False
+
+    async def receive():
+        nonlocal sent_request
+        if not sent_request:
+            sent_request = True
+            return {'type': 'http.request', 'body': b'', 'more_body': False}
+        await done.wait()
+        return {'type': 'http.disconnect'}
+
+    async def send(message):
+        nonlocal status
+        if message['type'] == 'http.response.start':
+            status = message['status']
+        elif message['type'] == 'http.response.body' and not message.get('more_body'):
+            done.set()
+
+    scope = {
+        'type': 'http', 'asgi': {'version': '3.0'}, 'http_version': '1.1', 'method': 'GET',
+        'scheme': 'http', 'path': path, 'raw_path': path.encode(), 'query_string': b'',
+        'root_path': '', 'headers': [(b'host', b'testserver'), (b'cookie', cookie.encode())],
+        'client': ('127.0.0.1', 50000), 'server': ('testserver', 80),
+    }
+    start = time.perf_counter()
+    await app(scope, receive, send)
+    return status, time.perf_counter() - start
+
+
+async def run_level(app, paths: list[str], cookie: str, concurrency: int, total: int) -> dict:
+    latencies: list[float] = []
+    errors = 0
+    peak_threads = threading.active_count()
+    queue = list(range(total))
+
+    async def worker():
+        nonlocal errors, peak_threads
+        while queue:
+            index = queue.pop()
+            status, seconds = await asgi_get(app, paths[index % len(paths)], cookie)
+            latencies.append(seconds)
+            errors += status != 200
+            peak_threads = max(peak_threads, threading.active_count())
+
+    start = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    elapsed = time.perf_counter() - start
+    latencies.sort()
+    return {
+        'rps': total / elapsed,
+        'p50_ms': statistics.median(latencies) * 1000,
+        'p95_ms': latencies[max(0, int(len(latencies) * 0.95) - 1)] * 1000,
+        'errors': errors,
+        'threads': peak_threads,
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--rows', type=int, default=20_000, help='Transactions for the benchmark user')
+    parser.add_argument('--concurrency', type=int, nargs='+', default=[1, 8, 32])
+    parser.add_argument('--requests', type=int, default=300, help='Requests per level and mode')
+    parser.add_argument('--cold', action='store_true', help='Clear cached frames before every level')
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        setup_django(os.path.join(tmp, 'bench.sqlite3'), test_environment=True)
+        import io
+        import logging
+        import warnings
+
+        from django.contrib.auth.models import User
+        from django.core.asgi import get_asgi_application
+        from django.core.management import call_command
+        from django.test import Client
+        from finwise_app.services import analytics
+
+        logging.getLogger('finwise_app').setLevel(logging.WARNING)
+        warnings.filterwarnings('ignore', message='.*received a naive datetime', category=RuntimeWarning)
+
+        install_sync_urls()
+        call_command('generate_dataset', users=1, txns_per_user=args.rows, prefix='asyncbench_', end_date='today',
+                     stdout=io.StringIO())
+        user = User.objects.get(username='asyncbench_00000')
+        client = Client()
+        client.force_login(user)
+        cookie = f"sessionid={client.cookies['sessionid'].value}"
+
+        app = get_asgi_application()
+        modes = {
+            'sync views': [f'/sync/{name}/' for name, _ in ENDPOINTS],
+            'async views': [url for _, url in ENDPOINTS],
+        }
+
+        async def run_all():
+            print(f"{'mode':<12} {'conc':>5} {'req/s':>9} {'p50':>9} {'p95':>9} {'threads':>8} {'errors':>7}")
+            for concurrency in args.concurrency:
+                for mode, paths in modes.items():
+                    if args.cold:
+                        analytics.clear_frames()
+                    else:
+                        await run_level(app, paths, cookie, 1, len(paths))  # warm the frame cache
+                    result = await run_level(app, paths, cookie, concurrency, args.requests)
+                    print(f"{mode:<12} {concurrency:>5} {result['rps']:>9.1f} {result['p50_ms']:>7.1f}ms "
+                          f"{result['p95_ms']:>7.1f}ms {result['threads']:>8} {result['errors']:>7}")
+
+        asyncio.run(run_all())
+
+
+if __name__ == '__main__':
+    main()
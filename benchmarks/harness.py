@@ -0,0 +1,51 @@
+"""
+Shared setup for the benchmark scripts
+
+Each script runs against a throwaway SQLite database so benchmarks never
+touch the development database.
+"""
+from __future__ import annotations
+
+import os
+import statistics
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'finwise_project.settings')
+
+
+def setup_django(db_path: str, test_environment: bool = False) -> None:
+    """Point the default database at db_path, set Django up and migrate"""
+    from django.conf import settings
+    settings.DATABASES['default']['NAME'] = db_path
+    import django
+    django.setup()
+    if test_environment:
+        # Allows the test client's host and swaps in the locmem email backend
+        from django.test.utils import setup_test_environment
+        setup_test_environment()
+    from django.core.management import call_command
+    call_command('migrate', verbosity=0)
+
+
+def timed(fn, *args, repeat: int = 3) -> float:
+    """Best wall time of repeat calls, in seconds"""
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn(*args)
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def summarize(samples: list[float]) -> dict:
+    """min/median/mean/max in milliseconds for a list of timings in seconds"""
+    ms = [s * 1000 for s in samples]
+    return {
+        'min_ms': round(min(ms), 3),
+        'median_ms': round(statistics.median(ms), 3),
+        'mean_ms': round(statistics.fmean(ms), 3),
+        'max_ms': round(max(ms), 3),
+    }
@@ -0,0 +1,313 @@
+"""
+Load test: concurrent synthetic users against a running FinWise server
+
+Logs in one session per virtual user and replays a weighted mix of
+dashboard, chart API, budgets, bills and import requests until the
+duration elapses (closed loop: each user waits for its response, then
+optionally thinks, then sends the next request). Reports p50/p95/p99
+latency, throughput and error rate per endpoint.
+
+Only the standard library is used so the tool runs anywhere the server does.
+
+    python manage.py generate_dataset --users 50 --txns-per-user 2000 --end-date today --ofx-dir /tmp/ofx
+    python manage.py runserver --noreload                       # or one of:
+    gunicorn finwise_project.wsgi -w 1 --threads 8
+    uvicorn finwise_project.asgi:application --workers 1
+
+    python benchmarks/loadtest.py run --users 20 --duration 60 --ofx-dir /tmp/ofx \\
+        --label wsgi-1x8 --output wsgi.json
+    python benchmarks/loadtest.py compare wsgi.json asgi.json
+"""
+from __future__ import annotations
+
+import argparse
+import http.cookiejar
+import json
+import random
+import sys
+import threading
+import time
+import urllib.error
+import urllib.parse
+import urllib.request
+import uuid
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+from pathlib import Path
+
+# (endpoint name, method, path, weight); weights roughly follow a dashboard
+# session: the page, its chart calls, occasional navigation and rare imports
+REQUEST_MIX = [
+    ('dashboard', 'GET', '/dashboard/', 10),
+    ('api.dashboard', 'GET', '/api/dashboard/', 10),
+    ('api.spending_trend', 'GET', '/api/spending-trend/?days=90&bucket=week', 4),
+    ('api.spending_by_category', 'GET', '/api/spending-by-category/', 4),
+    ('api.income_vs_expenses', 'GET', '/api/income-vs-expenses/', 3),
+    ('api.account_balance', 'GET', '/api/account-balance/', 3),
+    ('api.budgets', 'GET', '/api/budgets/', 3),
+    ('api.transactions', 'GET', '/api/transactions/', 6),
+    ('budgets', 'GET', '/budgets/', 4),
+    ('bills', 'GET', '/bills/', 4),
+    ('bill_reminders', 'GET', '/bills/reminders/', 2),
+    ('import', 'POST', '/import/', 1),
+]
+
+
+class _NoRedirect(urllib.request.HTTPRedirectHandler):
+    """Report redirects as responses instead of following them"""
+
+    def redirect_request(self, req, fp, code, msg, headers, newurl):
+        return None
+
+
+@dataclass
+class Sample:
+    endpoint: str
+    started: float  # seconds since the run started
+    latency: float  # seconds
+    status: int | None
+    error: str | None = None
+
+
+@dataclass
+class VirtualUser:
+    username: str
+    base_url: str
+    timeout: float
+    ofx: bytes | None = None
+    samples: list[Sample] = field(default_factory=list)
+
+    def __post_init__(self):
+        self.cookies = http.cookiejar.CookieJar()
+        self.opener = urllib.request.build_opener(
+            urllib.request.HTTPCookieProcessor(self.cookies), _NoRedirect()
+        )
+
+    def _csrf_token(self) -> str:
+        for cookie in self.cookies:
+            if cookie.name == 'csrftoken':
+                return cookie.value
+        return ''
+
+    def send(self, method: str, path: str, body: bytes | None = None, headers: dict | None = None):
+        """Return (status, location header); raises for network errors"""
+        request = urllib.request.Request(self.base_url + path, data=body, method=method, headers=headers or {})
+        try:
+            with self.opener.open(request, timeout=self.timeout) as response:
+                response.read()
+                return response.status, response.headers.get('Location', '')
+        except urllib.error.HTTPError as exc:
+            exc.read()
+            return exc.code, exc.headers.get('Location', '')
+
+    def login(self, password: str) -> None:
+        self.send('GET', '/login/')
+        body = urllib.parse.urlencode({
+            'username': self.username,
+            'password': password,
+            'csrfmiddlewaretoken': self._csrf_token(),
+        }).encode()
+        status, location = self.send('POST', '/login/', body, {
+            'Content-Type': 'application/x-www-form-urlencoded',
+            'Referer': self.base_url + '/login/',
+        })
+        if status != 302 or '/login/' in location:
+            raise RuntimeError(f'login failed for {self.username} (status {status})')
+
+    def _import_body(self) -> tuple[bytes, dict]:
+        boundary = uuid.uuid4().hex
+        parts = [
+            f'--{boundary}\r\nContent-Disposition: form-data; name="csrfmiddlewaretoken"\r\n\r\n'
+            f'{self._csrf_token()}\r\n'.encode(),
+            f'--{boundary}\r\nContent-Disposition: form-data; name="ofx_file"; filename="statement.ofx"\r\n'
+            f'Content-Type: application/x-ofx\r\n\r\n'.encode() + self.ofx + b'\r\n',
+            f'--{boundary}--\r\n'.encode(),
+        ]
+        return b''.join(parts), {
+            'Content-Type': f'multipart/form-data; boundary={boundary}',
+            'Referer': self.base_url + '/import/',
+        }
+
+    def request(self, endpoint: str, method: str, path: str, run_start: float) -> None:
+        body, headers = (self._import_body() if method == 'POST' else (None, None))
+        started = time.perf_counter()
+        status, error = None, None
+        try:
+            status, location = self.send(method, path, body, headers)
+            if status >= 400:
+                error = f'HTTP {status}'
+            elif status in (301, 302) and '/login/' in location:
+                error = 'session lost (redirected to login)'
+            elif method == 'POST' and status == 302 and urllib.parse.urlsplit(location).path == path:
+                # Form views redirect back to themselves with an error message
+                error = 'rejected (redirected back to the form)'
+        except Exception as exc:  # network failures count as errors, not crashes
+            error = f'{type(exc).__name__}: {exc}'
+        self.samples.append(Sample(endpoint, started - run_start, time.perf_counter() - started, status, error))
+
+
+def percentile(sorted_values: list[float], pct: float) -> float:
+    """Nearest-rank percentile of an ascending list"""
+    if not sorted_values:
+        return 0.0
+    rank = max(1, min(len(sorted_values), round(pct / 100 * len(sorted_values) + 0.5)))
+    return sorted_values[rank - 1]
+
+
+def summarize(samples: list[Sample], elapsed: float) -> dict:
+    latencies = sorted(s.latency * 1000 for s in samples)
+    errors = sum(1 for s in samples if s.error)
+    return {
+        'requests': len(samples),
+        'errors': errors,
+        'error_rate': round(errors / len(samples), 4) if samples else 0.0,
+        'throughput_rps': round(len(samples) / elapsed, 2) if elapsed else 0.0,
+        'p50_ms': round(percentile(latencies, 50), 1),
+        'p95_ms': round(percentile(latencies, 95), 1),
+        'p99_ms': round(percentile(latencies, 99), 1),
+        'max_ms': round(latencies[-1], 1) if latencies else 0.0,
+    }
+
+
+def run(args) -> int:
+    base_url = args.base_url.rstrip('/')
+    mix = [entry for entry in REQUEST_MIX if args.ofx_dir or entry[0] != 'import']
+    if args.only:
+        mix = [entry for entry in mix if entry[0] in args.only]
+    if not mix:
+        print('No endpoints selected', file=sys.stderr)
+        return 2
+    weights = [entry[3] for entry in mix]
+
+    users = []
+    for index in range(args.users):
+        username = f'{args.prefix}{index:05d}'
+        ofx = None
+        if args.ofx_dir:
+            files = sorted(Path(args.ofx_dir).glob(f'{username}-*.ofx'))
+            ofx = files[0].read_bytes() if files else None
+        user = VirtualUser(username, base_url, args.timeout, ofx)
+        try:
+            user.login(args.password)
+        except Exception as exc:
+            print(f'Could not log in {username}: {exc}', file=sys.stderr)
+            return 2
+        users.append(user)
+    print(f'Logged in {len(users)} users against {base_url}; running for {args.duration}s')
+
+    run_start = time.perf_counter()
+    deadline = run_start + args.ramp_up + args.duration
+
+    def drive(position: int, user: VirtualUser) -> None:
+        rnd = random.Random(args.seed + position)
+        # Stagger start times so users do not all fire at once
+        time.sleep(args.ramp_up * position / max(1, len(users)))
+        while time.perf_counter() < deadline:
+            endpoint, method, path, _weight = rnd.choices(mix, weights=weights)[0]
+            if method == 'POST' and user.ofx is None:
+                continue
+            user.request(endpoint, method, path, run_start)
+            if args.think_ms:
+                time.sleep(rnd.uniform(0, 2 * args.think_ms) / 1000)
+
+    threads = [threading.Thread(target=drive, args=(i, user), daemon=True) for i, user in enumerate(users)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    # Measure only the steady-state window after ramp-up
+    samples = [s for user in users for s in user.samples if s.started >= args.ramp_up]
+    elapsed = args.duration
+    by_endpoint: dict[str, list[Sample]] = {}
+    for sample in samples:
+        by_endpoint.setdefault(sample.endpoint, []).append(sample)
+
+    report = {
+        'meta': {
+            'label': args.label,
+            'created': datetime.now(timezone.utc).isoformat(timespec='seconds'),
+            'base_url': base_url,
+            'users': len(users),
+            'duration_s': args.duration,
+            'ramp_up_s': args.ramp_up,
+            'think_ms': args.think_ms,
+        },
+        'total': summarize(samples, elapsed),
+        'endpoints': {name: summarize(rows, elapsed) for name, rows in sorted(by_endpoint.items())},
+        'error_examples': sorted({f'{s.endpoint}: {s.error}' for s in samples if s.error})[:20],
+    }
+    print_report(report)
+
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as fh:
+            json.dump(report, fh, indent=2)
+        print(f'\nWrote results to {args.output}')
+    return 1 if report['total']['error_rate'] > args.max_error_rate else 0
+
+
+def print_report(report: dict) -> None:
+    header = f"{'endpoint':<28} {'reqs':>7} {'rps':>8} {'err%':>6} {'p50':>8} {'p95':>8} {'p99':>8}"
+    print(f"\n{report['meta'].get('label') or ''}\n{header}")
+    rows = list(report['endpoints'].items()) + [('TOTAL', report['total'])]
+    for name, stats in rows:
+        print(f"{name:<28} {stats['requests']:>7} {stats['throughput_rps']:>8.1f} {stats['error_rate'] * 100:>5.1f}% "
+              f"{stats['p50_ms']:>6.1f}ms {stats['p95_ms']:>6.1f}ms {stats['p99_ms']:>6.1f}ms")
+    for example in report['error_examples']:
+        print(f'  error: {example}')
+
+
+def compare(args) -> int:
+    reports = []
+    for path in args.reports:
+        with open(path, encoding='utf-8') as fh:
+            reports.append(json.load(fh))
+    labels = [r['meta'].get('label') or path for r, path in zip(reports, args.reports)]
+    endpoints = sorted({name for r in reports for name in r['endpoints']}) + ['TOTAL']
+
+    print(f"{'endpoint':<28} " + ' '.join(f'{label[:22]:>22}' for label in labels))
+    print(f"{'':<28} " + ' '.join(f"{'rps / p95 / err%':>22}" for _ in labels))
+    for name in endpoints:
+        cells = []
+        for report in reports:
+            stats = report['total'] if name == 'TOTAL' else report['endpoints'].get(name)
+            cells.append(
+                f"{stats['throughput_rps']:.1f} / {stats['p95_ms']:.0f}ms / {stats['error_rate'] * 100:.1f}%"
+                if stats else '-'
+            )
+        print(f'{name:<28} ' + ' '.join(f'{cell:>22}' for cell in cells))
+    return 0
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    sub = parser.add_subparsers(dest='command', required=True)
+
+    run_parser = sub.add_parser('run', help='Run a load test against a live server')
+    run_parser.add_argument('--base-url', default='http://127.0.0.1:8000')
+    run_parser.add_argument('--users', type=int, default=10, help='Concurrent virtual users')
+    run_parser.add_argument('--duration', type=float, default=30, help='Measured seconds (after ramp-up)')
+    run_parser.add_argument('--ramp-up', type=float, default=5, help='Seconds to stagger user start; not measured')
+    run_parser.add_argument('--think-ms', type=float, default=0, help='Mean pause between a user\'s requests')
+    run_parser.add_argument('--prefix', default='synthetic_', help='Username prefix used by generate_dataset')
+    run_parser.add_argument('--password', default='finwise-synthetic')
+    run_parser.add_argument('--ofx-dir', help='generate_dataset --ofx-dir output; enables import requests')
+    run_parser.add_argument('--only', nargs='+', help='Only these endpoint names from the mix')
+    run_parser.add_argument('--timeout', type=float, default=30)
+    run_parser.add_argument('--seed', type=int, default=1)
+    run_parser.add_argument('--label', default='', help='Name for this run, e.g. the server configuration')
+    run_parser.add_argument('--output', help='Write JSON results to this file')
+    run_parser.add_argument('--max-error-rate', type=float, default=0.01,
+                            help='Exit non-zero when the overall error rate exceeds this (default 0.01)')
+    run_parser.set_defaults(handler=run)
+
+    compare_parser = sub.add_parser('compare', help='Show several result files side by side')
+    compare_parser.add_argument('reports', nargs='+')
+    compare_parser.set_defaults(handler=compare)
+
+    args = parser.parse_args()
+    return args.handler(args)
+
+
+if __name__ == '__main__':
+    sys.exit(main())
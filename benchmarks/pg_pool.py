@@ -0,0 +1,174 @@
+"""
+Benchmark: chart endpoint latency on PostgreSQL with and without pooling
+
+Runs the chart APIs through Django's test client from N threads, once per
+connection mode, each in a fresh process so the settings profile is read
+from the environment (see docs/postgres.md):
+
+    none        FINWISE_PG_POOL=none        new connection per request
+    persistent  FINWISE_PG_POOL=persistent  CONN_MAX_AGE + health checks
+    pool        FINWISE_PG_POOL=pool        psycopg connection pool
+
+Needs a reachable server and psycopg[pool]; the database is migrated and
+seeded with one synthetic user on first use. Connection settings come from
+the usual FINWISE_PG_* variables.
+
+    createdb finwise_bench
+    FINWISE_PG_NAME=finwise_bench python benchmarks/pg_pool.py --threads 1 8 --requests 300
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import subprocess
+import sys
+import threading
+import time
+
+from harness import summarize
+
+MODES = ['none', 'persistent', 'pool']
+ENDPOINTS = [
+    '/api/budgets/',
+    '/api/spending-by-category/',
+    '/api/spending-trend/',
+    '/api/income-vs-expenses/',
+    '/api/account-balance/',
+]
+USERNAME = 'pgbench_00000'
+
+
+def setup_postgres_django() -> None:
+    import django
+    django.setup()
+    from django.conf import settings
+    if settings.DATABASES['default']['ENGINE'] != 'django.db.backends.postgresql':
+        sys.exit('FINWISE_DB_PROFILE=postgres did not select PostgreSQL')
+
+
+def prepare(rows: int) -> None:
+    """Migrate and seed the benchmark user if it is missing"""
+    setup_postgres_django()
+    import io
+
+    from django.contrib.auth.models import User
+    from django.core.management import call_command
+
+    call_command('migrate', verbosity=0)
+    if not User.objects.filter(username=USERNAME).exists():
+        call_command('generate_dataset', users=1, txns_per_user=rows, prefix='pgbench_', end_date='today',
+                     stdout=io.StringIO())
+
+
+def worker(threads: int, requests: int, cold: bool) -> dict:
+    """Issue ``requests`` chart calls from ``threads`` threads; runs in the child process"""
+    setup_postgres_django()
+    import logging
+    import warnings
+
+    from django.contrib.auth.models import User
+    from django.db import connections
+    from django.test import Client
+    from django.test.utils import setup_test_environment
+    from finwise_app.services import analytics
+
+    setup_test_environment()
+    logging.getLogger('finwise_app').setLevel(logging.WARNING)
+    warnings.filterwarnings('ignore', message='.*received a naive datetime', category=RuntimeWarning)
+
+    user = User.objects.get(username=USERNAME)
+    connections.close_all()
+
+    latencies: list[float] = []
+    errors = 0
+    lock = threading.Lock()
+    remaining = list(range(requests))
+
+    def run_thread():
+        nonlocal errors
+        client = Client(raise_request_exception=False)
+        client.force_login(user)
+        while True:
+            with lock:
+                if not remaining:
+                    break
+                index = remaining.pop()
+            if cold:
+                analytics.clear_frames()
+            start = time.perf_counter()
+            response = client.get(ENDPOINTS[index % len(ENDPOINTS)])
+            elapsed = time.perf_counter() - start
+            with lock:
+                latencies.append(elapsed)
+                errors += response.status_code != 200
+        connections.close_all()
+
+    pool = [threading.Thread(target=run_thread) for _ in range(threads)]
+    start = time.perf_counter()
+    for thread in pool:
+        thread.start()
+    for thread in pool:
+        thread.join()
+    elapsed = time.perf_counter() - start
+
+    latencies.sort()
+    return {
+        'rps': round(requests / elapsed, 1),
+        'p95_ms': round(latencies[max(0, int(len(latencies) * 0.95) - 1)] * 1000, 3),
+        'errors': errors,
+        **summarize(latencies),
+    }
+
+
+def spawn(args: list[str], mode: str | None = None) -> str:
+    env = dict(os.environ, FINWISE_DB_PROFILE='postgres')
+    if mode:
+        env['FINWISE_PG_POOL'] = mode
+    completed = subprocess.run(
+        [sys.executable, __file__, *args], env=env, capture_output=True, text=True,
+    )
+    if completed.returncode:
+        sys.exit(completed.stderr.strip() or f'{args[0]} failed')
+    return completed.stdout
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--rows', type=int, default=20_000, help='Transactions for the benchmark user')
+    parser.add_argument('--threads', type=int, nargs='+', default=[1, 8])
+    parser.add_argument('--requests', type=int, default=300, help='Requests per mode and thread count')
+    parser.add_argument('--modes', nargs='+', choices=MODES, default=MODES)
+    parser.add_argument('--cold', action='store_true', help='Clear cached frames before every request')
+    parser.add_argument('--output', help='Write the results as JSON to this path')
+    parser.add_argument('--prepare', action='store_true', help=argparse.SUPPRESS)
+    parser.add_argument('--worker', action='store_true', help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.prepare:
+        prepare(args.rows)
+        return
+    if args.worker:
+        print(json.dumps(worker(args.threads[0], args.requests, args.cold)))
+        return
+
+    spawn(['--prepare', '--rows', str(args.rows)])
+    results = []
+    print(f"{'mode':<11} {'threads':>7} {'req/s':>9} {'p50':>9} {'p95':>9} {'max':>9} {'errors':>7}")
+    for threads in args.threads:
+        for mode in args.modes:
+            worker_args = ['--worker', '--threads', str(threads), '--requests', str(args.requests)]
+            if args.cold:
+                worker_args.append('--cold')
+            result = json.loads(spawn(worker_args, mode).strip().splitlines()[-1])
+            results.append({'mode': mode, 'threads': threads, **result})
+            print(f"{mode:<11} {threads:>7} {result['rps']:>9.1f} {result['median_ms']:>7.1f}ms "
+                  f"{result['p95_ms']:>7.1f}ms {result['max_ms']:>7.1f}ms {result['errors']:>7}")
+
+    if args.output:
+        with open(args.output, 'w') as fh:
+            json.dump({'cold': args.cold, 'requests': args.requests, 'results': results}, fh, indent=2)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,63 @@
+"""
+Benchmark: columnar snapshot round trip vs the streaming JSON export
+
+Generates one user with N transactions in a throwaway database, then times
+write_snapshot, restore_snapshot into a fresh user and the JSON export, and
+compares file sizes.
+
+    python benchmarks/snapshot.py --rows 100000 1000000
+"""
+from __future__ import annotations
+
+import argparse
+import io
+import os
+import tempfile
+import time
+
+from harness import setup_django
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--rows', type=int, nargs='+', default=[100_000])
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        setup_django(os.path.join(tmp, 'bench.sqlite3'))
+        import warnings
+
+        from django.contrib.auth.models import User
+        from django.core.management import call_command
+        from finwise_app.services.export import export_response
+        from finwise_app.services.snapshot import restore_snapshot, write_snapshot
+
+        warnings.filterwarnings('ignore', message='.*received a naive datetime', category=RuntimeWarning)
+
+        print(f"{'rows':>9} {'write':>8} {'restore':>8} {'snapshot':>10} {'json':>8} {'json size':>10} {'ratio':>6}")
+        for index, rows in enumerate(args.rows):
+            prefix = f'snap{index}_'
+            call_command('generate_dataset', users=1, txns_per_user=rows, prefix=prefix, stdout=io.StringIO())
+            user = User.objects.get(username=f'{prefix}00000')
+            path = os.path.join(tmp, f'{prefix}.npz')
+
+            start = time.perf_counter()
+            write_snapshot(user, path)
+            write_s = time.perf_counter() - start
+
+            target = User.objects.create(username=f'{prefix}restored')
+            start = time.perf_counter()
+            restore_snapshot(path, target)
+            restore_s = time.perf_counter() - start
+
+            start = time.perf_counter()
+            json_bytes = sum(len(chunk) for chunk in export_response(user, 'json', 'bench').streaming_content)
+            json_s = time.perf_counter() - start
+
+            snapshot_bytes = os.path.getsize(path)
+            print(f"{rows:>9} {write_s:>7.2f}s {restore_s:>7.2f}s {snapshot_bytes / 1e6:>8.2f}MB "
+                  f"{json_s:>7.2f}s {json_bytes / 1e6:>8.1f}MB {json_bytes / snapshot_bytes:>5.0f}x")
+
+
+if __name__ == '__main__':
+    main()
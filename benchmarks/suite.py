@@ -0,0 +1,397 @@
+"""
+Benchmark suite: OFX parsers, importers, categorizer, analytics and every view
+
+Generates a synthetic dataset per size with ``generate_dataset`` in a
+throwaway SQLite database, then times each case and counts its queries.
+Results are written as JSON; ``compare`` diffs two result files and exits
+non-zero when a case got slower or issues more queries.
+
+    python benchmarks/suite.py run --sizes 1000 10000 --output current.json
+    python benchmarks/suite.py run --baseline baseline.json --output current.json
+    python benchmarks/suite.py compare baseline.json current.json --threshold 0.25
+"""
+from __future__ import annotations
+
+import argparse
+import io
+import json
+import logging
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import warnings
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Callable
+
+from harness import setup_django, summarize
+
+DEFAULT_SIZES = [1_000, 10_000]
+DEFAULT_THRESHOLD = 0.20  # relative slowdown that counts as a regression
+DEFAULT_NOISE_MS = 2.0  # ignore absolute slowdowns smaller than this
+
+# Views that change or destroy state in ways a repeated benchmark cannot undo
+# cheaply, or that need a multi-step session; listed so new views are noticed
+SKIPPED_VIEWS = {
+    'logout': 'ends the benchmark session',
+    'recover_verify': 'needs a recovery code issued in the same session',
+    'recover_reset_password': 'needs a verified recovery session',
+    'create_budget': 'mutates budgets',
+    'update_budget': 'mutates budgets',
+    'delete_budget': 'mutates budgets',
+    'update_account': 'mutates the user',
+    'change_password': 'mutates the user',
+    'delete_account': 'deletes the benchmark user',
+    'clean_data': 'deletes the benchmark data',
+    'delete_bill': 'mutates bills',
+    'mark_bill_paid': 'mutates bills',
+    'mark_bill_pending': 'mutates bills',
+}
+
+
+@dataclass
+class Case:
+    name: str
+    fn: Callable[[], object]
+    setup: Callable[[], None] | None = None  # run untimed before every sample
+    view: str | None = None  # URL name, for coverage reporting
+
+
+def git_commit() -> str | None:
+    try:
+        return subprocess.run(
+            ['git', 'rev-parse', '--short', 'HEAD'], capture_output=True, text=True, check=True,
+            cwd=Path(__file__).resolve().parent,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+# Data
+
+def build_dataset(size: int, workdir: str, end_date: str):
+    """Create one user with ``size`` transactions plus a user to import into"""
+    from django.contrib.auth.models import User
+    from django.core.management import call_command
+
+    prefix = f'bench{size}_'
+    ofx_dir = os.path.join(workdir, f'ofx-{size}')
+    call_command(
+        'generate_dataset', users=1, txns_per_user=size, prefix=prefix, ofx_dir=ofx_dir,
+        end_date=end_date, stdout=io.StringIO(),
+    )
+    user = User.objects.get(username=f'{prefix}00000')
+    importer = User.objects.create_user(f'{prefix}importer', password='bench-password')
+    checking = next(p for p in sorted(Path(ofx_dir).glob('*.ofx')) if '-CHK' in p.name)
+    return user, importer, checking.read_bytes()
+
+
+# Cases
+
+def service_cases(size: int, user, importer, ofx: bytes) -> list[Case]:
+    from finwise_app.models import Transaction
+    from finwise_app.services import analytics
+    from finwise_app.services.categorization_service import TransactionCategorizationService
+    from finwise_app.services.dashboard_service import build_dashboard_data
+    from finwise_app.services.ofx_importer import import_ofx, parse_ofx
+    from finwise_app.services.ofx_importer_alternative import import_ofx_alternative, parse_ofx_alternative
+
+    from analytics_vs_orm import orm_path
+
+    def reset_importer():
+        importer.accounts.all().delete()
+
+    pending: list = []
+
+    def load_uncategorized():
+        pending[:] = list(Transaction.objects.filter(account__user=user).order_by('id')[:size])
+        for txn in pending:
+            txn.is_categorized = False
+
+    categorizer = TransactionCategorizationService()
+
+    return [
+        Case('parse.ofxtools', lambda: parse_ofx(ofx)),
+        Case('parse.regex', lambda: parse_ofx_alternative(ofx)),
+        Case('import.ofxtools', lambda: import_ofx(ofx, importer), setup=reset_importer),
+        Case('import.regex', lambda: import_ofx_alternative(ofx, importer), setup=reset_importer),
+        Case('import.regex_reimport', lambda: import_ofx_alternative(ofx, user)),
+        Case('categorize.bulk', lambda: categorizer.categorize_bulk_transactions(pending), setup=load_uncategorized),
+        Case('analytics.orm', lambda: orm_path(user)),
+        Case('analytics.frame_cold', lambda: build_dashboard_data(user), setup=analytics.clear_frames),
+        Case('analytics.frame_warm', lambda: build_dashboard_data(user)),
+    ]
+
+
+def view_cases(user, importer, ofx: bytes) -> list[Case]:
+    from django.core.files.uploadedfile import SimpleUploadedFile
+    from django.test import Client
+
+    client = Client(raise_request_exception=False)
+    client.force_login(user)
+    anonymous = Client(raise_request_exception=False)
+    import_client = Client(raise_request_exception=False)
+    import_client.force_login(importer)
+    bill_id = user.bills.values_list('id', flat=True).first()
+
+    def get(url, c=client):
+        def fetch():
+            response = c.get(url)
+            if response.streaming:
+                # Streamed bodies are produced while consumed; time that too
+                b''.join(response.streaming_content)
+            return response
+        return fetch
+
+    def post_import():
+        upload = SimpleUploadedFile('statement.ofx', ofx, content_type='application/x-ofx')
+        return import_client.post('/import/', {'ofx_file': upload})
+
+    cases = [
+        Case('view.home', get('/', anonymous), view='home'),
+        Case('view.login', get('/login/', anonymous), view='login'),
+        Case('view.register', get('/register/', anonymous), view='register'),
+        Case('view.recover_request', get('/recover/', anonymous), view='recover_request'),
+        Case('view.dashboard', get('/dashboard/'), view='dashboard'),
+        Case('view.import_transactions', get('/import/'), view='import_transactions'),
+        Case('view.import_transactions.post', post_import, setup=lambda: importer.accounts.all().delete(),
+             view='import_transactions'),
+        Case('view.budgets', get('/budgets/'), view='budgets'),
+        Case('view.categories', get('/categories/'), view='categories'),
+        Case('view.setup_default_categories', lambda: client.post('/categories/setup-defaults/'),
+             view='setup_default_categories'),
+        Case('view.recategorize_transactions', lambda: client.post('/transactions/recategorize/'),
+             view='recategorize_transactions'),
+        Case('view.account', get('/account/'), view='account'),
+        Case('view.export_data', get('/account/export-data/'), view='export_data'),
+        Case('view.bills', get('/bills/'), view='bills'),
+        Case('view.add_bill', get('/bills/add/'), view='add_bill'),
+        Case('view.bill_reminders', get('/bills/reminders/'), view='bill_reminders'),
+        Case('view.metrics', get('/metrics'), view='metrics'),
+        Case('api.dashboard', get('/api/dashboard/'), view='dashboard_api'),
+        Case('api.budgets', get('/api/budgets/'), view='budget_api_data'),
+        Case('api.spending_by_category', get('/api/spending-by-category/'), view='spending_by_category_api'),
+        Case('api.spending_trend', get('/api/spending-trend/'), view='spending_trend_api'),
+        Case('api.spending_trend.year_weekly', get('/api/spending-trend/?days=365&bucket=week'),
+             view='spending_trend_api'),
+        Case('api.income_vs_expenses', get('/api/income-vs-expenses/'), view='income_vs_expenses_api'),
+        Case('api.account_balance', get('/api/account-balance/'), view='account_balance_api'),
+        Case('api.transactions', get('/api/transactions/'), view='transactions_api'),
+        Case('api.transactions.uncategorized', get('/api/transactions/?category=uncategorized&days=365&limit=100'),
+             view='transactions_api'),
+    ]
+    if bill_id:
+        cases.append(Case('view.edit_bill', get(f'/bills/{bill_id}/edit/'), view='edit_bill'))
+    return cases
+
+
+def uncovered_views(cases: list[Case]) -> list[str]:
+    from finwise_app import urls as app_urls
+
+    names = {pattern.name for pattern in app_urls.urlpatterns if pattern.name}
+    covered = {case.view for case in cases if case.view}
+    return sorted(names - covered - set(SKIPPED_VIEWS))
+
+
+# Running
+
+def run_case(case: Case, repeat: int, warmup: int) -> dict:
+    from finwise_app.instrumentation import collect_request_stats
+
+    samples = []
+    queries = None
+    status = None
+    try:
+        for i in range(warmup + repeat):
+            if case.setup:
+                case.setup()
+            with collect_request_stats() as stats:
+                result = case.fn()
+            if i >= warmup:
+                samples.append(stats.wall_time)
+            queries = stats.query_count
+            status = getattr(result, 'status_code', 'ok')
+    except Exception as exc:  # record and keep going; one broken case must not stop the suite
+        return {'status': 'error', 'error': f'{type(exc).__name__}: {exc}'[:500]}
+    return {**summarize(samples), 'queries': queries, 'status': status}
+
+
+def dataset_end_date(args) -> str:
+    """
+    The views chart windows relative to today, so a fresh run's history ends
+    today. A run against a baseline regenerates the baseline's exact rows by
+    reusing its end date.
+    """
+    if args.end_date:
+        return args.end_date
+    if args.baseline:
+        with open(args.baseline, encoding='utf-8') as fh:
+            end_date = json.load(fh)['meta'].get('dataset_end_date')
+        if end_date:
+            return end_date
+    return datetime.now().date().isoformat()
+
+
+def run(args) -> int:
+    args.end_date = dataset_end_date(args)
+    with tempfile.TemporaryDirectory() as tmp:
+        setup_django(os.path.join(tmp, 'bench.sqlite3'), test_environment=True)
+        import django
+        from django.core.cache import cache
+
+        # 5xx responses are recorded as the case status; skip their tracebacks,
+        # per-import log lines and the importers' naive datetime warnings
+        logging.getLogger('django.request').setLevel(logging.CRITICAL)
+        logging.getLogger('finwise_app').setLevel(logging.WARNING)
+        warnings.filterwarnings('ignore', message='.*received a naive datetime', category=RuntimeWarning)
+
+        results = []
+        print(f"{'case':<40} {'size':>8} {'median':>10} {'min':>10} {'queries':>8} {'status':>7}")
+        for size in args.sizes:
+            user, importer, ofx = build_dataset(size, tmp, args.end_date)
+            cache.clear()
+            cases = service_cases(size, user, importer, ofx) + view_cases(user, importer, ofx)
+            if size == args.sizes[0]:
+                missing = uncovered_views(cases)
+                if missing:
+                    print(f"warning: views without a benchmark case: {', '.join(missing)}", file=sys.stderr)
+            for case in cases:
+                if args.only and not any(case.name.startswith(prefix) for prefix in args.only):
+                    continue
+                result = {'name': case.name, 'size': size, **run_case(case, args.repeat, args.warmup)}
+                results.append(result)
+                if result['status'] == 'error':
+                    print(f"{case.name:<40} {size:>8} {'-':>10} {'-':>10} {'-':>8} {'error':>7}  {result['error'][:60]}")
+                else:
+                    print(f"{case.name:<40} {size:>8} {result['median_ms']:>8.1f}ms {result['min_ms']:>8.1f}ms "
+                          f"{result['queries']:>8} {result['status']!s:>7}")
+
+        report = {
+            'meta': {
+                'created': datetime.now(timezone.utc).isoformat(timespec='seconds'),
+                'commit': git_commit(),
+                'python': platform.python_version(),
+                'django': django.get_version(),
+                'sizes': args.sizes,
+                'repeat': args.repeat,
+                'dataset_end_date': args.end_date,
+            },
+            'results': results,
+        }
+
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as fh:
+            json.dump(report, fh, indent=2)
+        print(f'\nWrote {len(results)} results to {args.output}')
+
+    if args.baseline:
+        with open(args.baseline, encoding='utf-8') as fh:
+            baseline = json.load(fh)
+        return print_comparison(baseline, report, args.threshold, args.noise_ms)
+    return 0
+
+
+# Comparison
+
+def compare(baseline: dict, current: dict, threshold: float, noise_ms: float) -> dict:
+    """Classify every (case, size) present in either report"""
+    old = {(r['name'], r['size']): r for r in baseline['results']}
+    new = {(r['name'], r['size']): r for r in current['results']}
+    outcome = {'regressions': [], 'improvements': [], 'new_errors': [], 'added': [], 'removed': []}
+
+    for key in sorted(old.keys() | new.keys(), key=lambda k: (k[0], k[1])):
+        before, after = old.get(key), new.get(key)
+        label = f'{key[0]} @ {key[1]}'
+        if before is None:
+            outcome['added'].append(label)
+            continue
+        if after is None:
+            outcome['removed'].append(label)
+            continue
+        if after['status'] == 'error':
+            if before['status'] != 'error':
+                outcome['new_errors'].append(f"{label}: {after['error']}")
+            continue
+        if before['status'] == 'error':
+            continue
+
+        if after['queries'] > before['queries']:
+            outcome['regressions'].append(f"{label}: queries {before['queries']} -> {after['queries']}")
+        elif after['queries'] < before['queries']:
+            outcome['improvements'].append(f"{label}: queries {before['queries']} -> {after['queries']}")
+
+        delta = after['median_ms'] - before['median_ms']
+        ratio = after['median_ms'] / before['median_ms'] if before['median_ms'] else float('inf')
+        if abs(delta) < noise_ms:
+            continue
+        if ratio > 1 + threshold:
+            outcome['regressions'].append(
+                f"{label}: median {before['median_ms']:.1f}ms -> {after['median_ms']:.1f}ms (+{(ratio - 1) * 100:.0f}%)"
+            )
+        elif ratio < 1 / (1 + threshold):
+            outcome['improvements'].append(
+                f"{label}: median {before['median_ms']:.1f}ms -> {after['median_ms']:.1f}ms ({(ratio - 1) * 100:.0f}%)"
+            )
+    return outcome
+
+
+def print_comparison(baseline: dict, current: dict, threshold: float, noise_ms: float) -> int:
+    outcome = compare(baseline, current, threshold, noise_ms)
+    print(f"\nCompared against baseline {baseline['meta'].get('commit') or baseline['meta'].get('created')}")
+    before_end, after_end = baseline['meta'].get('dataset_end_date'), current['meta'].get('dataset_end_date')
+    if before_end != after_end:
+        print(f"warning: datasets end on different days ({before_end} vs {after_end}); "
+              f"rerun with --baseline or --end-date {before_end} to compare the same rows")
+    for section in ('regressions', 'new_errors', 'improvements', 'added', 'removed'):
+        if outcome[section]:
+            print(f"\n{section.replace('_', ' ').capitalize()} ({len(outcome[section])}):")
+            for line in outcome[section]:
+                print(f'  {line}')
+    failed = bool(outcome['regressions'] or outcome['new_errors'])
+    print('\nFAIL' if failed else '\nOK: no regressions')
+    return 1 if failed else 0
+
+
+def compare_files(args) -> int:
+    with open(args.baseline, encoding='utf-8') as fh:
+        baseline = json.load(fh)
+    with open(args.current, encoding='utf-8') as fh:
+        current = json.load(fh)
+    return print_comparison(baseline, current, args.threshold, args.noise_ms)
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    sub = parser.add_subparsers(dest='command', required=True)
+
+    run_parser = sub.add_parser('run', help='Run the suite')
+    run_parser.add_argument('--sizes', type=int, nargs='+', default=DEFAULT_SIZES)
+    run_parser.add_argument('--repeat', type=int, default=5)
+    run_parser.add_argument('--warmup', type=int, default=1)
+    run_parser.add_argument('--only', nargs='+', help='Only run cases whose name starts with one of these prefixes')
+    run_parser.add_argument('--output', help='Write JSON results to this file')
+    run_parser.add_argument('--baseline', help='Compare the results against this JSON file')
+    run_parser.add_argument('--end-date',
+                            help="Last day of the generated history (YYYY-MM-DD); defaults to the baseline's, else today")
+    run_parser.set_defaults(handler=run)
+
+    compare_parser = sub.add_parser('compare', help='Compare two result files')
+    compare_parser.add_argument('baseline')
+    compare_parser.add_argument('current')
+    compare_parser.set_defaults(handler=compare_files)
+
+    for p in (run_parser, compare_parser):
+        p.add_argument('--threshold', type=float, default=DEFAULT_THRESHOLD,
+                       help='Relative median slowdown that counts as a regression (default 0.20)')
+        p.add_argument('--noise-ms', type=float, default=DEFAULT_NOISE_MS,
+                       help='Ignore median changes smaller than this many ms (default 2)')
+
+    args = parser.parse_args()
+    return args.handler(args)
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -1,6 +1,10 @@
 from django.contrib import admin
+from django.contrib.auth.models import User
 
-from .models import Account, Transaction, Category, Budget
+from .models import Account, Transaction, ArchivedTransaction, Category, Budget, Notification
+from .services.analytics import bump_data_version
+from .services.budget_alerts import forget_budget_amounts
+from .services.goals import refresh_goals, refresh_stale_goals_safely
 
 
 @admin.register(Account)
@@ -21,6 +25,38 @@ class TransactionAdmin(admin.ModelAdmin):
 	def get_queryset(self, request):
 		return super().get_queryset(request).select_related('account', 'category')
 
+	def save_model(self, request, obj, form, change):
+		super().save_model(request, obj, form, change)
+		bump_data_version(obj.account.user_id)
+		refresh_stale_goals_safely(obj.account.user)
+
+	def delete_model(self, request, obj):
+		user = obj.account.user
+		super().delete_model(request, obj)
+		bump_data_version(user.id)
+		refresh_stale_goals_safely(user)
+
+	def delete_queryset(self, request, queryset):
+		user_ids = set(queryset.values_list('account__user_id', flat=True))
+		super().delete_queryset(request, queryset)
+		for user in User.objects.filter(id__in=user_ids):
+			bump_data_version(user.id)
+			refresh_stale_goals_safely(user)
+
+
+@admin.register(ArchivedTransaction)
+class ArchivedTransactionAdmin(admin.ModelAdmin):
+	list_display = ("id", "account", "posted_date", "amount", "trntype", "name", "fitid", "category", "archived_at")
+	list_filter = ("trntype", "account", "category")
+	search_fields = ("name", "memo", "fitid", "checknum")
+	date_hierarchy = "posted_date"
+
+	def get_queryset(self, request):
+		return super().get_queryset(request).select_related('account', 'category')
+
+	def has_change_permission(self, request, obj=None):
+		# Edits would leave the rollups out of date
+		return False
 
 @admin.register(Category)
 class CategoryAdmin(admin.ModelAdmin):
@@ -36,10 +72,34 @@ class CategoryAdmin(admin.ModelAdmin):
 
 @admin.register(Budget)
 class BudgetAdmin(admin.ModelAdmin):
-	list_display = ('user', 'category', 'month', 'amount', 'spent_amount', 'percentage_used')
-	list_filter = ('month', 'category', 'user')
+	list_display = ('user', 'category', 'budget_type', 'month', 'amount', 'spent_amount', 'percentage_used', 'target_date', 'saved_amount')
+	list_filter = ('budget_type', 'month', 'category', 'user')
 	search_fields = ('user__username', 'category__name')
 	date_hierarchy = 'month'
+	readonly_fields = ('saved_amount', 'progress_version', 'progress_updated_at')
+	
+	def save_model(self, request, obj, form, change):
+		super().save_model(request, obj, form, change)
+		forget_budget_amounts(obj.user_id)
+		if obj.budget_type != 'GOAL':
+			# Rows that stopped being goals keep no contributions
+			obj.contributions.all().delete()
+		categories = {obj.category_id}
+		if change and 'category' in form.changed_data:
+			categories.add(form.initial['category'])
+		self._refresh_goals(obj.user, categories)
+	
+	def delete_model(self, request, obj):
+		super().delete_model(request, obj)
+		forget_budget_amounts(obj.user_id)
+		self._refresh_goals(obj.user, {obj.category_id})
+	
+	def _refresh_goals(self, user, categories):
+		# Goal windows decide which goal a transaction counts toward, so the
+		# categories' remaining goals are rebuilt together
+		goals = list(Budget.objects.filter(user=user, budget_type='GOAL', category_id__in=categories))
+		if goals:
+			refresh_goals(user, goals)
 	
 	def spent_amount(self, obj):
 		return f"${obj.get_spent_amount():.2f}"
@@ -52,3 +112,10 @@ class BudgetAdmin(admin.ModelAdmin):
 	def get_queryset(self, request):
 		return super().get_queryset(request).select_related('user', 'category')
 
+
+@admin.register(Notification)
+class NotificationAdmin(admin.ModelAdmin):
+	list_display = ("id", "channel", "kind", "recipient", "subject", "status", "attempts", "next_attempt_at", "sent_at")
+	list_filter = ("status", "channel", "kind")
+	search_fields = ("recipient", "subject", "dedupe_key")
+	readonly_fields = ("claim_token", "last_error", "created_at", "sent_at")
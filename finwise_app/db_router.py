@@ -0,0 +1,103 @@
+"""
+Read-replica routing
+Views decorated with ``read_from_replica`` send this app's ORM reads to the
+'replica' alias when one is configured; everything else, and every write,
+stays on 'default'. After a user's data changes (``bump_data_version``)
+their reads stay on 'default' for REPLICA_STICKY_SECONDS so they see their
+own writes while the replica catches up.
+
+Stickiness lives in the Django cache, so multi-process deployments need a
+shared cache backend for it to hold across workers.
+"""
+from __future__ import annotations
+
+from contextlib import contextmanager
+from contextvars import ContextVar
+from functools import wraps
+
+from asgiref.sync import iscoroutinefunction
+from django.conf import settings
+from django.core.cache import cache
+
+REPLICA_ALIAS = "replica"
+STICKY_KEY = "replica_sticky:{user_id}"
+
+# Alias reads should use in the current request; None leaves routing to Django
+_read_alias: ContextVar[str | None] = ContextVar("finwise_read_alias", default=None)
+
+
+def replica_configured() -> bool:
+    return REPLICA_ALIAS in settings.DATABASES
+
+
+def mark_recent_write(user_id: int) -> None:
+    """Pin the user's reads to 'default' for the stickiness window"""
+    if replica_configured():
+        cache.set(STICKY_KEY.format(user_id=user_id), True, settings.REPLICA_STICKY_SECONDS)
+
+
+def _alias_for(user, sticky: bool) -> str | None:
+    if not replica_configured() or not user.is_authenticated or sticky:
+        return None
+    return REPLICA_ALIAS
+
+
+@contextmanager
+def reading_from(alias: str | None):
+    token = _read_alias.set(alias)
+    try:
+        yield
+    finally:
+        _read_alias.reset(token)
+
+
+def read_from_replica(view_func):
+    """
+    Route the view's reads to the replica. Apply it below ``login_required``
+    so authentication still reads from 'default'.
+    """
+    if iscoroutinefunction(view_func):
+        @wraps(view_func)
+        async def _async_view(request, *args, **kwargs):
+            user = await request.auser()
+            sticky = replica_configured() and user.is_authenticated and bool(
+                await cache.aget(STICKY_KEY.format(user_id=user.id))
+            )
+            with reading_from(_alias_for(user, sticky)):
+                return await view_func(request, *args, **kwargs)
+        return _async_view
+
+    @wraps(view_func)
+    def _view(request, *args, **kwargs):
+        user = request.user
+        sticky = replica_configured() and user.is_authenticated and bool(
+            cache.get(STICKY_KEY.format(user_id=user.id))
+        )
+        with reading_from(_alias_for(user, sticky)):
+            return view_func(request, *args, **kwargs)
+    return _view
+
+
+class ReadReplicaRouter:
+    """Database router enabled in settings when a replica is configured"""
+
+    def db_for_read(self, model, **hints):
+        instance = hints.get("instance")
+        if instance is not None and instance._state.db:
+            return instance._state.db
+        if model._meta.app_label != "finwise_app":
+            return None
+        return _read_alias.get()
+
+    def db_for_write(self, model, **hints):
+        return "default"
+
+    def allow_relation(self, obj1, obj2, **hints):
+        # Both aliases hold the same data
+        return True
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        # The replica's schema comes from the primary (sync_replica or real replication)
+        if db == REPLICA_ALIAS:
+            return False
+        return None
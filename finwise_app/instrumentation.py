@@ -0,0 +1,118 @@
+"""
+Per-request query and latency instrumentation
+Counts queries and database time across all connections, and lets views
+declare a query/latency budget that the middleware and tests check against
+"""
+from __future__ import annotations
+
+import time
+from contextlib import ExitStack, asynccontextmanager, contextmanager
+from dataclasses import dataclass, field
+
+from asgiref.sync import sync_to_async
+from django.db import connections
+
+BUDGET_ATTR = "_query_budget"
+
+
+@dataclass(frozen=True)
+class QueryBudget:
+    """Maximum queries and wall time (ms) a view may use for one request"""
+    max_queries: int | None = None
+    max_ms: float | None = None
+
+
+@dataclass
+class RequestStats:
+    """Query count and timings collected while a request is handled"""
+    query_count: int = 0
+    db_time: float = 0.0  # seconds
+    wall_time: float = 0.0  # seconds
+    queries: list[str] = field(default_factory=list)
+    keep_sql: bool = False
+
+    def __call__(self, execute, sql, params, many, context):
+        # Signature required by connection.execute_wrapper()
+        start = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.db_time += time.perf_counter() - start
+            self.query_count += 1
+            if self.keep_sql:
+                self.queries.append(sql)
+
+    @property
+    def db_ms(self) -> float:
+        return self.db_time * 1000
+
+    @property
+    def wall_ms(self) -> float:
+        return self.wall_time * 1000
+
+    def violations(self, budget: QueryBudget | None) -> list[str]:
+        """Human-readable list of budget limits this request exceeded"""
+        if budget is None:
+            return []
+        problems = []
+        if budget.max_queries is not None and self.query_count > budget.max_queries:
+            problems.append(f"{self.query_count} queries > budget of {budget.max_queries}")
+        if budget.max_ms is not None and self.wall_ms > budget.max_ms:
+            problems.append(f"{self.wall_ms:.0f} ms > budget of {budget.max_ms:.0f} ms")
+        return problems
+
+
+@contextmanager
+def collect_request_stats(keep_sql: bool = False):
+    """Instrument every configured database connection for the duration of the block"""
+    stats = RequestStats(keep_sql=keep_sql)
+    start = time.perf_counter()
+    with ExitStack() as stack:
+        _wrap_connections(stack, stats)
+        try:
+            yield stats
+        finally:
+            stats.wall_time = time.perf_counter() - start
+
+
+def _wrap_connections(stack: ExitStack, stats: RequestStats) -> None:
+    for connection in connections.all():
+        stack.enter_context(connection.execute_wrapper(stats))
+
+
+@asynccontextmanager
+async def acollect_request_stats(keep_sql: bool = False):
+    """
+    collect_request_stats for async code. Connections are per thread and the
+    async ORM runs queries in asgiref's thread-sensitive worker (one per
+    request under the ASGI handler), so the wrappers are installed there.
+    """
+    stats = RequestStats(keep_sql=keep_sql)
+    start = time.perf_counter()
+    stack = ExitStack()
+    await sync_to_async(_wrap_connections)(stack, stats)
+    try:
+        yield stats
+    finally:
+        await sync_to_async(stack.close)()
+        stats.wall_time = time.perf_counter() - start
+
+
+def query_budget(max_queries: int | None = None, max_ms: float | None = None):
+    """
+    Declare the query and latency budget of a view.
+
+    Apply it outermost (above ``login_required`` and friends) so the resolved
+    view function carries the budget.
+    """
+    budget = QueryBudget(max_queries=max_queries, max_ms=max_ms)
+
+    def decorator(view_func):
+        setattr(view_func, BUDGET_ATTR, budget)
+        return view_func
+
+    return decorator
+
+
+def get_view_budget(view_func) -> QueryBudget | None:
+    return getattr(view_func, BUDGET_ATTR, None)
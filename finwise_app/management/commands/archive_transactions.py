@@ -0,0 +1,42 @@
+from datetime import timedelta
+
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+
+from finwise_app.services.archive import ARCHIVE_AFTER_DAYS, archive_transactions
+from finwise_app.services.batching import DEFAULT_BATCH_SIZE
+from finwise_app.services.write_queue import serialized_write
+
+
+class Command(BaseCommand):
+    help = 'Move old transactions into the archive table, keeping monthly rollups'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--older-than-days', type=int, default=ARCHIVE_AFTER_DAYS,
+                            help='Archive transactions posted more than this many days ago')
+        parser.add_argument('--user', action='append', dest='usernames', metavar='USERNAME',
+                            help='Only archive this user (repeatable); default is every user')
+        parser.add_argument('--batch-size', type=int, default=DEFAULT_BATCH_SIZE)
+
+    def handle(self, *args, **options):
+        if options['older_than_days'] < 1:
+            raise CommandError('--older-than-days must be at least 1')
+        cutoff = timezone.now() - timedelta(days=options['older_than_days'])
+
+        users = User.objects.order_by('id')
+        if options['usernames']:
+            users = users.filter(username__in=options['usernames'])
+            missing = set(options['usernames']) - set(users.values_list('username', flat=True))
+            if missing:
+                raise CommandError(f"Unknown user(s): {', '.join(sorted(missing))}")
+
+        total = 0
+        for user in users:
+            moved = serialized_write(
+                archive_transactions, user, cutoff, options['batch_size'], operation='archive'
+            )
+            if moved:
+                self.stdout.write(f'{user.username}: archived {moved} transactions')
+            total += moved
+        self.stdout.write(self.style.SUCCESS(f'Archived {total} transactions posted before {cutoff:%Y-%m-%d}'))
@@ -0,0 +1,46 @@
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand, CommandError
+
+from finwise_app.services.analytics import bump_data_version
+from finwise_app.services.duplicates import delete_duplicates, duplicate_ids
+from finwise_app.services.goals import refresh_stale_goals_safely
+from finwise_app.services.write_queue import serialized_write
+
+
+class Command(BaseCommand):
+    help = ('Find and delete duplicate transactions (same FITID); with --fuzzy also same day, amount and name '
+            'in different imports. Review fuzzy matches with --dry-run first')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--user', action='append', dest='usernames', metavar='USERNAME',
+                            help='Only this user (repeatable); default is every user')
+        parser.add_argument('--fuzzy', action='store_true',
+                            help='Also same day, amount and name under different FITIDs in different imports')
+        parser.add_argument('--dry-run', action='store_true', help='Report counts without deleting')
+
+    def handle(self, *args, **options):
+        users = User.objects.order_by('id')
+        if options['usernames']:
+            users = users.filter(username__in=options['usernames'])
+            missing = set(options['usernames']) - set(users.values_list('username', flat=True))
+            if missing:
+                raise CommandError(f"Unknown user(s): {', '.join(sorted(missing))}")
+
+        fuzzy = options['fuzzy']
+        total = 0
+        for user in users:
+            if options['dry_run']:
+                kinds = ('exact', 'fuzzy') if fuzzy else ('exact',)
+                counts = {kind: len(duplicate_ids(user, kind)) for kind in kinds}
+            else:
+                counts = serialized_write(delete_duplicates, user, fuzzy, operation='dedupe')
+                if any(counts.values()):
+                    bump_data_version(user.id)
+                    serialized_write(refresh_stale_goals_safely, user, operation='goal_progress')
+            if any(counts.values()):
+                detail = ', '.join(f'{count} {kind}' for kind, count in counts.items())
+                self.stdout.write(f'{user.username}: {detail}')
+            total += sum(counts.values())
+
+        verb = 'Found' if options['dry_run'] else 'Deleted'
+        self.stdout.write(self.style.SUCCESS(f'{verb} {total} duplicate transactions'))
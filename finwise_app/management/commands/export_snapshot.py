@@ -0,0 +1,34 @@
+import time
+from pathlib import Path
+
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand, CommandError
+
+from finwise_app.services.snapshot import write_snapshot
+
+
+class Command(BaseCommand):
+    help = "Write a user's data to a compressed columnar snapshot (.npz)"
+
+    def add_arguments(self, parser):
+        parser.add_argument('username')
+        parser.add_argument('output', help='Snapshot path; .npz is appended when missing')
+        parser.add_argument('--with-password', action='store_true',
+                            help="Include the user's password hash so they can log in after a restore")
+
+    def handle(self, *args, **options):
+        try:
+            user = User.objects.get(username=options['username'])
+        except User.DoesNotExist:
+            raise CommandError(f"Unknown user: {options['username']}")
+
+        output = Path(options['output'])
+        if output.suffix != '.npz':
+            output = output.with_name(output.name + '.npz')
+
+        started = time.perf_counter()
+        counts = write_snapshot(user, output, include_password=options['with_password'])
+        detail = ', '.join(f'{count} {table}' for table, count in counts.items() if count)
+        self.stdout.write(self.style.SUCCESS(
+            f'Wrote {output} ({output.stat().st_size / 1024:.0f} KiB) in {time.perf_counter() - started:.2f}s: {detail}'
+        ))
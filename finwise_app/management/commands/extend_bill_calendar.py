@@ -0,0 +1,35 @@
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand, CommandError
+
+from finwise_app.models import Bill
+from finwise_app.services.bill_calendar import extend_calendar
+from finwise_app.services.write_queue import serialized_write
+
+
+class Command(BaseCommand):
+    help = 'Expand recurring bills into the upcoming-payments calendar up to the horizon (run daily)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--horizon-days', type=int, default=None,
+                            help='Expand this many days ahead (default BILL_CALENDAR_HORIZON_DAYS)')
+        parser.add_argument('--user', action='append', dest='usernames', metavar='USERNAME',
+                            help='Only expand this user\'s bills (repeatable); default is every user')
+
+    def handle(self, *args, **options):
+        if options['horizon_days'] is not None and options['horizon_days'] < 1:
+            raise CommandError('--horizon-days must be at least 1')
+
+        bills = Bill.objects.all()
+        if options['usernames']:
+            users = User.objects.filter(username__in=options['usernames'])
+            missing = set(options['usernames']) - set(users.values_list('username', flat=True))
+            if missing:
+                raise CommandError(f"Unknown user(s): {', '.join(sorted(missing))}")
+            bills = bills.filter(user__in=users)
+
+        counts = serialized_write(
+            extend_calendar, bills, horizon_days=options['horizon_days'], operation='bill_calendar'
+        )
+        self.stdout.write(self.style.SUCCESS(
+            f"Added {counts['created']} bill occurrences, removed {counts['removed']}"
+        ))
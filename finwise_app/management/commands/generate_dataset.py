@@ -0,0 +1,344 @@
+import os
+import random
+import time
+from datetime import date, datetime, time as dt_time, timedelta
+from decimal import Decimal
+
+from django.contrib.auth.hashers import make_password
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction as db_transaction
+from django.utils import timezone
+
+from finwise_app.models import Account, Bill, Budget, Category, Transaction
+from finwise_app.services.bill_calendar import extend_calendar
+from finwise_app.services.categorization_service import (
+    TransactionCategorizationService,
+    create_default_categories,
+)
+
+# (name, memo, min cents, max cents, relative frequency)
+# Names contain the keywords used by create_default_categories() so imports
+# exercise the keyword rules; a few deliberately match nothing.
+MERCHANTS = [
+    ('SAFEWAY STORE 1234', 'Groceries', 1500, 18000, 10),
+    ('KROGER #552', 'Weekly groceries', 1500, 16000, 8),
+    ('WHOLE FOODS MARKET', 'Grocery shopping', 2000, 22000, 6),
+    ("TRADER JOE'S #88", 'Groceries', 1200, 9000, 5),
+    ('COSTCO WHOLESALE', 'Bulk groceries', 5000, 35000, 3),
+    ('SHELL OIL 5741', 'Fuel', 2500, 8000, 6),
+    ('CHEVRON 0091', 'Fuel', 2500, 8000, 5),
+    ('UBER TRIP', 'Ride', 800, 4500, 6),
+    ('LYFT RIDE', 'Ride', 800, 4000, 4),
+    ('CITY PARKING', 'Downtown parking', 300, 2500, 3),
+    ('STARBUCKS STORE 2211', 'Coffee', 350, 1500, 12),
+    ("MCDONALD'S F1234", 'Lunch', 600, 2000, 6),
+    ('DOMINOS PIZZA', 'Dinner delivery', 1500, 4500, 4),
+    ('DOORDASH ORDER', 'Food delivery', 1800, 6000, 5),
+    ('BLUE DOOR RESTAURANT', 'Dinner', 3000, 12000, 3),
+    ('AMAZON.COM MKTP', 'Online order', 1000, 25000, 10),
+    ('TARGET T-1420', 'Household items', 1500, 15000, 5),
+    ('BEST BUY 00451', 'Electronics', 3000, 90000, 1),
+    ('CITY ELECTRIC CO', 'Monthly electric bill', 6000, 20000, 1),
+    ('COMCAST INTERNET', 'Internet service', 5000, 9000, 1),
+    ('VERIZON WIRELESS PHONE', 'Phone bill', 4000, 12000, 1),
+    ('NETFLIX.COM', 'Streaming subscription', 1549, 1549, 1),
+    ('SPOTIFY USA', 'Music subscription', 1099, 1099, 1),
+    ('STEAM GAMES', 'Game purchase', 500, 6000, 1),
+    ('AMC MOVIE THEATER', 'Movie tickets', 1200, 4000, 1),
+    ('CVS PHARMACY #1122', 'Prescription', 500, 6000, 3),
+    ('WALGREENS #7781', 'Pharmacy', 500, 4000, 2),
+    ('CITY MEDICAL CLINIC', 'Copay', 2000, 15000, 1),
+    ('VENMO TRANSFER', 'Transfer to friend', 1000, 10000, 3),
+    ('ATM WITHDRAWAL', 'Cash', 2000, 20000, 2),
+]
+
+BILL_TEMPLATES = [
+    ('Rent', 'MONTHLY', 120000, 1),
+    ('Electric Bill', 'MONTHLY', 9000, 12),
+    ('Internet', 'MONTHLY', 6500, 18),
+    ('Phone', 'MONTHLY', 7500, 22),
+    ('Streaming Services', 'MONTHLY', 2648, 5),
+    ('Car Insurance', 'QUARTERLY', 42000, 15),
+]
+
+# History ends here unless --end-date is given, so a seed always yields the
+# same rows whatever day the command runs
+DEFAULT_END_DATE = date(2026, 6, 30)
+
+BUDGET_CATEGORIES = ['Groceries', 'Restaurants', 'Gas & Transportation', 'Shopping', 'Entertainment']
+GOAL_CATEGORIES = ['Income']
+
+
+class Command(BaseCommand):
+    help = 'Generate a deterministic synthetic dataset (users, accounts, budgets, bills, transactions)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--users', type=int, default=10, help='Number of users to create')
+        parser.add_argument('--txns-per-user', type=int, default=1000, help='Transactions per user')
+        parser.add_argument('--years', type=float, default=2, help='Years of history to spread transactions over')
+        parser.add_argument('--seed', type=int, default=42, help='Random seed; same seed gives the same dataset')
+        parser.add_argument('--end-date', type=str, default=DEFAULT_END_DATE.isoformat(),
+                            help=f'Last day of history (YYYY-MM-DD or "today", default {DEFAULT_END_DATE})')
+        parser.add_argument('--prefix', type=str, default='synthetic_', help='Username prefix for generated users')
+        parser.add_argument('--password', type=str, default='finwise-synthetic', help='Password for every generated user')
+        parser.add_argument('--batch-size', type=int, default=5000, help='Rows per bulk insert')
+        parser.add_argument('--ofx-dir', type=str, default='', help='Also write one OFX file per account to this directory')
+        parser.add_argument('--no-db', action='store_true', help='Only write OFX files (requires --ofx-dir)')
+        parser.add_argument('--clear', action='store_true', help='Delete existing non-staff users with the same prefix first')
+
+    def handle(self, *args, **options):
+        if options['no_db'] and not options['ofx_dir']:
+            raise CommandError('--no-db requires --ofx-dir')
+        if options['clear'] and not options['prefix'].strip():
+            raise CommandError('--clear requires a non-empty --prefix')
+
+        try:
+            end_date = date.today() if options['end_date'] == 'today' else date.fromisoformat(options['end_date'])
+        except ValueError:
+            raise CommandError('--end-date must be YYYY-MM-DD or "today"')
+
+        self.seed = options['seed']
+        self.end_date = end_date
+        self.start_date = end_date - timedelta(days=int(365 * options['years']))
+        self.batch_size = options['batch_size']
+        prefix = options['prefix']
+        write_db = not options['no_db']
+
+        if options['ofx_dir']:
+            os.makedirs(options['ofx_dir'], exist_ok=True)
+
+        if write_db:
+            if options['clear']:
+                deleted, _ = User.objects.filter(
+                    username__startswith=prefix, is_staff=False, is_superuser=False
+                ).delete()
+                self.stdout.write(self.style.WARNING(f'Deleted {deleted} existing rows for prefix {prefix!r}'))
+                if User.objects.filter(username__startswith=prefix).exists():
+                    raise CommandError(f'Staff users with prefix {prefix!r} exist and are never cleared; use another --prefix')
+            elif User.objects.filter(username__startswith=prefix).exists():
+                raise CommandError(f'Users with prefix {prefix!r} already exist; use --clear or another --prefix')
+
+            create_default_categories()
+            self.categories = {c.name: c for c in Category.objects.filter(is_active=True)}
+            categorizer = TransactionCategorizationService()
+            categorizer.clear_cache()
+            self.keyword_categories = categorizer.get_active_categories()
+            self.categorizer = categorizer
+            uncategorized, _ = Category.objects.get_or_create(
+                name="Uncategorized",
+                defaults={
+                    "description": "Transactions that couldn't be automatically categorized",
+                    "color": "#9CA3AF",
+                    "keywords": ""
+                }
+            )
+            self.uncategorized_id = uncategorized.id
+            password_hash = make_password(options['password'])
+
+        self.merchant_weights = [m[4] for m in MERCHANTS]
+        started = time.perf_counter()
+        total_txns = 0
+
+        for index in range(options['users']):
+            username = f'{prefix}{index:05d}'
+            # One generator per user so output does not depend on --users or on
+            # whether the database rows are written
+            self.rnd = random.Random(f"{self.seed}:{index}")
+            accounts = self._account_specs(index)
+            txns = self._transactions(index, accounts, options['txns_per_user'])
+            total_txns += len(txns)
+
+            if options['ofx_dir']:
+                for spec in accounts:
+                    rows = [t for t in txns if t['account'] == spec['account_id']]
+                    path = os.path.join(options['ofx_dir'], f"{username}-{spec['account_id']}.ofx")
+                    with open(path, 'w', encoding='ascii', errors='replace') as fh:
+                        fh.write(self._render_ofx(spec, rows))
+
+            if write_db:
+                self._persist_user(username, password_hash, accounts, txns)
+
+            self.stdout.write(f'  {username}: {len(txns)} transactions')
+
+        elapsed = time.perf_counter() - started
+        self.stdout.write(self.style.SUCCESS(
+            f"\nGenerated {options['users']} users and {total_txns} transactions in {elapsed:.1f}s"
+            + (f" (OFX files in {options['ofx_dir']})" if options['ofx_dir'] else '')
+        ))
+
+    # Generation
+
+    def _account_specs(self, index: int) -> list[dict]:
+        return [
+            {'type': 'BANK', 'bank_id': f'{121000000 + index % 1000:09d}', 'account_id': f'CHK{index:07d}', 'name': 'Checking'},
+            {'type': 'CREDITCARD', 'bank_id': None, 'account_id': f'CC{index:08d}', 'name': 'Credit Card'},
+        ]
+
+    def _transactions(self, index: int, accounts: list[dict], count: int) -> list[dict]:
+        rnd = self.rnd
+        span_seconds = max(1, int((self.end_date - self.start_date).total_seconds()) + 86399)
+        start = datetime.combine(self.start_date, dt_time.min)
+        txns = []
+
+        # Biweekly payroll into checking, about one in twelve rows
+        payroll_cents = rnd.randint(180000, 520000)
+        payday = self.start_date + timedelta(days=rnd.randint(0, 13))
+        while payday <= self.end_date and len(txns) < count // 12:
+            txns.append({
+                'account': accounts[0]['account_id'],
+                'posted': datetime.combine(payday, dt_time(9, 0)),
+                'cents': payroll_cents + rnd.randint(-2000, 2000),
+                'name': 'ACME CORP PAYROLL',
+                'memo': 'Salary direct deposit',
+            })
+            payday += timedelta(days=14)
+
+        for _ in range(count - len(txns)):
+            name, memo, low, high, _weight = rnd.choices(MERCHANTS, weights=self.merchant_weights)[0]
+            txns.append({
+                'account': accounts[0 if rnd.random() < 0.4 else 1]['account_id'],
+                'posted': start + timedelta(seconds=rnd.randrange(span_seconds)),
+                'cents': -rnd.randint(low, high),
+                'name': name,
+                'memo': memo,
+            })
+
+        txns.sort(key=lambda t: t['posted'])
+        for position, txn in enumerate(txns):
+            txn['fitid'] = f'{index:05d}{position:09d}'
+        return txns
+
+    # Persistence
+
+    def _persist_user(self, username: str, password_hash: str, accounts: list[dict], txns: list[dict]) -> None:
+        rnd = self.rnd
+        now = timezone.now()
+
+        with db_transaction.atomic():
+            user = User.objects.create(username=username, email=f'{username}@example.com', password=password_hash)
+
+            account_objs = {}
+            for spec in accounts:
+                account_objs[spec['account_id']] = Account.objects.create(
+                    user=user,
+                    type=spec['type'],
+                    bank_id=spec['bank_id'],
+                    account_id=spec['account_id'],
+                    name=spec['name'],
+                )
+
+            batch = []
+            for txn in txns:
+                text = f"{txn['name']} {txn['memo']}"
+                category_id = self.categorizer.find_category_id(text, self.keyword_categories) or self.uncategorized_id
+                batch.append(Transaction(
+                    account=account_objs[txn['account']],
+                    fitid=txn['fitid'],
+                    posted_date=timezone.make_aware(txn['posted']),
+                    amount=Decimal(txn['cents']) / 100,
+                    trntype='CREDIT' if txn['cents'] > 0 else 'DEBIT',
+                    name=txn['name'],
+                    memo=txn['memo'],
+                    currency='USD',
+                    category_id=category_id,
+                    is_categorized=True,
+                    categorized_at=now,
+                ))
+                if len(batch) >= self.batch_size:
+                    Transaction.objects.bulk_create(batch)
+                    batch = []
+            if batch:
+                Transaction.objects.bulk_create(batch)
+
+            # Budgets for the last three months and the current one, plus a savings goal
+            budgets = []
+            month = self.end_date.replace(day=1)
+            for _ in range(4):
+                for name in BUDGET_CATEGORIES:
+                    category = self.categories.get(name)
+                    if category:
+                        budgets.append(Budget(
+                            user=user,
+                            category=category,
+                            amount=Decimal(rnd.randrange(150, 900, 25)),
+                            budget_type='BUDGET',
+                            month=month,
+                        ))
+                month = (month - timedelta(days=1)).replace(day=1)
+            for name in GOAL_CATEGORIES:
+                category = self.categories.get(name)
+                if category:
+                    budgets.append(Budget(
+                        user=user,
+                        category=category,
+                        amount=Decimal(rnd.randrange(1000, 10000, 500)),
+                        budget_type='GOAL',
+                        month=self.end_date.replace(day=1),
+                    ))
+            Budget.objects.bulk_create(budgets)
+
+            # Recurring bills around the end date, some already past due
+            bills = []
+            for name, frequency, cents, due_day in BILL_TEMPLATES:
+                due_date = self.end_date.replace(day=min(due_day, 28))
+                if rnd.random() < 0.5:
+                    due_date = (due_date.replace(day=1) + timedelta(days=32)).replace(day=min(due_day, 28))
+                bills.append(Bill(
+                    user=user,
+                    name=name,
+                    amount=Decimal(cents + rnd.randint(-cents // 10, cents // 10)) / 100,
+                    due_date=due_date,
+                    frequency=frequency,
+                    category=self.categories.get('Bills & Utilities'),
+                    reminder_days=rnd.choice([1, 3, 5, 7]),
+                ))
+            Bill.objects.bulk_create(bills)
+            extend_calendar(Bill.objects.filter(user=user))
+
+    # OFX output
+
+    def _render_ofx(self, spec: dict, txns: list[dict]) -> str:
+        fmt = '%Y%m%d%H%M%S'
+        server_time = datetime.combine(self.end_date, dt_time(12, 0)).strftime(fmt)
+        lines = [
+            'OFXHEADER:100', 'DATA:OFXSGML', 'VERSION:102', 'SECURITY:NONE', 'ENCODING:USASCII',
+            'CHARSET:1252', 'COMPRESSION:NONE', 'OLDFILEUID:NONE', 'NEWFILEUID:NONE', '',
+            '<OFX>', '<SIGNONMSGSRSV1>', '<SONRS>', '<STATUS>', '<CODE>0', '<SEVERITY>INFO', '</STATUS>',
+            f'<DTSERVER>{server_time}', '<LANGUAGE>ENG', '<FI>', '<ORG>FINWISE SYNTHETIC BANK', '<FID>999999',
+            '</FI>', '</SONRS>', '</SIGNONMSGSRSV1>',
+        ]
+
+        if spec['type'] == 'BANK':
+            lines += ['<BANKMSGSRSV1>', '<STMTTRNRS>', '<TRNUID>1', '<STATUS>', '<CODE>0', '<SEVERITY>INFO',
+                      '</STATUS>', '<STMTRS>', '<CURDEF>USD', '<BANKACCTFROM>', f"<BANKID>{spec['bank_id']}",
+                      f"<ACCTID>{spec['account_id']}", '<ACCTTYPE>CHECKING', '</BANKACCTFROM>']
+        else:
+            lines += ['<CREDITCARDMSGSRSV1>', '<CCSTMTTRNRS>', '<TRNUID>1', '<STATUS>', '<CODE>0',
+                      '<SEVERITY>INFO', '</STATUS>', '<CCSTMTRS>', '<CURDEF>USD', '<CCACCTFROM>',
+                      f"<ACCTID>{spec['account_id']}", '</CCACCTFROM>']
+
+        lines += ['<BANKTRANLIST>', f"<DTSTART>{self.start_date.strftime('%Y%m%d')}000000",
+                  f"<DTEND>{self.end_date.strftime('%Y%m%d')}235959"]
+        balance = 0
+        for txn in txns:
+            balance += txn['cents']
+            lines += [
+                '<STMTTRN>',
+                f"<TRNTYPE>{'CREDIT' if txn['cents'] > 0 else 'DEBIT'}",
+                f"<DTPOSTED>{txn['posted'].strftime(fmt)}",
+                f"<TRNAMT>{Decimal(txn['cents']) / 100:.2f}",
+                f"<FITID>{txn['fitid']}",
+                f"<NAME>{txn['name'][:32]}",
+                f"<MEMO>{txn['memo']}",
+                '</STMTTRN>',
+            ]
+        lines += ['</BANKTRANLIST>', '<LEDGERBAL>', f'<BALAMT>{Decimal(balance) / 100:.2f}',
+                  f'<DTASOF>{server_time}', '</LEDGERBAL>']
+
+        if spec['type'] == 'BANK':
+            lines += ['</STMTRS>', '</STMTTRNRS>', '</BANKMSGSRSV1>']
+        else:
+            lines += ['</CCSTMTRS>', '</CCSTMTTRNRS>', '</CREDITCARDMSGSRSV1>']
+        lines.append('</OFX>')
+        return '\n'.join(lines) + '\n'
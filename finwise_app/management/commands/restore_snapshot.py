@@ -0,0 +1,52 @@
+import time
+
+import numpy as np
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction as db_transaction
+
+from finwise_app.services.snapshot import SnapshotError, read_meta, restore_snapshot
+from finwise_app.services.write_queue import serialized_write
+
+
+class Command(BaseCommand):
+    help = 'Bulk-load a snapshot written by export_snapshot into an empty or new user'
+
+    def add_arguments(self, parser):
+        parser.add_argument('snapshot')
+        parser.add_argument('--username', help="Restore into this user instead of the snapshot's username")
+
+    def handle(self, *args, **options):
+        try:
+            with np.load(options['snapshot'], allow_pickle=False) as arrays:
+                meta = read_meta(arrays)
+        except (OSError, ValueError) as exc:
+            raise CommandError(f"Cannot read {options['snapshot']}: {exc}")
+
+        fields = dict(meta['user'])
+        username = options['username'] or fields.pop('username')
+        fields.pop('username', None)
+        password = fields.pop('password', None)
+
+        def restore():
+            with db_transaction.atomic():
+                user, created = User.objects.get_or_create(username=username, defaults=fields)
+                if created:
+                    if password:
+                        user.password = password
+                    else:
+                        user.set_unusable_password()
+                    user.save(update_fields=['password'])
+                return user, created, restore_snapshot(options['snapshot'], user)
+
+        started = time.perf_counter()
+        try:
+            user, created, counts = serialized_write(restore, operation='restore_snapshot')
+        except SnapshotError as exc:
+            raise CommandError(str(exc))
+
+        detail = ', '.join(f'{count} {table}' for table, count in counts.items() if count)
+        self.stdout.write(self.style.SUCCESS(
+            f"Restored into {'new' if created else 'existing'} user {user.username} "
+            f"in {time.perf_counter() - started:.2f}s: {detail}"
+        ))
@@ -0,0 +1,28 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from finwise_app.services.bulk_delete import claim_next, requeue_stale, run_job
+
+
+class Command(BaseCommand):
+    help = 'Run queued background deletions (large data cleanups and account deletions)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--poll-interval', type=float, default=2.0, help='Seconds between queue checks')
+        parser.add_argument('--once', action='store_true', help='Drain the queue once, then exit')
+
+    def handle(self, *args, **options):
+        while True:
+            requeued = requeue_stale()
+            if requeued:
+                self.stdout.write(f'Resuming {requeued} deletion jobs whose worker stopped')
+
+            job = claim_next()
+            if job is not None:
+                job = run_job(job)
+                self.stdout.write(f'Deletion {job.id} (user {job.user_id}): {job.status}, {job.deleted} rows')
+                continue
+            if options['once']:
+                break
+            time.sleep(options['poll_interval'])
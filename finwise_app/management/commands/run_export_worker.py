@@ -0,0 +1,61 @@
+import os
+import threading
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.db import connections
+
+from finwise_app.services.export_jobs import claim_next, expire_old, fail_stale, run_job
+
+
+class Command(BaseCommand):
+    help = 'Process queued data exports and delete expired export artifacts'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--threads', type=int, default=None,
+                            help='Jobs this worker runs at once (default EXPORT_MAX_CONCURRENT; '
+                                 'the global cap still applies)')
+        parser.add_argument('--poll-interval', type=float, default=2.0, help='Seconds between queue checks')
+        parser.add_argument('--cleanup-interval', type=float, default=300.0,
+                            help='Seconds between retention sweeps')
+        parser.add_argument('--nice', type=int, default=10,
+                            help='Lower this process priority so exports yield CPU to web workers (0 = off)')
+        parser.add_argument('--once', action='store_true', help='Drain the queue once, then exit')
+
+    def handle(self, *args, **options):
+        if options['nice'] and hasattr(os, 'nice'):
+            os.nice(options['nice'])
+        threads = max(1, options['threads'] or settings.EXPORT_MAX_CONCURRENT)
+        slots = threading.Semaphore(threads)
+        workers: list[threading.Thread] = []
+        last_cleanup = 0.0
+
+        def work(job):
+            try:
+                job = run_job(job)
+                self.stdout.write(f'Export {job.id} ({job.format}, user {job.user_id}): {job.status}')
+            finally:
+                connections.close_all()
+                slots.release()
+
+        while True:
+            if time.monotonic() - last_cleanup >= options['cleanup_interval']:
+                stale, expired = fail_stale(), expire_old()
+                if stale or expired:
+                    self.stdout.write(f'Failed {stale} stale and expired {expired} old exports')
+                last_cleanup = time.monotonic()
+
+            while slots.acquire(blocking=False):
+                job = claim_next()
+                if job is None:
+                    slots.release()
+                    break
+                thread = threading.Thread(target=work, args=(job,), name=f'finwise-export-{job.id}', daemon=True)
+                thread.start()
+                workers.append(thread)
+
+            workers = [thread for thread in workers if thread.is_alive()]
+            if options['once'] and not workers:
+                break
+            time.sleep(options['poll_interval'] if not options['once'] else 0.1)
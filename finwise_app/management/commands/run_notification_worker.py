@@ -0,0 +1,38 @@
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import close_old_connections
+
+from finwise_app.services.notifications import claim_batch, deliver, purge_sent
+
+
+class Command(BaseCommand):
+    help = 'Deliver queued notifications in batches per transport, retrying failures with backoff'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=None,
+                            help='Notifications claimed per round (default NOTIFICATION_BATCH_SIZE)')
+        parser.add_argument('--poll-interval', type=float, default=2.0,
+                            help='Seconds to wait when the outbox is empty')
+        parser.add_argument('--once', action='store_true', help='Deliver what is due now, then exit')
+
+    def handle(self, *args, **options):
+        last_purge = 0.0
+        while True:
+            if time.monotonic() - last_purge >= 3600:
+                purged = purge_sent()
+                if purged:
+                    self.stdout.write(f'Purged {purged} old notifications')
+                last_purge = time.monotonic()
+
+            batch = claim_batch(options['batch_size'])
+            if batch:
+                counts = deliver(batch)
+                self.stdout.write(
+                    f"Sent {counts['sent']}, retrying {counts['retry']}, failed {counts['failed']}"
+                )
+                continue
+            if options['once']:
+                break
+            time.sleep(options['poll_interval'])
+            close_old_connections()
@@ -0,0 +1,48 @@
+import json
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from django.core.management.base import BaseCommand
+
+
+class Command(BaseCommand):
+    help = 'Local HTTP endpoint standing in for a push service; prints the notifications it receives'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--host', default='127.0.0.1')
+        parser.add_argument('--port', type=int, default=8765)
+        parser.add_argument('--fail', action='store_true', help='Answer every request with HTTP 503 (to exercise retries)')
+
+    def handle(self, *args, **options):
+        command = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_POST(self):
+                if options['fail']:
+                    self.send_error(503, 'Push stub is failing on purpose')
+                    return
+                length = int(self.headers.get('Content-Length') or 0)
+                try:
+                    notifications = json.loads(self.rfile.read(length))['notifications']
+                except (ValueError, KeyError):
+                    self.send_error(400, 'Expected {"notifications": [...]}')
+                    return
+                for notification in notifications:
+                    command.stdout.write(f"push to {notification['recipient']}: {notification['subject']}")
+                self.send_response(202)
+                self.send_header('Content-Length', '0')
+                self.end_headers()
+
+            def log_message(self, format, *args):
+                pass
+
+        server = ThreadingHTTPServer((options['host'], options['port']), Handler)
+        self.stdout.write(
+            f"Push stub listening on http://{options['host']}:{options['port']}/ "
+            f"(set FINWISE_PUSH_URL to use it)"
+        )
+        try:
+            server.serve_forever()
+        except KeyboardInterrupt:
+            pass
+        finally:
+            server.server_close()
@@ -0,0 +1,39 @@
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import close_old_connections
+from django.utils import timezone
+
+from finwise_app.services.reminders import ReminderScheduler
+
+
+class Command(BaseCommand):
+    help = 'Send bill reminders as they fall due, sleeping until the next one'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--poll-interval', type=float, default=60.0,
+                            help='Longest sleep between checks for added, edited or paid bills (seconds)')
+        parser.add_argument('--once', action='store_true', help='Send the reminders due now, then exit')
+
+    def handle(self, *args, **options):
+        scheduler = ReminderScheduler()
+        scheduler.load(timezone.localdate())
+        self.stdout.write(f'Scheduled {len(scheduler)} reminders')
+
+        while True:
+            sent = scheduler.send_due()
+            if sent:
+                self.stdout.write(f'Sent {sent} bill reminders')
+            if options['once']:
+                break
+
+            # Sleep until the next reminder is due, but wake up often enough to
+            # see bill changes and the day rolling over
+            timeout = options['poll_interval']
+            next_due = scheduler.next_due()
+            if next_due is not None:
+                timeout = min(timeout, max(0.0, (next_due - timezone.now()).total_seconds()))
+            time.sleep(timeout)
+
+            close_old_connections()
+            scheduler.refresh(timezone.localdate())
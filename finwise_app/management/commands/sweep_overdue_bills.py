@@ -0,0 +1,28 @@
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import close_old_connections
+
+from finwise_app.services.bills import SWEEP_CHUNK_SIZE, sweep_overdue
+from finwise_app.services.write_queue import serialized_write
+
+
+class Command(BaseCommand):
+    help = 'Mark pending bills past their due date as overdue, for all users'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--every', type=float, default=0, metavar='SECONDS',
+                            help='Keep running and sweep at this interval (default: sweep once and exit)')
+        parser.add_argument('--chunk-size', type=int, default=SWEEP_CHUNK_SIZE)
+
+    def handle(self, *args, **options):
+        if options['every'] < 0:
+            raise CommandError('--every must not be negative')
+
+        while True:
+            swept = serialized_write(sweep_overdue, chunk_size=options['chunk_size'], operation='sweep_overdue')
+            self.stdout.write(f'Marked {swept} bills overdue')
+            if not options['every']:
+                break
+            time.sleep(options['every'])
+            close_old_connections()
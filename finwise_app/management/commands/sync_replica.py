@@ -0,0 +1,54 @@
+import sqlite3
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connections
+
+from finwise_app.db_router import REPLICA_ALIAS, replica_configured
+
+
+class Command(BaseCommand):
+    help = 'Copy the default SQLite database into the replica file (local read-replica stand-in)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--interval', type=float, default=0,
+                            help='Keep copying every N seconds to simulate replication lag (0 = copy once)')
+        parser.add_argument('--pages', type=int, default=1024,
+                            help='Pages copied per backup step; smaller steps hold the source lock for less time')
+
+    def handle(self, *args, **options):
+        if not replica_configured():
+            raise CommandError('No replica configured; set FINWISE_REPLICA_DB to the replica file path')
+
+        source = settings.DATABASES['default']
+        replica = settings.DATABASES[REPLICA_ALIAS]
+        if source['ENGINE'] != 'django.db.backends.sqlite3' or replica['ENGINE'] != 'django.db.backends.sqlite3':
+            raise CommandError(
+                'sync_replica only copies SQLite files; for Postgres use streaming replication '
+                'or pg_dump | pg_restore into the replica database'
+            )
+        if str(source['NAME']) == str(replica['NAME']):
+            raise CommandError('The replica must be a different file from the default database')
+
+        while True:
+            started = time.perf_counter()
+            self.copy(str(source['NAME']), str(replica['NAME']), options['pages'])
+            self.stdout.write(self.style.SUCCESS(
+                f"Copied {source['NAME']} -> {replica['NAME']} in {time.perf_counter() - started:.2f}s"
+            ))
+            if not options['interval']:
+                break
+            time.sleep(options['interval'])
+
+    def copy(self, source_path: str, replica_path: str, pages: int) -> None:
+        # The online backup API copies a consistent snapshot while the source
+        # stays writable, and replaces the replica's pages in place
+        connections[REPLICA_ALIAS].close()
+        src = sqlite3.connect(source_path)
+        dst = sqlite3.connect(replica_path)
+        try:
+            src.backup(dst, pages=pages)
+        finally:
+            dst.close()
+            src.close()
@@ -0,0 +1,317 @@
+"""
+In-process metrics registry with Prometheus text exposition
+Counters and histograms are updated in memory; when FINWISE_METRICS_DIR is
+set each process writes its values to a per-process file from a background
+thread (and at exit), and the /metrics endpoint sums all of them, so
+multi-worker deployments report one aggregated view. Updating a metric never
+does file I/O.
+
+Values live for the lifetime of a process; a forked worker starts from zero
+rather than repeating its parent's values. Files carry a per-process token
+next to the pid, so a reused pid never overwrites another process's file,
+and a file not rewritten for METRICS_STALE_SECONDS (its worker is gone) is
+deleted at collection. Counters therefore drop when a worker exits, which
+Prometheus' rate() and increase() treat as a counter reset.
+"""
+from __future__ import annotations
+
+import atexit
+import glob
+import json
+import math
+import os
+import threading
+import time
+import uuid
+from bisect import bisect_left
+from contextlib import contextmanager
+
+from django.conf import settings
+
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+FLUSH_INTERVAL = 5.0  # seconds between per-process snapshot writes
+
+
+class _Metric:
+    kind = ""
+
+    def __init__(self, name: str, documentation: str, labelnames: tuple[str, ...] = (), registry=None):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._values: dict[tuple, object] = {}
+        self._lock = threading.Lock()
+        (registry or REGISTRY).register(self)
+
+    def _key(self, labels: dict) -> tuple:
+        if len(labels) != len(self.labelnames):
+            raise ValueError(f"{self.name} expects labels {self.labelnames}, got {tuple(labels)}")
+        return tuple(str(labels[name]) for name in self.labelnames)
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            samples = [[list(key), _copy(value)] for key, value in self._values.items()]
+        return {
+            "type": self.kind,
+            "help": self.documentation,
+            "labelnames": list(self.labelnames),
+            "samples": samples,
+        }
+
+
+class Counter(_Metric):
+    """Monotonically increasing value"""
+    kind = "counter"
+
+    def inc(self, amount: float = 1, **labels) -> None:
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+        REGISTRY.ensure_flusher()
+
+
+class Histogram(_Metric):
+    """Distribution of observed values in fixed cumulative buckets"""
+    kind = "histogram"
+
+    def __init__(self, name: str, documentation: str, labelnames: tuple[str, ...] = (), buckets=DEFAULT_BUCKETS, registry=None):
+        self.buckets = tuple(sorted(buckets))
+        super().__init__(name, documentation, labelnames, registry)
+
+    def observe(self, value: float, **labels) -> None:
+        key = self._key(labels)
+        index = bisect_left(self.buckets, value)
+        with self._lock:
+            state = self._values.get(key)
+            if state is None:
+                # Per-bucket (non-cumulative) counts, the +Inf overflow bucket, then sum
+                state = self._values[key] = [0] * (len(self.buckets) + 1) + [0.0]
+            state[index] += 1
+            state[-1] += value
+        REGISTRY.ensure_flusher()
+
+    @contextmanager
+    def time(self, **labels):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - start, **labels)
+
+    def snapshot(self) -> dict:
+        data = super().snapshot()
+        data["buckets"] = list(self.buckets)
+        return data
+
+
+def _copy(value):
+    return list(value) if isinstance(value, list) else value
+
+
+class Registry:
+    def __init__(self):
+        self._metrics: dict[str, _Metric] = {}
+        self._flush_lock = threading.Lock()
+        self._flusher_lock = threading.Lock()
+        # Pid the flusher thread runs in; forked workers start their own
+        self._flusher_pid: int | None = None
+        # Snapshot file of this process, keyed by pid so forked workers get their own
+        self._path: tuple[int, str] | None = None
+
+    def register(self, metric: _Metric) -> None:
+        if metric.name in self._metrics:
+            raise ValueError(f"Metric {metric.name} is already registered")
+        self._metrics[metric.name] = metric
+
+    def snapshot(self) -> dict:
+        return {name: metric.snapshot() for name, metric in self._metrics.items()}
+
+    def reset_after_fork(self) -> None:
+        """Start a forked child from zero; the parent's values stay in the parent's file"""
+        for metric in self._metrics.values():
+            metric._values = {}
+            metric._lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+        self._flusher_lock = threading.Lock()
+
+    # Multi-process support
+
+    @staticmethod
+    def metrics_dir() -> str | None:
+        return getattr(settings, "METRICS_DIR", None) or None
+
+    def _snapshot_path(self, directory: str) -> str:
+        pid = os.getpid()
+        if self._path is None or self._path[0] != pid:
+            self._path = (pid, os.path.join(directory, f"metrics-{pid}-{uuid.uuid4().hex[:12]}.json"))
+        return self._path[1]
+
+    def ensure_flusher(self) -> None:
+        """Start this process's background flush thread if it is not running; cheap otherwise"""
+        if self._flusher_pid == os.getpid():
+            return
+        with self._flusher_lock:
+            if self._flusher_pid == os.getpid() or not self.metrics_dir():
+                return
+            self._flusher_pid = os.getpid()
+        threading.Thread(target=self._flush_loop, name="metrics-flush", daemon=True).start()
+
+    def _flush_loop(self) -> None:
+        while True:
+            time.sleep(FLUSH_INTERVAL)
+            self.flush()
+
+    def flush(self) -> None:
+        directory = self.metrics_dir()
+        if not directory:
+            return
+        if not self._flush_lock.acquire(blocking=False):
+            return
+        try:
+            os.makedirs(directory, exist_ok=True)
+            path = self._snapshot_path(directory)
+            tmp_path = f"{path}.tmp"
+            with open(tmp_path, "w", encoding="utf-8") as fh:
+                json.dump(self.snapshot(), fh)
+            os.replace(tmp_path, path)
+        except OSError:
+            pass
+        finally:
+            self._flush_lock.release()
+
+    def collect(self) -> dict:
+        """Snapshot summed across every process that has written to the metrics directory"""
+        directory = self.metrics_dir()
+        if not directory:
+            return self.snapshot()
+
+        self.flush()
+        own_path = self._snapshot_path(directory)
+        stale_before = time.time() - settings.METRICS_STALE_SECONDS
+        merged: dict = {}
+        for path in glob.glob(os.path.join(directory, "metrics-*.json")):
+            try:
+                if path != own_path and os.path.getmtime(path) < stale_before:
+                    # Its process has exited
+                    os.remove(path)
+                    continue
+                with open(path, encoding="utf-8") as fh:
+                    data = json.load(fh)
+            except (OSError, ValueError):
+                continue
+            for name, metric in data.items():
+                target = merged.setdefault(name, {**metric, "samples": {}})
+                for key, value in metric["samples"]:
+                    key = tuple(key)
+                    current = target["samples"].get(key)
+                    if current is None:
+                        target["samples"][key] = value
+                    elif isinstance(value, list):
+                        target["samples"][key] = [a + b for a, b in zip(current, value)]
+                    else:
+                        target["samples"][key] = current + value
+        for metric in merged.values():
+            metric["samples"] = [[list(k), v] for k, v in metric["samples"].items()]
+        return merged
+
+    def render(self) -> str:
+        """Prometheus text exposition format (version 0.0.4)"""
+        lines = []
+        for name, metric in sorted(self.collect().items()):
+            lines.append(f"# HELP {name} {metric['help']}")
+            lines.append(f"# TYPE {name} {metric['type']}")
+            labelnames = metric["labelnames"]
+            for key, value in metric["samples"]:
+                labels = list(zip(labelnames, key))
+                if metric["type"] == "histogram":
+                    cumulative = 0
+                    for bound, count in zip(metric["buckets"] + [math.inf], value[:-1]):
+                        cumulative += count
+                        le = "+Inf" if bound == math.inf else _format_value(bound)
+                        lines.append(f"{name}_bucket{_format_labels(labels + [('le', le)])} {cumulative}")
+                    lines.append(f"{name}_sum{_format_labels(labels)} {_format_value(value[-1])}")
+                    lines.append(f"{name}_count{_format_labels(labels)} {cumulative}")
+                else:
+                    lines.append(f"{name}{_format_labels(labels)} {_format_value(value)}")
+        return "\n".join(lines) + "\n"
+
+
+def _escape(value) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_labels(labels) -> str:
+    if not labels:
+        return ""
+    return "{" + ",".join(f'{name}="{_escape(value)}"' for name, value in labels) + "}"
+
+
+def _format_value(value) -> str:
+    if isinstance(value, float) and value.is_integer():
+        return str(int(value))
+    return repr(value) if isinstance(value, float) else str(value)
+
+
+REGISTRY = Registry()
+atexit.register(REGISTRY.flush)
+os.register_at_fork(after_in_child=REGISTRY.reset_after_fork)
+
+
+# Application metrics
+
+HTTP_REQUEST_DURATION = Histogram(
+    "finwise_http_request_duration_seconds",
+    "Wall time per request by view",
+    ("view", "method"),
+)
+HTTP_REQUESTS = Counter(
+    "finwise_http_requests_total",
+    "Requests by view, method and status code",
+    ("view", "method", "status"),
+)
+OFX_PARSE_DURATION = Histogram(
+    "finwise_ofx_parse_seconds",
+    "Time to parse an OFX file by parser",
+    ("parser",),
+)
+IMPORT_DURATION = Histogram(
+    "finwise_import_duration_seconds",
+    "End-to-end OFX import time (parse, persist, categorize) by parser",
+    ("parser",),
+)
+IMPORT_ROWS = Counter(
+    "finwise_import_rows_total",
+    "Transactions created by OFX imports by parser",
+    ("parser",),
+)
+IMPORT_ROWS_PER_SECOND = Histogram(
+    "finwise_import_rows_per_second",
+    "Import throughput (parsed rows / second) per import by parser",
+    ("parser",),
+    buckets=(10, 50, 100, 250, 500, 1000, 2500, 5000, 10000, 50000),
+)
+CATEGORIZATION_DURATION = Histogram(
+    "finwise_categorization_seconds",
+    "Categorization latency per call (single transaction or bulk batch)",
+    ("mode",),
+)
+CATEGORIZED_TRANSACTIONS = Counter(
+    "finwise_categorized_transactions_total",
+    "Transactions categorized by mode and result (matched a keyword, or fell back to Uncategorized)",
+    ("mode", "result"),
+)
+CACHE_REQUESTS = Counter(
+    "finwise_cache_requests_total",
+    "Cache lookups by cache and result (hit/miss); hit ratio = hit / (hit + miss)",
+    ("cache", "result"),
+)
+DB_WRITE_QUEUE_WAIT = Histogram(
+    "finwise_db_write_queue_wait_seconds",
+    "Time a serialized write waited for the writer thread, by operation",
+    ("operation",),
+)
+DB_WRITE_DURATION = Histogram(
+    "finwise_db_write_seconds",
+    "Time a serialized write ran on the writer thread, by operation",
+    ("operation",),
+)
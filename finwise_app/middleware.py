@@ -0,0 +1,117 @@
+import json
+import logging
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+
+from .db_router import mark_recent_write, replica_configured
+from .instrumentation import acollect_request_stats, collect_request_stats, get_view_budget
+from .metrics import HTTP_REQUEST_DURATION, HTTP_REQUESTS
+
+logger = logging.getLogger("finwise_app.performance")
+
+
+class QueryInstrumentationMiddleware:
+    """
+    Record query count, database time and wall time for every request.
+
+    With DEBUG on the figures are returned as response headers; otherwise one
+    structured (JSON) log line is written per request at DEBUG level. Requests
+    that exceed the view's declared budget are logged as warnings in both
+    modes.
+
+    Works in sync and async chains, so under ASGI the async API views are
+    not forced back onto a thread.
+    """
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.async_mode = iscoroutinefunction(get_response)
+        if self.async_mode:
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if self.async_mode:
+            return self.__acall__(request)
+        with collect_request_stats() as stats:
+            response = self.get_response(request)
+        return self.record(request, response, stats)
+
+    async def __acall__(self, request):
+        async with acollect_request_stats() as stats:
+            response = await self.get_response(request)
+        return self.record(request, response, stats)
+
+    def record(self, request, response, stats):
+        match = getattr(request, "resolver_match", None)
+        view_name = (match.view_name or match._func_path) if match else None
+        budget = get_view_budget(match.func) if match else None
+        violations = stats.violations(budget)
+
+        metric_view = view_name or "unmatched"
+        HTTP_REQUEST_DURATION.observe(stats.wall_time, view=metric_view, method=request.method)
+        HTTP_REQUESTS.inc(view=metric_view, method=request.method, status=response.status_code)
+
+        if settings.DEBUG:
+            response["X-Query-Count"] = str(stats.query_count)
+            response["X-DB-Time-ms"] = f"{stats.db_ms:.1f}"
+            response["X-Response-Time-ms"] = f"{stats.wall_ms:.1f}"
+            response["Server-Timing"] = f"db;dur={stats.db_ms:.1f}, total;dur={stats.wall_ms:.1f}"
+        else:
+            logger.debug(json.dumps({
+                "event": "request",
+                "method": request.method,
+                "path": request.path,
+                "view": view_name,
+                "status": response.status_code,
+                "queries": stats.query_count,
+                "db_ms": round(stats.db_ms, 1),
+                "wall_ms": round(stats.wall_ms, 1),
+            }))
+
+        if violations:
+            logger.warning(json.dumps({
+                "event": "budget_exceeded",
+                "path": request.path,
+                "view": view_name,
+                "violations": violations,
+            }))
+
+        return response
+
+
+class ReplicaStickinessMiddleware:
+    """
+    Pin a user's reads to the primary database for a short window after any
+    state-changing request (POST, PUT, PATCH, DELETE), so pages rendered
+    from the replica right after a write still show it. Must come after
+    AuthenticationMiddleware; does nothing when no replica is configured.
+    """
+    sync_capable = True
+    async_capable = True
+    safe_methods = ("GET", "HEAD", "OPTIONS", "TRACE")
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.async_mode = iscoroutinefunction(get_response)
+        if self.async_mode:
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if self.async_mode:
+            return self.__acall__(request)
+        response = self.get_response(request)
+        if request.method not in self.safe_methods and replica_configured():
+            if request.user.is_authenticated:
+                mark_recent_write(request.user.id)
+        return response
+
+    async def __acall__(self, request):
+        response = await self.get_response(request)
+        if request.method not in self.safe_methods and replica_configured():
+            user = await request.auser()
+            if user.is_authenticated:
+                mark_recent_write(user.id)
+        return response
@@ -0,0 +1,17 @@
+# Generated by Django 5.2.18 on 2026-10-19 05:48
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('finwise_app', '0008_accountrecoverycode'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='transaction',
+            index=models.Index(fields=['account', '-posted_date', '-id'], name='finwise_app_account_4d4b32_idx'),
+        ),
+    ]
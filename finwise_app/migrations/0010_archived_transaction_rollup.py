@@ -0,0 +1,53 @@
+# Generated by Django 5.2.18 on 2026-10-19 06:08
+
+import django.db.models.deletion
+from decimal import Decimal
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('finwise_app', '0009_transaction_keyset_index'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ArchivedTransaction',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('fitid', models.CharField(max_length=128)),
+                ('posted_date', models.DateTimeField()),
+                ('amount', models.DecimalField(decimal_places=2, max_digits=12)),
+                ('trntype', models.CharField(blank=True, max_length=32)),
+                ('name', models.CharField(blank=True, max_length=255)),
+                ('memo', models.CharField(blank=True, max_length=512)),
+                ('checknum', models.CharField(blank=True, max_length=64)),
+                ('currency', models.CharField(blank=True, max_length=8)),
+                ('archived_at', models.DateTimeField(auto_now_add=True)),
+                ('account', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='archived_transactions', to='finwise_app.account')),
+                ('category', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='archived_transactions', to='finwise_app.category')),
+            ],
+            options={
+                'ordering': ['-posted_date', '-id'],
+                'indexes': [models.Index(fields=['account', '-posted_date'], name='finwise_app_account_901cc5_idx')],
+                'unique_together': {('account', 'fitid')},
+            },
+        ),
+        migrations.CreateModel(
+            name='TransactionRollup',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('month', models.DateField(help_text='First day of the month (YYYY-MM-01)')),
+                ('income', models.DecimalField(decimal_places=2, default=Decimal('0'), max_digits=14)),
+                ('expenses', models.DecimalField(decimal_places=2, default=Decimal('0'), max_digits=14)),
+                ('count', models.PositiveIntegerField(default=0)),
+                ('account', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='rollups', to='finwise_app.account')),
+                ('category', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='rollups', to='finwise_app.category')),
+            ],
+            options={
+                'ordering': ['-month'],
+                'indexes': [models.Index(fields=['account', 'month'], name='finwise_app_account_ab5ae2_idx')],
+            },
+        ),
+    ]
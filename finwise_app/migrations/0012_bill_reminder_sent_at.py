@@ -0,0 +1,28 @@
+# Generated by Django 5.2.18 on 2026-10-19 06:24
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('finwise_app', '0011_exportjob'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='bill',
+            name='reminder_sent_at',
+            field=models.DateTimeField(blank=True, help_text='When the reminder for the current due date went out', null=True),
+        ),
+        migrations.AddIndex(
+            model_name='bill',
+            index=models.Index(fields=['status', 'due_date'], name='finwise_app_status_069df1_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='bill',
+            index=models.Index(fields=['updated_at'], name='finwise_app_updated_f7e9fe_idx'),
+        ),
+    ]
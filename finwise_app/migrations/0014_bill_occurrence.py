@@ -0,0 +1,31 @@
+# Generated by Django 5.2.18 on 2026-10-19 06:28
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('finwise_app', '0013_notification'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='BillOccurrence',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('due_date', models.DateField()),
+                ('amount', models.DecimalField(decimal_places=2, max_digits=12)),
+                ('bill', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='occurrences', to='finwise_app.bill')),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='bill_occurrences', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'ordering': ['due_date', 'id'],
+                'indexes': [models.Index(fields=['user', 'due_date'], name='finwise_app_user_id_b040ba_idx')],
+                'unique_together': {('bill', 'due_date')},
+            },
+        ),
+    ]
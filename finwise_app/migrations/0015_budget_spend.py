@@ -0,0 +1,31 @@
+# Generated by Django 5.2.18 on 2026-10-19 06:31
+
+import django.db.models.deletion
+from decimal import Decimal
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('finwise_app', '0014_bill_occurrence'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='BudgetSpend',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('month', models.DateField(help_text='First day of the month (YYYY-MM-01)')),
+                ('spent', models.DecimalField(decimal_places=2, default=Decimal('0'), max_digits=14)),
+                ('data_version', models.PositiveBigIntegerField(default=0, help_text='User data version the total is current for')),
+                ('category', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='budget_spend', to='finwise_app.category')),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='budget_spend', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'unique_together': {('user', 'category', 'month')},
+            },
+        ),
+    ]
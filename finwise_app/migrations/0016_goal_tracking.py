@@ -0,0 +1,54 @@
+# Generated by Django 5.2.18 on 2026-10-19 06:34
+
+import django.db.models.deletion
+from decimal import Decimal
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('finwise_app', '0015_budget_spend'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='budget',
+            name='progress_updated_at',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='budget',
+            name='progress_version',
+            field=models.PositiveBigIntegerField(blank=True, help_text='User data version saved_amount is current for; empty until first computed', null=True),
+        ),
+        migrations.AddField(
+            model_name='budget',
+            name='saved_amount',
+            field=models.DecimalField(decimal_places=2, default=Decimal('0'), max_digits=14),
+        ),
+        migrations.AddField(
+            model_name='budget',
+            name='target_date',
+            field=models.DateField(blank=True, help_text='Goals only: date the amount should be saved by; open-ended when empty', null=True),
+        ),
+        migrations.CreateModel(
+            name='GoalContribution',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('amount', models.DecimalField(decimal_places=2, help_text='Negative for withdrawals', max_digits=12)),
+                ('contributed_on', models.DateField()),
+                ('note', models.CharField(blank=True, max_length=255)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('goal', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='contributions', to='finwise_app.budget')),
+                ('transaction', models.OneToOneField(blank=True, help_text='Source transaction; empty for manual contributions', null=True, on_delete=django.db.models.deletion.CASCADE, related_name='goal_contribution', to='finwise_app.transaction')),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='goal_contributions', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'ordering': ['-contributed_on', '-id'],
+                'indexes': [models.Index(fields=['goal', 'contributed_on'], name='finwise_app_goal_id_ce5b43_idx')],
+            },
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.2.18 on 2026-10-19 06:49
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('finwise_app', '0017_data_version'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='transaction',
+            name='import_batch',
+            field=models.UUIDField(blank=True, editable=False, null=True),
+        ),
+    ]
@@ -0,0 +1,41 @@
+# Generated by Django 5.2.18 on 2026-10-19 06:50
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('finwise_app', '0018_transaction_import_batch'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='DeletionJob',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('token', models.CharField(help_text='Unguessable id used by the status page', max_length=32, unique=True)),
+                ('transactions', models.BooleanField(default=False)),
+                ('budgets', models.BooleanField(default=False)),
+                ('bills', models.BooleanField(default=False)),
+                ('delete_user', models.BooleanField(default=False, help_text='Delete the user row once the data is gone')),
+                ('max_ids', models.JSONField(default=dict, help_text='Highest id per step when the job was queued')),
+                ('status', models.CharField(choices=[('PENDING', 'Queued'), ('RUNNING', 'Running'), ('DONE', 'Done'), ('FAILED', 'Failed')], default='PENDING', max_length=16)),
+                ('step', models.CharField(blank=True, max_length=64)),
+                ('deleted', models.PositiveBigIntegerField(default=0)),
+                ('total', models.PositiveBigIntegerField(default=0)),
+                ('error', models.TextField(blank=True)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('finished_at', models.DateTimeField(blank=True, null=True)),
+                ('user', models.ForeignKey(null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='deletion_jobs', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'ordering': ['-created_at'],
+                'indexes': [models.Index(fields=['status', 'created_at'], name='finwise_app_status_c35327_idx')],
+            },
+        ),
+    ]
@@ -0,0 +1,20 @@
+# Generated by Django 5.2.18 on 2026-10-19 06:52
+
+from django.db import migrations
+
+
+def blank_recovery_bodies(apps, schema_editor):
+    # Recovery codes that already went out (or never will) are not kept
+    Notification = apps.get_model('finwise_app', 'Notification')
+    Notification.objects.filter(kind='recovery', status__in=('SENT', 'FAILED')).update(body='')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('finwise_app', '0019_deletion_job'),
+    ]
+
+    operations = [
+        migrations.RunPython(blank_recovery_bodies, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.2.18 on 2026-10-19 07:03
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('finwise_app', '0020_blank_sent_recovery_bodies'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='bill',
+            name='series_day',
+            field=models.PositiveSmallIntegerField(blank=True, help_text='Day of the month the series falls on; shorter months use their last day', null=True),
+        ),
+    ]
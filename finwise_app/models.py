@@ -51,6 +51,19 @@ class Budget(models.Model):
 		help_text="Budget = spending limit, Goal = savings target"
 	)
 	month = models.DateField(help_text="First day of the budget month (YYYY-MM-01)")
+	target_date = models.DateField(
+		null=True,
+		blank=True,
+		help_text="Goals only: date the amount should be saved by; open-ended when empty"
+	)
+	# Goal progress kept by services.goals
+	saved_amount = models.DecimalField(max_digits=14, decimal_places=2, default=Decimal("0"))
+	progress_version = models.PositiveBigIntegerField(
+		null=True,
+		blank=True,
+		help_text="User data version saved_amount is current for; empty until first computed"
+	)
+	progress_updated_at = models.DateTimeField(null=True, blank=True)
 	created_at = models.DateTimeField(auto_now_add=True)
 	updated_at = models.DateTimeField(auto_now=True)
 
@@ -61,12 +74,11 @@ class Budget(models.Model):
 	def __str__(self) -> str:
 		return f"{self.user.username} - {self.category.name} - {self.month.strftime('%B %Y')}: ${self.amount}"
 
-	def get_spent_amount(self) -> Decimal:
-		"""Calculate total spent in this category for this month"""
-		from django.db.models import Sum
+	def get_month_bounds(self):
+		"""Return (start, end) datetimes of the budget month"""
 		from datetime import datetime
+		from django.utils import timezone
 		
-		# Get start and end of the month
 		year, month = self.month.year, self.month.month
 		if month == 12:
 			next_month_start = datetime(year + 1, 1, 1)
@@ -74,6 +86,18 @@ class Budget(models.Model):
 			next_month_start = datetime(year, month + 1, 1)
 		
 		month_start = datetime(year, month, 1)
+		return timezone.make_aware(month_start), timezone.make_aware(next_month_start)
+
+	def get_spent_amount(self) -> Decimal:
+		"""Calculate total spent in this category for this month"""
+		from django.db.models import Sum
+		
+		# Use the figure attached by prefetch_spent_amounts() when available
+		cached = getattr(self, "_spent_amount", None)
+		if cached is not None:
+			return cached
+		
+		month_start, next_month_start = self.get_month_bounds()
 		
 		# Sum transactions in this category for this month for this user
 		spent = Transaction.objects.filter(
@@ -84,7 +108,58 @@ class Budget(models.Model):
 			amount__lt=0  # Only expenses (negative amounts)
 		).aggregate(total=Sum('amount'))['total'] or Decimal('0')
 		
-		return abs(spent)  # Return positive amount
+		# Plus archived spending for the month (services.archive)
+		spent += TransactionRollup.objects.filter(
+			account__user=self.user,
+			category=self.category,
+			month=self.month.replace(day=1)
+		).aggregate(total=Sum('expenses'))['total'] or Decimal('0')
+		
+		self._spent_amount = abs(spent)  # Return positive amount
+		return self._spent_amount
+
+	@staticmethod
+	def prefetch_spent_amounts(budgets) -> list["Budget"]:
+		"""
+		Attach spent amounts to many budgets using one grouped query per
+		(user, month) instead of one query per budget. Returns the budgets as a list.
+		"""
+		from collections import defaultdict
+		from django.db.models import Sum
+		
+		budgets = list(budgets)
+		groups = defaultdict(list)
+		for budget in budgets:
+			groups[(budget.user_id, budget.month)].append(budget)
+		if not groups:
+			return budgets
+		
+		# Archived spending (services.archive) for every group in one query
+		archived = defaultdict(Decimal)
+		rollups = TransactionRollup.objects.filter(
+			account__user_id__in={user_id for user_id, _month in groups},
+			month__in={month.replace(day=1) for _user_id, month in groups},
+			category_id__in={b.category_id for b in budgets}
+		).values('account__user_id', 'month', 'category_id').annotate(total=Sum('expenses'))
+		for row in rollups:
+			archived[(row['account__user_id'], row['month'], row['category_id'])] += row['total'] or Decimal('0')
+		
+		for (user_id, month), items in groups.items():
+			month_start, next_month_start = items[0].get_month_bounds()
+			totals = dict(
+				Transaction.objects.filter(
+					account__user_id=user_id,
+					category_id__in=[b.category_id for b in items],
+					posted_date__gte=month_start,
+					posted_date__lt=next_month_start,
+					amount__lt=0
+				).values('category_id').annotate(total=Sum('amount')).values_list('category_id', 'total')
+			)
+			for budget in items:
+				spent = (totals.get(budget.category_id) or Decimal('0')) + archived[(user_id, month.replace(day=1), budget.category_id)]
+				budget._spent_amount = abs(spent)
+		
+		return budgets
 
 	def get_remaining_amount(self) -> Decimal:
 		"""Calculate remaining budget amount"""
@@ -103,6 +178,64 @@ class Budget(models.Model):
 		return self.get_percentage_used() >= threshold_percent
 
 
+class BudgetSpend(models.Model):
+	"""Running expense total per (user, category, month), kept by services.budget_alerts"""
+	user = models.ForeignKey(User, on_delete=models.CASCADE, related_name="budget_spend")
+	category = models.ForeignKey(Category, on_delete=models.CASCADE, related_name="budget_spend")
+	month = models.DateField(help_text="First day of the month (YYYY-MM-01)")
+	spent = models.DecimalField(max_digits=14, decimal_places=2, default=Decimal("0"))
+	data_version = models.PositiveBigIntegerField(
+		default=0,
+		help_text="User data version the total is current for"
+	)
+
+	class Meta:
+		unique_together = ("user", "category", "month")
+
+	def __str__(self) -> str:  # pragma: no cover - simple repr
+		return f"{self.month:%Y-%m} user={self.user_id} category={self.category_id} {self.spent}"
+
+
+class GoalContribution(models.Model):
+	"""Money put toward a savings goal: an imported transaction or a manual entry"""
+	goal = models.ForeignKey(Budget, on_delete=models.CASCADE, related_name="contributions")
+	user = models.ForeignKey(User, on_delete=models.CASCADE, related_name="goal_contributions")
+	amount = models.DecimalField(max_digits=12, decimal_places=2, help_text="Negative for withdrawals")
+	contributed_on = models.DateField()
+	transaction = models.OneToOneField(
+		"Transaction",
+		on_delete=models.CASCADE,
+		null=True,
+		blank=True,
+		related_name="goal_contribution",
+		help_text="Source transaction; empty for manual contributions"
+	)
+	note = models.CharField(max_length=255, blank=True)
+	created_at = models.DateTimeField(auto_now_add=True)
+
+	class Meta:
+		ordering = ["-contributed_on", "-id"]
+		indexes = [
+			models.Index(fields=["goal", "contributed_on"]),
+		]
+
+	def __str__(self) -> str:  # pragma: no cover - simple repr
+		return f"{self.contributed_on} goal={self.goal_id} {self.amount}"
+
+	@property
+	def is_manual(self) -> bool:
+		return self.transaction_id is None
+
+
+class DataVersion(models.Model):
+	"""Per-user counter bumped on every write to their transactions (services.analytics)"""
+	user = models.OneToOneField(User, on_delete=models.CASCADE, primary_key=True, related_name="data_version")
+	version = models.PositiveBigIntegerField(default=0)
+
+	def __str__(self) -> str:  # pragma: no cover - simple repr
+		return f"user={self.user_id} v{self.version}"
+
+
 class Account(models.Model):
 	TYPE_CHOICES = [
 		("BANK", "Bank"),
@@ -145,10 +278,15 @@ class Transaction(models.Model):
 	currency = models.CharField(max_length=8, blank=True)
 	is_categorized = models.BooleanField(default=False)
 	categorized_at = models.DateTimeField(null=True, blank=True)
+	# Shared by the rows one import created; null for rows imported before it existed
+	import_batch = models.UUIDField(null=True, blank=True, editable=False)
 
 	class Meta:
 		unique_together = ("account", "fitid")
 		ordering = ["-posted_date", "-id"]
+		indexes = [
+			models.Index(fields=["account", "-posted_date", "-id"]),
+		]
 
 	def __str__(self) -> str:  # pragma: no cover - simple repr
 		return f"{self.posted_date.date()} {self.amount} {self.name or self.memo}"
@@ -191,6 +329,62 @@ class Transaction(models.Model):
 		return True
 
 
+class ArchivedTransaction(models.Model):
+	"""Transactions moved out of the hot table by services.archive"""
+	account = models.ForeignKey(Account, on_delete=models.CASCADE, related_name="archived_transactions")
+	category = models.ForeignKey(
+		Category,
+		on_delete=models.SET_NULL,
+		null=True,
+		blank=True,
+		related_name="archived_transactions"
+	)
+	fitid = models.CharField(max_length=128)
+	posted_date = models.DateTimeField()
+	amount = models.DecimalField(max_digits=12, decimal_places=2)
+	trntype = models.CharField(max_length=32, blank=True)
+	name = models.CharField(max_length=255, blank=True)
+	memo = models.CharField(max_length=512, blank=True)
+	checknum = models.CharField(max_length=64, blank=True)
+	currency = models.CharField(max_length=8, blank=True)
+	archived_at = models.DateTimeField(auto_now_add=True)
+
+	class Meta:
+		unique_together = ("account", "fitid")
+		ordering = ["-posted_date", "-id"]
+		indexes = [
+			models.Index(fields=["account", "-posted_date"]),
+		]
+
+	def __str__(self) -> str:  # pragma: no cover - simple repr
+		return f"{self.posted_date.date()} {self.amount} {self.name or self.memo} (archived)"
+
+
+class TransactionRollup(models.Model):
+	"""Monthly income and expense totals of archived transactions per account and category"""
+	account = models.ForeignKey(Account, on_delete=models.CASCADE, related_name="rollups")
+	category = models.ForeignKey(
+		Category,
+		on_delete=models.SET_NULL,
+		null=True,
+		blank=True,
+		related_name="rollups"
+	)
+	month = models.DateField(help_text="First day of the month (YYYY-MM-01)")
+	income = models.DecimalField(max_digits=14, decimal_places=2, default=Decimal("0"))
+	expenses = models.DecimalField(max_digits=14, decimal_places=2, default=Decimal("0"))
+	count = models.PositiveIntegerField(default=0)
+
+	class Meta:
+		ordering = ["-month"]
+		indexes = [
+			models.Index(fields=["account", "month"]),
+		]
+
+	def __str__(self) -> str:  # pragma: no cover - simple repr
+		return f"{self.month:%Y-%m} account={self.account_id} +{self.income} {self.expenses}"
+
+
 class Bill(models.Model):
 	"""Bill management for tracking recurring and one-time bills"""
 	FREQUENCY_CHOICES = [
@@ -219,6 +413,11 @@ class Bill(models.Model):
 		help_text="Bill amount"
 	)
 	due_date = models.DateField(help_text="When the bill is due")
+	series_day = models.PositiveSmallIntegerField(
+		null=True,
+		blank=True,
+		help_text="Day of the month the series falls on; shorter months use their last day"
+	)
 	frequency = models.CharField(
 		max_length=16, 
 		choices=FREQUENCY_CHOICES, 
@@ -246,6 +445,11 @@ class Bill(models.Model):
 		help_text="How many days before due date to send reminder"
 	)
 	reminder_enabled = models.BooleanField(default=True)
+	reminder_sent_at = models.DateTimeField(
+		null=True,
+		blank=True,
+		help_text="When the reminder for the current due date went out"
+	)
 	
 	# Tracking fields
 	created_at = models.DateTimeField(auto_now_add=True)
@@ -257,6 +461,9 @@ class Bill(models.Model):
 		indexes = [
 			models.Index(fields=["user", "due_date"]),
 			models.Index(fields=["user", "status"]),
+			# Reminder scheduler: horizon load across users, and changes since its last poll
+			models.Index(fields=["status", "due_date"]),
+			models.Index(fields=["updated_at"]),
 		]
 
 	def __str__(self) -> str:
@@ -280,7 +487,7 @@ class Bill(models.Model):
 		return self.days_until_due() <= self.reminder_days
 
 	def mark_as_paid(self, paid_date=None):
-		"""Mark bill as paid and set paid date"""
+		"""Mark bill as paid and set paid date; returns the next bill of a recurring one"""
 		from django.utils import timezone
 		self.status = "PAID"
 		self.last_paid_date = paid_date or timezone.now().date()
@@ -288,34 +495,22 @@ class Bill(models.Model):
 		
 		# If recurring, create next bill
 		if self.frequency != "ONE_TIME":
-			self.create_next_bill()
+			return self.create_next_bill()
+		return None
 
 	def create_next_bill(self):
-		"""Create the next bill instance for recurring bills"""
-		from dateutil.relativedelta import relativedelta
-		from django.utils import timezone
-		
-		next_due_date = self.due_date
-		
-		if self.frequency == "WEEKLY":
-			next_due_date += relativedelta(weeks=1)
-		elif self.frequency == "BIWEEKLY":
-			next_due_date += relativedelta(weeks=2)
-		elif self.frequency == "MONTHLY":
-			next_due_date += relativedelta(months=1)
-		elif self.frequency == "QUARTERLY":
-			next_due_date += relativedelta(months=3)
-		elif self.frequency == "YEARLY":
-			next_due_date += relativedelta(years=1)
+		"""Create and return the next bill instance for recurring bills"""
+		from .services.bill_calendar import next_due_date, series_day
 		
 		# Create new bill instance
 		if self.frequency != "ONE_TIME":
-			Bill.objects.create(
+			return Bill.objects.create(
 				user=self.user,
 				name=self.name,
 				description=self.description,
 				amount=self.amount,
-				due_date=next_due_date,
+				due_date=next_due_date(self),
+				series_day=series_day(self),
 				frequency=self.frequency,
 				category=self.category,
 				reminder_days=self.reminder_days,
@@ -345,6 +540,159 @@ class Bill(models.Model):
 		return frequency_short.get(self.frequency, self.frequency)
 
 
+class BillOccurrence(models.Model):
+	"""A future due date of an active bill, expanded by services.bill_calendar"""
+	bill = models.ForeignKey(Bill, on_delete=models.CASCADE, related_name="occurrences")
+	user = models.ForeignKey(User, on_delete=models.CASCADE, related_name="bill_occurrences")
+	due_date = models.DateField()
+	amount = models.DecimalField(max_digits=12, decimal_places=2)
+
+	class Meta:
+		unique_together = ("bill", "due_date")
+		ordering = ["due_date", "id"]
+		indexes = [
+			models.Index(fields=["user", "due_date"]),
+		]
+
+	def __str__(self) -> str:  # pragma: no cover - simple repr
+		return f"{self.due_date} {self.amount} bill={self.bill_id}"
+
+
+class ExportJob(models.Model):
+	"""A data export produced in the background by the export worker"""
+	FORMAT_CHOICES = [
+		("json", "JSON"),
+		("ndjson", "NDJSON"),
+		("csv", "CSV (transactions)"),
+		("snapshot", "Snapshot (.npz)"),
+	]
+
+	STATUS_CHOICES = [
+		("PENDING", "Queued"),
+		("RUNNING", "Running"),
+		("DONE", "Ready"),
+		("FAILED", "Failed"),
+		("EXPIRED", "Expired"),
+	]
+	ACTIVE_STATUSES = ("PENDING", "RUNNING")
+
+	user = models.ForeignKey(User, on_delete=models.CASCADE, related_name="export_jobs")
+	format = models.CharField(max_length=16, choices=FORMAT_CHOICES, default="json")
+	status = models.CharField(max_length=16, choices=STATUS_CHOICES, default="PENDING")
+	file_name = models.CharField(max_length=255, blank=True, help_text="Artifact name under EXPORT_ROOT")
+	size_bytes = models.BigIntegerField(null=True, blank=True)
+	error = models.TextField(blank=True)
+	created_at = models.DateTimeField(auto_now_add=True)
+	started_at = models.DateTimeField(null=True, blank=True)
+	finished_at = models.DateTimeField(null=True, blank=True)
+
+	class Meta:
+		ordering = ["-created_at"]
+		indexes = [
+			models.Index(fields=["status", "created_at"]),
+			models.Index(fields=["user", "-created_at"]),
+		]
+
+	def __str__(self) -> str:  # pragma: no cover - simple repr
+		return f"ExportJob({self.id}, {self.user_id}, {self.format}, {self.status})"
+
+	def is_active(self) -> bool:
+		return self.status in self.ACTIVE_STATUSES
+
+	def download_name(self) -> str:
+		"""File name offered to the browser"""
+		stamp = self.created_at.strftime("%Y%m%d_%H%M%S")
+		if self.format == "snapshot":
+			return f"finwise_snapshot_{self.user.username}_{stamp}.npz"
+		return f"finwise_data_{self.user.username}_{stamp}.{self.format}.gz"
+
+
+class DeletionJob(models.Model):
+	"""A large deletion of user data run in chunks by the deletion worker"""
+	STATUS_CHOICES = [
+		("PENDING", "Queued"),
+		("RUNNING", "Running"),
+		("DONE", "Done"),
+		("FAILED", "Failed"),
+	]
+	ACTIVE_STATUSES = ("PENDING", "RUNNING")
+
+	# Kept after the user is deleted so the outcome stays on record
+	user = models.ForeignKey(User, on_delete=models.SET_NULL, null=True, related_name="deletion_jobs")
+	token = models.CharField(max_length=32, unique=True, help_text="Unguessable id used by the status page")
+	transactions = models.BooleanField(default=False)
+	budgets = models.BooleanField(default=False)
+	bills = models.BooleanField(default=False)
+	delete_user = models.BooleanField(default=False, help_text="Delete the user row once the data is gone")
+	max_ids = models.JSONField(default=dict, help_text="Highest id per step when the job was queued")
+	status = models.CharField(max_length=16, choices=STATUS_CHOICES, default="PENDING")
+	step = models.CharField(max_length=64, blank=True)
+	deleted = models.PositiveBigIntegerField(default=0)
+	total = models.PositiveBigIntegerField(default=0)
+	error = models.TextField(blank=True)
+	created_at = models.DateTimeField(auto_now_add=True)
+	updated_at = models.DateTimeField(auto_now=True)
+	finished_at = models.DateTimeField(null=True, blank=True)
+
+	class Meta:
+		ordering = ["-created_at"]
+		indexes = [
+			models.Index(fields=["status", "created_at"]),
+		]
+
+	def __str__(self) -> str:  # pragma: no cover - simple repr
+		return f"DeletionJob({self.id}, {self.user_id}, {self.status})"
+
+	def is_active(self) -> bool:
+		return self.status in self.ACTIVE_STATUSES
+
+
+class Notification(models.Model):
+	"""Outbox entry; delivered by the notification worker through the channel's transport"""
+	CHANNEL_CHOICES = [
+		("email", "Email"),
+		("push", "Push"),
+	]
+
+	STATUS_CHOICES = [
+		("PENDING", "Pending"),
+		("SENDING", "Sending"),
+		("SENT", "Sent"),
+		("FAILED", "Failed"),
+	]
+
+	user = models.ForeignKey(User, on_delete=models.CASCADE, null=True, blank=True, related_name="notifications")
+	channel = models.CharField(max_length=16, choices=CHANNEL_CHOICES)
+	recipient = models.CharField(max_length=255, help_text="Email address or push target")
+	kind = models.CharField(max_length=32, blank=True, help_text="e.g. recovery, bill_reminder, budget_alert")
+	subject = models.CharField(max_length=255)
+	body = models.TextField()
+	dedupe_key = models.CharField(
+		max_length=255,
+		null=True,
+		blank=True,
+		unique=True,
+		help_text="Repeat notifications with the same key are dropped"
+	)
+	status = models.CharField(max_length=16, choices=STATUS_CHOICES, default="PENDING")
+	attempts = models.PositiveIntegerField(default=0)
+	next_attempt_at = models.DateTimeField(help_text="Due time while pending; lease expiry while sending")
+	claim_token = models.CharField(max_length=32, blank=True)
+	last_error = models.TextField(blank=True)
+	created_at = models.DateTimeField(auto_now_add=True)
+	sent_at = models.DateTimeField(null=True, blank=True)
+
+	class Meta:
+		ordering = ["-created_at"]
+		indexes = [
+			models.Index(fields=["status", "next_attempt_at"]),
+			models.Index(fields=["claim_token"]),
+		]
+
+	def __str__(self) -> str:  # pragma: no cover - simple repr
+		return f"Notification({self.id}, {self.channel}, {self.kind}, {self.status})"
+
+
 class AccountRecoveryCode(models.Model):
 	"""One-time recovery codes for account email verification/password reset"""
 	user = models.ForeignKey(User, on_delete=models.CASCADE, related_name="recovery_codes")
@@ -0,0 +1,362 @@
+"""
+Columnar analytics engine for per-user transaction time series
+Loads (posted day, amount, category, account) into NumPy arrays once per
+user and data version, and answers chart queries with vectorized operations
+"""
+from __future__ import annotations
+
+import threading
+import time
+from collections import OrderedDict
+from itertools import chain
+from dataclasses import dataclass
+from datetime import date
+
+import numpy as np
+from asgiref.sync import sync_to_async
+from django.db import DEFAULT_DB_ALIAS, IntegrityError, transaction as db_transaction
+from django.db.models import F
+from django.db.models.functions import TruncDate
+
+from ..db_router import mark_recent_write
+from ..metrics import CACHE_REQUESTS
+from ..models import DataVersion, Transaction, TransactionRollup
+
+# date(1970, 1, 1).toordinal(); used to convert ordinals to datetime64[D]
+_EPOCH_ORDINAL = 719163
+
+# Sentinel stored in the category column for uncategorized transactions
+NO_CATEGORY = -1
+
+BUCKETS = ("day", "week", "month")
+
+FRAME_CACHE_SIZE = 32
+FRAME_MAX_AGE = 300  # seconds; bounds how long an idle process keeps a frame in memory
+
+
+@dataclass(frozen=True)
+class TransactionFrame:
+    """Column arrays for one user's transactions, sorted by posted day"""
+    days: np.ndarray          # int32 proleptic Gregorian ordinals (local posted date)
+    amounts: np.ndarray       # int64 cents
+    category_ids: np.ndarray  # int64, NO_CATEGORY when uncategorized
+    account_ids: np.ndarray   # int64
+
+    def __len__(self) -> int:
+        return int(self.days.shape[0])
+
+    @classmethod
+    def empty(cls) -> "TransactionFrame":
+        return cls(
+            days=np.empty(0, dtype=np.int32),
+            amounts=np.empty(0, dtype=np.int64),
+            category_ids=np.empty(0, dtype=np.int64),
+            account_ids=np.empty(0, dtype=np.int64),
+        )
+
+    @classmethod
+    def from_rows(cls, rows) -> "TransactionFrame":
+        """Build a frame from (day, amount, category_id, account_id) tuples"""
+        days, amounts, category_ids, account_ids = [], [], [], []
+        for day, amount, category_id, account_id in rows:
+            if day is None:
+                continue
+            days.append(day.toordinal())
+            amounts.append(int(amount * 100))
+            category_ids.append(NO_CATEGORY if category_id is None else category_id)
+            account_ids.append(account_id)
+
+        if not days:
+            return cls.empty()
+
+        day_arr = np.asarray(days, dtype=np.int32)
+        order = np.argsort(day_arr, kind="stable")
+        return cls(
+            days=day_arr[order],
+            amounts=np.asarray(amounts, dtype=np.int64)[order],
+            category_ids=np.asarray(category_ids, dtype=np.int64)[order],
+            account_ids=np.asarray(account_ids, dtype=np.int64)[order],
+        )
+
+    # Slicing
+
+    def window(self, start: date | None = None, end: date | None = None) -> "TransactionFrame":
+        """Rows with start <= day < end; days are sorted so this is two binary searches"""
+        lo = 0 if start is None else int(np.searchsorted(self.days, start.toordinal(), side="left"))
+        hi = len(self) if end is None else int(np.searchsorted(self.days, end.toordinal(), side="left"))
+        return TransactionFrame(
+            days=self.days[lo:hi],
+            amounts=self.amounts[lo:hi],
+            category_ids=self.category_ids[lo:hi],
+            account_ids=self.account_ids[lo:hi],
+        )
+
+    def _mask(self, mask: np.ndarray) -> "TransactionFrame":
+        return TransactionFrame(
+            days=self.days[mask],
+            amounts=self.amounts[mask],
+            category_ids=self.category_ids[mask],
+            account_ids=self.account_ids[mask],
+        )
+
+    def expenses(self) -> "TransactionFrame":
+        return self._mask(self.amounts < 0)
+
+    def income(self) -> "TransactionFrame":
+        return self._mask(self.amounts > 0)
+
+    # Aggregates
+
+    def total(self) -> int:
+        return int(self.amounts.sum())
+
+    def daily_totals(self, start: date, end: date) -> tuple[np.ndarray, np.ndarray]:
+        """
+        Zero-filled daily sums for start <= day < end.
+        Returns (ordinals, cents) arrays of equal length.
+        """
+        start_ord, end_ord = start.toordinal(), end.toordinal()
+        ordinals = np.arange(start_ord, max(start_ord, end_ord), dtype=np.int32)
+        sliced = self.window(start, end)
+        totals = np.bincount(
+            sliced.days - start_ord,
+            weights=sliced.amounts,
+            minlength=ordinals.shape[0],
+        )
+        return ordinals, np.rint(totals).astype(np.int64)
+
+    def bucketed_totals(self, start: date, end: date, bucket: str = "day") -> tuple[np.ndarray, np.ndarray]:
+        """
+        Zero-filled sums per day, ISO week or calendar month covering [start, end).
+        Returns (bucket start ordinals, cents).
+        """
+        if bucket == "day":
+            return self.daily_totals(start, end)
+
+        if bucket == "week":
+            first = _week_start(start.toordinal())
+            last = _week_start(max(start.toordinal(), end.toordinal() - 1))
+            starts = np.arange(first, last + 1, 7, dtype=np.int32)
+            sliced = self.window(start, end)
+            offsets = (sliced.days.astype(np.int64) - first) // 7
+        elif bucket == "month":
+            first = _month_index(start)
+            last = _month_index(date.fromordinal(max(start.toordinal(), end.toordinal() - 1)))
+            starts = np.asarray(
+                [_month_start(index).toordinal() for index in range(first, last + 1)],
+                dtype=np.int32,
+            )
+            sliced = self.window(start, end)
+            offsets = _months_of(sliced.days) - first
+        else:
+            raise ValueError(f"Unknown bucket {bucket!r}; expected one of {', '.join(BUCKETS)}")
+
+        totals = np.bincount(offsets, weights=sliced.amounts, minlength=starts.shape[0])
+        return starts, np.rint(totals).astype(np.int64)
+
+    def monthly_totals(self, start: date, end: date) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """
+        Income and expense sums per calendar month for months in [start, end).
+        Returns (month indexes since 1970-01, income cents, expense cents).
+        """
+        start_month = _month_index(start)
+        end_month = _month_index(end)
+        months = np.arange(start_month, max(start_month, end_month), dtype=np.int64)
+        sliced = self.window(date(start.year, start.month, 1), _month_start(end_month))
+        offsets = _months_of(sliced.days) - start_month
+        size = months.shape[0]
+        income = np.bincount(offsets, weights=np.where(sliced.amounts > 0, sliced.amounts, 0), minlength=size)
+        expenses = np.bincount(offsets, weights=np.where(sliced.amounts < 0, sliced.amounts, 0), minlength=size)
+        return months, np.rint(income).astype(np.int64), np.rint(expenses).astype(np.int64)
+
+    def totals_by(self, column: str) -> tuple[np.ndarray, np.ndarray]:
+        """Sum of amounts grouped by ``category_ids`` or ``account_ids``; returns (keys, cents)"""
+        values = getattr(self, column)
+        if values.shape[0] == 0:
+            return np.empty(0, dtype=np.int64), np.empty(0, dtype=np.int64)
+        keys, inverse = np.unique(values, return_inverse=True)
+        totals = np.bincount(inverse, weights=self.amounts, minlength=keys.shape[0])
+        return keys, np.rint(totals).astype(np.int64)
+
+    def category_totals(self) -> tuple[np.ndarray, np.ndarray]:
+        return self.totals_by("category_ids")
+
+    def account_totals(self) -> tuple[np.ndarray, np.ndarray]:
+        return self.totals_by("account_ids")
+
+    def percentiles(self, q) -> np.ndarray:
+        """Percentiles of absolute transaction amounts, in cents"""
+        if len(self) == 0:
+            return np.zeros(np.shape(q), dtype=np.float64)
+        return np.percentile(np.abs(self.amounts), q)
+
+
+def rolling_average(values: np.ndarray, window: int) -> np.ndarray:
+    """Trailing moving average; the first ``window - 1`` points average what is available"""
+    values = np.asarray(values, dtype=np.float64)
+    if window <= 1 or values.shape[0] == 0:
+        return values.copy()
+    cumsum = np.cumsum(np.insert(values, 0, 0.0))
+    counts = np.minimum(np.arange(1, values.shape[0] + 1), window)
+    lower = np.maximum(np.arange(1, values.shape[0] + 1) - window, 0)
+    return (cumsum[1:] - cumsum[lower]) / counts
+
+
+def downsample(labels: np.ndarray, values: np.ndarray, max_points: int) -> tuple[np.ndarray, np.ndarray, int]:
+    """
+    Merge runs of adjacent buckets so at most ``max_points`` remain.
+
+    Values in a run are summed so totals are preserved; each merged point is
+    labelled with the first bucket of its run. Returns (labels, values, factor).
+    """
+    count = values.shape[0]
+    if max_points <= 0 or count <= max_points:
+        return labels, values, 1
+    factor = -(-count // max_points)  # ceiling division
+    edges = np.arange(0, count, factor)
+    return labels[edges], np.add.reduceat(values, edges), factor
+
+
+def _week_start(ordinal: int) -> int:
+    # Ordinal 1 (0001-01-01) is a Monday, so weeks start on Mondays
+    return ordinal - (ordinal - 1) % 7
+
+
+def _month_index(value: date) -> int:
+    return (value.year - 1970) * 12 + value.month - 1
+
+
+def _month_start(index: int) -> date:
+    return date(1970 + index // 12, index % 12 + 1, 1)
+
+
+def _months_of(ordinals: np.ndarray) -> np.ndarray:
+    as_dates = (ordinals.astype(np.int64) - _EPOCH_ORDINAL).astype("datetime64[D]")
+    return as_dates.astype("datetime64[M]").astype(np.int64)
+
+
+def ordinals_to_strings(ordinals: np.ndarray, fmt: str = "%Y-%m-%d") -> list[str]:
+    return [date.fromordinal(int(o)).strftime(fmt) for o in ordinals]
+
+
+def month_label(index: int, fmt: str = "%b %Y") -> str:
+    return _month_start(int(index)).strftime(fmt)
+
+
+def cents_to_float(cents) -> float:
+    return float(cents) / 100
+
+
+# Per-user frame cache
+
+_frames: "OrderedDict[int, tuple[int, float, TransactionFrame]]" = OrderedDict()
+_frames_lock = threading.Lock()
+
+
+# The version is a DataVersion row rather than a cache entry so every worker
+# process sees the same sequence and it survives restarts. It is always read
+# from the primary, which the replica may lag.
+
+def _versions():
+    return DataVersion.objects.using(DEFAULT_DB_ALIAS)
+
+
+def get_data_version(user_id: int) -> int:
+    return _versions().filter(user_id=user_id).values_list("version", flat=True).first() or 0
+
+
+async def aget_data_version(user_id: int) -> int:
+    return await _versions().filter(user_id=user_id).values_list("version", flat=True).afirst() or 0
+
+
+def bump_data_version(user_id: int) -> int:
+    """Invalidate cached frames for a user; call after any write to their transactions. Returns the new version"""
+    with db_transaction.atomic(using=DEFAULT_DB_ALIAS):
+        if not _versions().filter(user_id=user_id).update(version=F("version") + 1):
+            try:
+                with db_transaction.atomic(using=DEFAULT_DB_ALIAS):
+                    _versions().create(user_id=user_id, version=1)
+            except IntegrityError:
+                # Created concurrently by another worker
+                _versions().filter(user_id=user_id).update(version=F("version") + 1)
+        version = get_data_version(user_id)
+    # Keep their reads on the primary until the replica has the write
+    mark_recent_write(user_id)
+    return version
+
+
+def _rollup_rows(user_id: int):
+    """
+    Archived months as frame rows: one income and one expense row per
+    (account, category, month), dated the first of the month
+    """
+    rollups = (
+        TransactionRollup.objects.filter(account__user_id=user_id)
+        .values_list("month", "income", "expenses", "category_id", "account_id")
+        .order_by()
+    )
+    for month, income, expenses, category_id, account_id in rollups:
+        if income:
+            yield month, income, category_id, account_id
+        if expenses:
+            yield month, expenses, category_id, account_id
+
+
+def load_frame(user_id: int) -> TransactionFrame:
+    """Read the user's transaction columns, plus archived rollups, from the database"""
+    rows = (
+        Transaction.objects.filter(account__user_id=user_id)
+        .annotate(day=TruncDate("posted_date"))
+        .values_list("day", "amount", "category_id", "account_id")
+        .order_by()
+    )
+    return TransactionFrame.from_rows(chain(rows.iterator(chunk_size=5000), _rollup_rows(user_id)))
+
+
+def _cached_frame(user_id: int, version: int, now: float) -> TransactionFrame | None:
+    with _frames_lock:
+        entry = _frames.get(user_id)
+        if entry and entry[0] == version and now - entry[1] < FRAME_MAX_AGE:
+            _frames.move_to_end(user_id)
+            CACHE_REQUESTS.inc(cache="analytics_frame", result="hit")
+            return entry[2]
+    CACHE_REQUESTS.inc(cache="analytics_frame", result="miss")
+    return None
+
+
+def _store_frame(user_id: int, version: int, now: float, frame: TransactionFrame) -> None:
+    with _frames_lock:
+        _frames[user_id] = (version, now, frame)
+        _frames.move_to_end(user_id)
+        while len(_frames) > FRAME_CACHE_SIZE:
+            _frames.popitem(last=False)
+
+
+def get_frame(user_id: int) -> TransactionFrame:
+    """Return the cached frame for a user, reloading when the data version changed"""
+    version = get_data_version(user_id)
+    now = time.monotonic()
+    frame = _cached_frame(user_id, version, now)
+    if frame is None:
+        frame = load_frame(user_id)
+        _store_frame(user_id, version, now, frame)
+    return frame
+
+
+async def aget_frame(user_id: int) -> TransactionFrame:
+    """
+    Async get_frame. The bulk load and array build run in a worker thread so
+    a cold load does not block the event loop.
+    """
+    version = await aget_data_version(user_id)
+    now = time.monotonic()
+    frame = _cached_frame(user_id, version, now)
+    if frame is None:
+        frame = await sync_to_async(load_frame)(user_id)
+        _store_frame(user_id, version, now, frame)
+    return frame
+
+
+def clear_frames() -> None:
+    with _frames_lock:
+        _frames.clear()
@@ -0,0 +1,166 @@
+"""
+Archival of old transactions
+``archive_transactions`` moves a user's transactions posted before a cutoff
+from the hot Transaction table into ArchivedTransaction and adds them to the
+monthly TransactionRollup rows. The analytics
+frame and budget spent amounts add the rollups back, so balances and
+monthly history are unchanged while per-user scans of Transaction only read
+recent rows. The data export still includes the individual archived rows.
+
+Goal ledger entries (GoalContribution) of archived transactions are removed
+with them and the goals rebuilt, so archived months count toward goals
+through their rollups instead. ``delete_old_transactions`` is the
+destructive alternative: it drops old rows, archived ones included.
+"""
+from __future__ import annotations
+
+from collections import defaultdict
+from datetime import datetime, timedelta
+from decimal import Decimal
+
+from django.contrib.auth.models import User
+from django.db import transaction as db_transaction
+from django.db.models import Count, DateField, F, Q, Sum
+from django.db.models.functions import TruncMonth
+from django.utils import timezone
+
+from ..models import ArchivedTransaction, GoalContribution, Transaction, TransactionRollup
+from .analytics import bump_data_version
+from .batching import DEFAULT_BATCH_SIZE
+from .goals import refresh_stale_goals_safely
+
+ARCHIVE_AFTER_DAYS = 730
+
+# Columns copied from Transaction; categorization flags are not kept
+ARCHIVED_FIELDS = (
+    "account_id", "category_id", "fitid", "posted_date", "amount",
+    "trntype", "name", "memo", "checknum", "currency",
+)
+
+
+def default_cutoff() -> datetime:
+    return timezone.now() - timedelta(days=ARCHIVE_AFTER_DAYS)
+
+
+def archive_transactions(user: User, cutoff: datetime | None = None, batch_size: int = DEFAULT_BATCH_SIZE) -> int:
+    """
+    Move the user's transactions posted before ``cutoff`` (default two years
+    ago) into the archive. Returns the number moved. Each batch commits on
+    its own with its rollup increments, so readers never see rows that are
+    in neither the hot table nor the rollups and the write lock is released
+    between batches. A transaction whose FITID is already archived for its
+    account stays in the hot table.
+    """
+    cutoff = cutoff or default_cutoff()
+    old = Transaction.objects.filter(account__user=user, posted_date__lt=cutoff).order_by("pk")
+
+    moved, last_pk = 0, 0
+    while True:
+        with db_transaction.atomic():
+            rows = list(old.filter(pk__gt=last_pk).values("pk", *ARCHIVED_FIELDS)[:batch_size])
+            if not rows:
+                break
+            last_pk = rows[-1]["pk"]
+            archived = set(
+                ArchivedTransaction.objects.filter(
+                    account_id__in={row["account_id"] for row in rows},
+                    fitid__in=[row["fitid"] for row in rows],
+                ).values_list("account_id", "fitid")
+            )
+            rows = [row for row in rows if (row["account_id"], row["fitid"]) not in archived]
+            if not rows:
+                continue
+            pks = [row["pk"] for row in rows]
+            ArchivedTransaction.objects.bulk_create(
+                [ArchivedTransaction(**{field: row[field] for field in ARCHIVED_FIELDS}) for row in rows]
+            )
+            # The rollups carry these amounts toward goals from now on
+            GoalContribution.objects.filter(transaction_id__in=pks).delete()
+            Transaction.objects.filter(pk__in=pks).delete()
+            add_to_rollups(rows)
+            bump_data_version(user.id)
+        moved += len(rows)
+
+    if moved:
+        refresh_stale_goals_safely(user)
+    return moved
+
+
+def delete_old_transactions(user: User, cutoff: datetime | None = None) -> int:
+    """
+    Delete the user's transactions posted before ``cutoff`` (default two
+    years ago), hot and archived, with their goal ledger entries and
+    rollups. Returns the number of transactions deleted.
+    """
+    cutoff = cutoff or default_cutoff()
+    with db_transaction.atomic():
+        deleted = Transaction.objects.filter(account__user=user, posted_date__lt=cutoff).delete()[1].get(
+            Transaction._meta.label, 0
+        )
+        archived = ArchivedTransaction.objects.filter(account__user=user, posted_date__lt=cutoff)
+        account_ids = set(archived.values_list("account_id", flat=True))
+        deleted += archived.delete()[0]
+        if account_ids:
+            rebuild_rollups(account_ids)
+
+    if deleted:
+        bump_data_version(user.id)
+        refresh_stale_goals_safely(user)
+    return deleted
+
+
+def rebuild_rollups(account_ids) -> int:
+    """Recompute the rollups of the given accounts from their archived rows"""
+    account_ids = list(account_ids)
+    TransactionRollup.objects.filter(account_id__in=account_ids).delete()
+    groups = (
+        ArchivedTransaction.objects.filter(account_id__in=account_ids)
+        .annotate(month=TruncMonth("posted_date", output_field=DateField()))
+        .values("account_id", "category_id", "month")
+        .annotate(
+            income=Sum("amount", filter=Q(amount__gt=0)),
+            expenses=Sum("amount", filter=Q(amount__lt=0)),
+            count=Count("id"),
+        )
+        .order_by()
+    )
+    rollups = [
+        TransactionRollup(
+            account_id=group["account_id"],
+            category_id=group["category_id"],
+            month=group["month"],
+            income=group["income"] or 0,
+            expenses=group["expenses"] or 0,
+            count=group["count"],
+        )
+        for group in groups
+    ]
+    TransactionRollup.objects.bulk_create(rollups, batch_size=DEFAULT_BATCH_SIZE)
+    return len(rollups)
+
+
+def add_to_rollups(rows) -> None:
+    """Add newly archived rows (dicts of ARCHIVED_FIELDS) to their months' rollups"""
+    groups: dict[tuple, list] = defaultdict(lambda: [Decimal("0"), Decimal("0"), 0])
+    for row in rows:
+        month = timezone.localtime(row["posted_date"]).date().replace(day=1)
+        group = groups[row["account_id"], row["category_id"], month]
+        group[0 if row["amount"] > 0 else 1] += row["amount"]
+        group[2] += 1
+    for (account_id, category_id, month), (income, expenses, count) in groups.items():
+        updated = TransactionRollup.objects.filter(account_id=account_id, category_id=category_id, month=month).update(
+            income=F("income") + income, expenses=F("expenses") + expenses, count=F("count") + count,
+        )
+        if not updated:
+            TransactionRollup.objects.create(
+                account_id=account_id, category_id=category_id, month=month,
+                income=income, expenses=expenses, count=count,
+            )
+
+
+def archived_fitids(account, fitids) -> set[str]:
+    """FITIDs among ``fitids`` already in the account's archive, so imports skip them"""
+    return set(
+        ArchivedTransaction.objects.filter(account=account, fitid__in=list(fitids)).values_list("fitid", flat=True)
+    )
+
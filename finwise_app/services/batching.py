@@ -0,0 +1,43 @@
+"""
+Batched iteration over large querysets
+On PostgreSQL ``iter_batches`` streams rows through one server-side cursor
+(``QuerySet.iterator``), so memory stays flat and the query runs once. Other
+backends fetch keyset pages ordered by primary key, which is also safe when
+the caller updates the rows it has already been given between batches.
+"""
+from __future__ import annotations
+
+from itertools import islice
+from typing import Iterator
+
+from django.db import connections
+from django.db.models import QuerySet
+
+DEFAULT_BATCH_SIZE = 2000
+
+
+def uses_server_side_cursors(queryset: QuerySet) -> bool:
+    settings_dict = connections[queryset.db].settings_dict
+    return (
+        connections[queryset.db].vendor == "postgresql"
+        and not settings_dict.get("DISABLE_SERVER_SIDE_CURSORS")
+    )
+
+
+def iter_batches(queryset: QuerySet, batch_size: int = DEFAULT_BATCH_SIZE) -> Iterator[list]:
+    """Yield lists of at most ``batch_size`` model instances from ``queryset``"""
+    if uses_server_side_cursors(queryset):
+        rows = queryset.iterator(chunk_size=batch_size)
+        while batch := list(islice(rows, batch_size)):
+            yield batch
+        return
+
+    last_pk = None
+    queryset = queryset.order_by("pk")
+    while True:
+        page = queryset if last_pk is None else queryset.filter(pk__gt=last_pk)
+        batch = list(page[:batch_size])
+        if not batch:
+            return
+        yield batch
+        last_pk = batch[-1].pk
@@ -0,0 +1,203 @@
+"""
+Recurring bill calendar
+Every active (pending or overdue) bill is expanded into BillOccurrence rows,
+one per due date, up to BILL_CALENDAR_HORIZON_DAYS ahead. Upcoming-payment
+questions ("what is due in the next 90 days") are then one range query on
+the (user, due_date) index.
+
+Only a bill's own due date can be overdue: an overdue recurring bill has a
+row for that date, then rows from its first date on or after today. The
+dates missed in between are not separate debts; paying the bill moves the
+series on.
+
+- ``occurrence_dates`` computes a bill's dates with numpy date arithmetic
+  from the bill's own due date and its series day, so a bill due on the
+  31st falls on the last day of shorter months without drifting earlier
+- ``next_due_date`` is the date the next bill gets when one is paid, from
+  the same arithmetic, so the bills created match the calendar
+- ``sync_bill`` rebuilds one bill's rows after it is added, edited or paid
+  (paying drops its rows; the next bill carries the series on)
+- ``extend_calendar`` (``manage.py extend_bill_calendar``, run daily)
+  inserts only the dates past each bill's last expanded one, in bulk, and
+  drops rows of bills that are no longer active and past rows other than
+  a bill's own due date
+"""
+from __future__ import annotations
+
+from collections import defaultdict
+from datetime import date, timedelta
+from decimal import Decimal
+
+import numpy as np
+from django.conf import settings
+from django.db.models import F, Max, Q
+from django.utils import timezone
+
+from ..models import Bill, BillOccurrence
+
+ACTIVE_STATUSES = ("PENDING", "OVERDUE")
+INSERT_BATCH_SIZE = 2000
+
+# frequency -> (numpy unit, step)
+STEPS = {
+    "WEEKLY": ("D", 7),
+    "BIWEEKLY": ("D", 14),
+    "MONTHLY": ("M", 1),
+    "QUARTERLY": ("M", 3),
+    "YEARLY": ("M", 12),
+}
+
+
+def horizon_end(today: date | None = None, horizon_days: int | None = None) -> date:
+    today = today or timezone.now().date()
+    return today + timedelta(days=horizon_days or settings.BILL_CALENDAR_HORIZON_DAYS)
+
+
+def _month_day(month: np.ndarray, day: int) -> np.ndarray:
+    """``day`` of each month, or its last day when the month is shorter"""
+    month_ends = (month + 1).astype("datetime64[D]") - 1
+    return np.minimum(month.astype("datetime64[D]") + (day - 1), month_ends)
+
+
+def occurrence_dates(start: date, frequency: str, until: date, day: int | None = None) -> list[date]:
+    """Due dates of a bill from ``start`` (inclusive) through ``until``
+
+    Monthly steps fall on ``day`` (default ``start.day``); a ``day`` that
+    would not give ``start`` itself is ignored, so editing the due date
+    starts a new series.
+    """
+    if until < start:
+        return []
+    if frequency not in STEPS:
+        # One-time bills
+        return [start]
+
+    unit, step = STEPS[frequency]
+    end = np.datetime64(until, "D")
+    if unit == "D":
+        dates = np.arange(np.datetime64(start, "D"), end + 1, step)
+    else:
+        first_month = np.datetime64(start, "M")
+        if day is None or _month_day(first_month, day) != np.datetime64(start, "D"):
+            day = start.day
+        count = int((np.datetime64(until, "M") - first_month).astype(int)) // step + 1
+        dates = _month_day(first_month + np.arange(count) * step, day)
+        dates = dates[dates <= end]
+    return dates.astype(object).tolist()
+
+
+def series_day(bill: Bill) -> int:
+    """Day of the month the bill's series falls on"""
+    day = bill.series_day
+    if day and _month_day(np.datetime64(bill.due_date, "M"), day) == np.datetime64(bill.due_date, "D"):
+        return day
+    return bill.due_date.day
+
+
+def next_due_date(bill: Bill) -> date:
+    """Due date of the bill after this one in its series"""
+    unit, step = STEPS[bill.frequency]
+    if unit == "D":
+        return bill.due_date + timedelta(days=step)
+    return _month_day(np.datetime64(bill.due_date, "M") + step, series_day(bill)).astype(object)
+
+
+def _current(today: date) -> Q:
+    """Occurrences that are still owed: the bill's own due date and anything from today on"""
+    return Q(due_date__gte=today) | Q(due_date=F("bill__due_date"))
+
+
+def _rows(bill: Bill, today: date, until: date, after: date | None = None) -> list[BillOccurrence]:
+    return [
+        BillOccurrence(bill_id=bill.id, user_id=bill.user_id, due_date=due_date, amount=bill.amount)
+        for due_date in occurrence_dates(bill.due_date, bill.frequency, until, bill.series_day)
+        if (due_date >= today or due_date == bill.due_date) and (after is None or due_date > after)
+    ]
+
+
+def sync_bill(bill: Bill, today: date | None = None) -> int:
+    """Rebuild one bill's occurrences; returns the number created"""
+    BillOccurrence.objects.filter(bill=bill).delete()
+    if bill.status not in ACTIVE_STATUSES:
+        return 0
+    today = today or timezone.now().date()
+    rows = _rows(bill, today, horizon_end(today))
+    BillOccurrence.objects.bulk_create(rows)
+    return len(rows)
+
+
+def extend_calendar(bills=None, today: date | None = None, horizon_days: int | None = None,
+                    batch_size: int = INSERT_BATCH_SIZE) -> dict[str, int]:
+    """Expand active bills up to the horizon and prune inactive ones; returns counts"""
+    bills = Bill.objects.all() if bills is None else bills
+    today = today or timezone.now().date()
+    until = horizon_end(today, horizon_days)
+
+    removed, _ = BillOccurrence.objects.filter(bill__in=bills.exclude(status__in=ACTIVE_STATUSES)).delete()
+
+    active = bills.filter(status__in=ACTIVE_STATUSES)
+    # Dates that passed while the bill stayed unpaid
+    lapsed, _ = BillOccurrence.objects.filter(bill__in=active).exclude(_current(today)).delete()
+    removed += lapsed
+    expanded_to = dict(
+        BillOccurrence.objects.filter(bill__in=active)
+        .values("bill")
+        .annotate(last=Max("due_date"))
+        .values_list("bill", "last")
+    )
+    created, pending = 0, []
+    for bill in active.only("id", "user_id", "due_date", "series_day", "frequency", "amount").iterator(chunk_size=batch_size):
+        pending += _rows(bill, today, until, after=expanded_to.get(bill.id))
+        if len(pending) >= batch_size:
+            BillOccurrence.objects.bulk_create(pending, ignore_conflicts=True)
+            created, pending = created + len(pending), []
+    if pending:
+        BillOccurrence.objects.bulk_create(pending, ignore_conflicts=True)
+        created += len(pending)
+    return {"created": created, "removed": removed}
+
+
+def upcoming(user, start: date | None, end: date):
+    """The user's occurrences due up to ``end`` (from ``start`` if given), soonest first"""
+    occurrences = BillOccurrence.objects.filter(user=user, due_date__lte=end)
+    if start is not None:
+        occurrences = occurrences.filter(due_date__gte=start)
+    return occurrences.order_by("due_date", "id")
+
+
+def cash_needs(user, days: int, today: date | None = None) -> dict:
+    """Money needed for bills over the next ``days`` days, with what is already overdue"""
+    today = today or timezone.now().date()
+    end = today + timedelta(days=days)
+    # Past rows the daily extend has not pruned yet do not count
+    rows = upcoming(user, None, end).filter(_current(today)).values(
+        "due_date", "amount", "bill_id", "bill__name", "bill__frequency", "bill__category__name",
+    )
+
+    overdue, total = Decimal("0"), Decimal("0")
+    by_month: dict[str, Decimal] = defaultdict(Decimal)
+    payments = []
+    for row in rows:
+        if row["due_date"] < today:
+            overdue += row["amount"]
+        else:
+            total += row["amount"]
+            by_month[row["due_date"].strftime("%Y-%m")] += row["amount"]
+        payments.append({
+            "bill_id": row["bill_id"],
+            "name": row["bill__name"],
+            "category": row["bill__category__name"],
+            "frequency": row["bill__frequency"],
+            "due_date": row["due_date"].isoformat(),
+            "amount": float(row["amount"]),
+            "overdue": row["due_date"] < today,
+        })
+
+    return {
+        "start": today.isoformat(),
+        "end": end.isoformat(),
+        "total": float(total),
+        "overdue_total": float(overdue),
+        "by_month": [{"month": month, "amount": float(amount)} for month, amount in sorted(by_month.items())],
+        "payments": payments,
+    }
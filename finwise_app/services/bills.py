@@ -0,0 +1,65 @@
+"""
+Bill status and summaries
+Pending bills past their due date are moved to OVERDUE by ``sweep_overdue``
+(``manage.py sweep_overdue_bills``, run periodically) in one bulk pass
+across all users, so pages never write. Between sweeps a PENDING bill may
+already be past due; ``overdue_q`` and ``pending_q`` count it as overdue, so
+pages agree with the sweeper whenever it last ran.
+"""
+from __future__ import annotations
+
+from datetime import date
+
+from django.db.models import Count, Q
+from django.utils import timezone
+
+from ..models import Bill
+
+SWEEP_CHUNK_SIZE = 1000
+
+
+def overdue_q(today: date) -> Q:
+    return Q(status="OVERDUE") | Q(status="PENDING", due_date__lt=today)
+
+
+def pending_q(today: date) -> Q:
+    return Q(status="PENDING", due_date__gte=today)
+
+
+def filter_status(queryset, status: str, today: date):
+    """Filter bills by status as the user sees it"""
+    if status == "OVERDUE":
+        return queryset.filter(overdue_q(today))
+    if status == "PENDING":
+        return queryset.filter(pending_q(today))
+    return queryset.filter(status=status)
+
+
+def bill_summary(queryset, today: date | None = None) -> dict:
+    """Pending, overdue and paid-this-month counts in one query"""
+    today = today or timezone.now().date()
+    return queryset.aggregate(
+        total_pending=Count("id", filter=pending_q(today)),
+        total_overdue=Count("id", filter=overdue_q(today)),
+        total_paid_this_month=Count("id", filter=Q(
+            status="PAID",
+            last_paid_date__year=today.year,
+            last_paid_date__month=today.month,
+        )),
+    )
+
+
+def sweep_overdue(today: date | None = None, chunk_size: int = SWEEP_CHUNK_SIZE) -> int:
+    """Mark pending bills past their due date OVERDUE; returns the number changed"""
+    today = today or timezone.now().date()
+    swept = 0
+    # Chunks keep each write transaction, and the SQLite write lock, short
+    while True:
+        ids = list(
+            Bill.objects.filter(status="PENDING", due_date__lt=today)
+            .order_by()
+            .values_list("id", flat=True)[:chunk_size]
+        )
+        if not ids:
+            return swept
+        swept += Bill.objects.filter(id__in=ids, status="PENDING").update(status="OVERDUE")
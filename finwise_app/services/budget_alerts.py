@@ -0,0 +1,202 @@
+"""
+Budget threshold alerts
+After an import commits, ``check_import`` adds the new expenses to running
+BudgetSpend totals for only the (category, month) pairs they touch and that
+have a spending budget. It compares the totals before and after against the
+budget amounts and queues a notification (services.notifications) for each
+BUDGET_ALERT_THRESHOLDS percentage crossed in the current month. The
+outbox dedupe key makes each alert go out once.
+
+A total is only trusted while nothing else changed the user's data. Each
+row records the data version (services.analytics) it is current for. Any
+other write bumps the version (recategorizing, deleting, dedupe, admin
+edits), and the next import recounts that pair once from the transactions
+and rollups. In the steady state an import never rescans the month. The
+version lives in the database (DataVersion), so every worker process sees
+the same one; it is read after the counters are locked, so concurrent
+imports compare against the version the previous one wrote.
+"""
+from __future__ import annotations
+
+import logging
+from collections import defaultdict
+from datetime import date, datetime
+from decimal import Decimal
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction as db_transaction
+from django.db.models import Sum
+from django.db.models.functions import TruncMonth
+from django.utils import timezone
+
+from ..models import Budget, BudgetSpend, Transaction, TransactionRollup
+from .analytics import get_data_version
+from .notifications import notify
+
+logger = logging.getLogger(__name__)
+
+BUDGET_AMOUNTS_KEY = "budget_amounts:{user_id}"
+BUDGET_AMOUNTS_TTL = 3600
+
+
+def budget_amounts(user_id: int) -> dict[tuple[int, date], Decimal]:
+    """{(category_id, month): amount} of the user's spending budgets, cached"""
+    key = BUDGET_AMOUNTS_KEY.format(user_id=user_id)
+    amounts = cache.get(key)
+    if amounts is None:
+        amounts = {
+            (category_id, month): amount
+            for category_id, month, amount in Budget.objects.filter(
+                user_id=user_id, budget_type="BUDGET"
+            ).values_list("category_id", "month", "amount")
+        }
+        cache.set(key, amounts, BUDGET_AMOUNTS_TTL)
+    return amounts
+
+
+def forget_budget_amounts(user_id: int) -> None:
+    """Call after creating, changing or deleting a user's budgets"""
+    cache.delete(BUDGET_AMOUNTS_KEY.format(user_id=user_id))
+
+
+def _month_of(posted: datetime) -> date:
+    # Budget months are local calendar months (Budget.get_month_bounds); the
+    # regex importer hands over naive datetimes, stored as local time
+    if timezone.is_naive(posted):
+        posted = timezone.make_aware(posted)
+    return timezone.localtime(posted).date().replace(day=1)
+
+
+def _recount(user, pairs: set[tuple[int, date]]) -> dict[tuple[int, date], Decimal]:
+    """Full expense totals for the given pairs: two grouped queries"""
+    categories = {category_id for category_id, _month in pairs}
+    months = sorted({month for _category_id, month in pairs})
+    start = timezone.make_aware(datetime.combine(months[0], datetime.min.time()))
+    last = months[-1]
+    end = timezone.make_aware(datetime(last.year + (last.month == 12), last.month % 12 + 1, 1))
+
+    totals = defaultdict(Decimal)
+    rows = (
+        Transaction.objects.filter(
+            account__user=user,
+            category_id__in=categories,
+            posted_date__gte=start,
+            posted_date__lt=end,
+            amount__lt=0,
+        )
+        .annotate(month=TruncMonth("posted_date"))
+        .values("category_id", "month")
+        .annotate(total=Sum("amount"))
+        .order_by()
+    )
+    for row in rows:
+        totals[(row["category_id"], _month_of(row["month"]))] -= row["total"]
+    rollups = (
+        TransactionRollup.objects.filter(account__user=user, category_id__in=categories, month__in=months)
+        .values("category_id", "month")
+        .annotate(total=Sum("expenses"))
+        .order_by()
+    )
+    for row in rollups:
+        totals[(row["category_id"], row["month"])] -= row["total"]
+    return {pair: totals[pair] for pair in pairs}
+
+
+def _queue_alert(user, category_id: int, category_name: str, month: date, threshold: int,
+                 spent: Decimal, amount: Decimal) -> None:
+    subject = f"Budget alert: {category_name} is at {threshold}% for {month:%B %Y}"
+    body = (
+        f"Hi {user.username},\n\n"
+        f"You have spent ${spent:.2f} of your ${amount:.2f} {category_name} budget for {month:%B %Y} "
+        f"({spent / amount * 100:.0f}%).\n\n"
+        f"Review your budgets in FinWise."
+    )
+    key = f"budget_alert:{user.id}:{category_id}:{month:%Y-%m}:{threshold}"
+    if user.email:
+        notify("email", user.email, subject, body, user=user, kind="budget_alert", dedupe_key=f"{key}:email")
+    notify("push", f"user:{user.id}", subject, body, user=user, kind="budget_alert", dedupe_key=f"{key}:push")
+
+
+def check_import(user, transactions, today: date | None = None) -> int:
+    """
+    Add newly imported transactions to the running totals and queue alerts
+    for thresholds they cross. Call right after the import's
+    ``bump_data_version``. Returns the number of alerts queued.
+    """
+    amounts = budget_amounts(user.id)
+    deltas: dict[tuple[int, date], Decimal] = defaultdict(Decimal)
+    for txn in transactions:
+        if txn.amount < 0 and txn.category_id:
+            pair = (txn.category_id, _month_of(txn.posted_date))
+            if pair in amounts:
+                deltas[pair] -= txn.amount
+    if not deltas:
+        return 0
+
+    with db_transaction.atomic():
+        counters = {
+            (row.category_id, row.month): row
+            for row in BudgetSpend.objects.select_for_update().filter(
+                user=user,
+                category_id__in={category_id for category_id, _month in deltas},
+                month__in={month for _category_id, month in deltas},
+            )
+        }
+        # Totals written before this import are current if the only change
+        # since is the import's own version bump
+        version = get_data_version(user.id)
+        stale = {pair for pair in deltas if pair not in counters or counters[pair].data_version != version - 1}
+        recounted = _recount(user, stale) if stale else {}
+
+        before, after = {}, {}
+        for pair, delta in deltas.items():
+            if pair in stale:
+                # The recount already includes this import
+                after[pair] = recounted[pair]
+                before[pair] = after[pair] - delta
+            else:
+                before[pair] = counters[pair].spent
+                after[pair] = before[pair] + delta
+
+        updated = []
+        for pair, total in after.items():
+            counter = counters.get(pair)
+            if counter is None:
+                BudgetSpend.objects.create(
+                    user=user, category_id=pair[0], month=pair[1], spent=total, data_version=version
+                )
+            else:
+                counter.spent, counter.data_version = total, version
+                updated.append(counter)
+        BudgetSpend.objects.bulk_update(updated, ["spent", "data_version"])
+
+    # Alerts are about spending as it happens, not history imported later
+    current_month = (today or timezone.localdate()).replace(day=1)
+    queued = 0
+    names = {}
+    for pair, total in after.items():
+        category_id, month = pair
+        if month != current_month:
+            continue
+        amount = amounts[pair]
+        for threshold in settings.BUDGET_ALERT_THRESHOLDS:
+            limit = amount * threshold / 100
+            if before[pair] < limit <= total:
+                if not names:
+                    names = dict(
+                        Budget.objects.filter(user=user, month=current_month)
+                        .values_list("category_id", "category__name")
+                    )
+                _queue_alert(user, category_id, names.get(category_id, "Category"), month, threshold, total, amount)
+                queued += 1
+    return queued
+
+
+def check_import_safely(user, transactions) -> int:
+    """check_import for the importers: alert failures are logged, never fail the import"""
+    try:
+        return check_import(user, transactions)
+    except Exception:
+        logger.exception("Budget alert check failed for user %s", user.id)
+        return 0
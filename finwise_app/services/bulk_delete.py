@@ -0,0 +1,192 @@
+"""
+Chunked bulk deletion
+Large deletes run as a series of short transactions, each removing at most
+DELETE_CHUNK_SIZE rows by primary key, instead of one ``QuerySet.delete()``
+that collects every row in Python and holds the write lock until the end.
+Chunks go through the write queue, so on SQLite other writers get a turn
+between them. Models with no cascades or delete signals are removed with a
+plain ``DELETE ... WHERE id IN (...)`` (``_raw_delete``); anything else
+falls back to ``delete()`` per chunk so cascades still run.
+
+Deletions above BACKGROUND_THRESHOLD rows are queued as a DeletionJob and
+run by ``manage.py run_deletion_worker``, which records progress on the
+row. The highest id of every step is recorded when the job is queued, so
+rows imported while it runs are left alone, and a job whose worker died
+(no progress for DELETION_JOB_TIMEOUT_MINUTES) is queued again and resumes
+where it stopped. Until a worker picks a job up nothing is deleted, and a
+user deleting their account stays deactivated.
+"""
+from __future__ import annotations
+
+import logging
+import uuid
+from dataclasses import dataclass
+from datetime import timedelta
+from typing import Callable
+
+from django.conf import settings
+from django.db import transaction as db_transaction
+from django.db.models import Count, Max, QuerySet
+from django.db.models.deletion import Collector
+from django.utils import timezone
+
+from ..models import (
+    ArchivedTransaction, Bill, BillOccurrence, Budget, DeletionJob, GoalContribution, Transaction, TransactionRollup,
+)
+from .analytics import bump_data_version
+from .budget_alerts import forget_budget_amounts
+from .goals import refresh_stale_goals_safely
+from .write_queue import serialized_write
+
+logger = logging.getLogger(__name__)
+
+DELETE_CHUNK_SIZE = 1000
+BACKGROUND_THRESHOLD = 20_000
+
+
+@dataclass
+class DeletionStep:
+    label: str
+    queryset: QuerySet
+
+
+def _delete_chunk(queryset: QuerySet, chunk_size: int) -> int:
+    """Delete the next ``chunk_size`` rows of ``queryset`` by id; returns how many"""
+    with db_transaction.atomic(using=queryset.db):
+        ids = list(queryset.order_by("pk").values_list("pk", flat=True)[:chunk_size])
+        if not ids:
+            return 0
+        chunk = queryset.model._base_manager.using(queryset.db).filter(pk__in=ids)
+        if Collector(using=queryset.db).can_fast_delete(chunk):
+            chunk._raw_delete(queryset.db)
+        else:
+            chunk.delete()
+    return len(ids)
+
+
+def run_steps(
+    steps: list[DeletionStep],
+    chunk_size: int = DELETE_CHUNK_SIZE,
+    progress: Callable[[str, int], None] | None = None,
+) -> int:
+    """Delete every step's rows chunk by chunk; returns the total deleted"""
+    deleted = 0
+    for step in steps:
+        while True:
+            count = serialized_write(_delete_chunk, step.queryset, chunk_size, operation="bulk_delete")
+            if not count:
+                break
+            deleted += count
+            if progress:
+                progress(step.label, deleted)
+    return deleted
+
+
+def user_data_steps(user, transactions: bool = False, budgets: bool = False, bills: bool = False) -> list[DeletionStep]:
+    """Deletion steps for a user's data; accounts and the user row are small and left to the caller"""
+    steps = []
+    if transactions:
+        steps += [
+            DeletionStep("transactions", Transaction.objects.filter(account__user=user)),
+            DeletionStep("archived transactions", ArchivedTransaction.objects.filter(account__user=user)),
+            DeletionStep("rollups", TransactionRollup.objects.filter(account__user=user)),
+        ]
+    if budgets:
+        steps += [
+            DeletionStep("goal contributions", GoalContribution.objects.filter(user=user)),
+            DeletionStep("budgets", Budget.objects.filter(user=user)),
+        ]
+    if bills:
+        steps += [
+            DeletionStep("bill calendar", BillOccurrence.objects.filter(user=user)),
+            DeletionStep("bills", Bill.objects.filter(user=user)),
+        ]
+    return steps
+
+
+def count_steps(steps: list[DeletionStep]) -> int:
+    return sum(step.queryset.count() for step in steps)
+
+
+def queue_deletion(
+    user, transactions: bool = False, budgets: bool = False, bills: bool = False, delete_user: bool = False,
+) -> DeletionJob:
+    """Queue the user's data (and with ``delete_user`` the user row) for the deletion worker"""
+    max_ids, total = {}, 0
+    for step in user_data_steps(user, transactions=transactions, budgets=budgets, bills=bills):
+        stats = step.queryset.aggregate(max_id=Max("pk"), count=Count("pk"))
+        if stats["max_id"] is not None:
+            max_ids[step.label] = stats["max_id"]
+            total += stats["count"]
+    return DeletionJob.objects.create(
+        user=user, token=uuid.uuid4().hex, transactions=transactions, budgets=budgets, bills=bills,
+        delete_user=delete_user, max_ids=max_ids, total=total,
+    )
+
+
+def job_steps(job: DeletionJob) -> list[DeletionStep]:
+    """The job's steps, limited to the rows that existed when it was queued"""
+    steps = user_data_steps(job.user, transactions=job.transactions, budgets=job.budgets, bills=job.bills)
+    return [
+        DeletionStep(step.label, step.queryset.filter(pk__lte=job.max_ids[step.label]))
+        for step in steps if step.label in job.max_ids
+    ]
+
+
+def claim_next() -> DeletionJob | None:
+    """Mark the oldest queued job RUNNING and return it"""
+    while True:
+        job = DeletionJob.objects.filter(status="PENDING").order_by("created_at", "id").first()
+        if job is None:
+            return None
+        if DeletionJob.objects.filter(pk=job.pk, status="PENDING").update(status="RUNNING", updated_at=timezone.now()):
+            job.refresh_from_db()
+            return job
+        # Another worker took it; look again
+
+
+def run_job(job: DeletionJob, chunk_size: int = DELETE_CHUNK_SIZE) -> DeletionJob:
+    """Delete the job's rows, recording progress after every chunk, then the outcome"""
+    resumed_from = job.deleted
+
+    def progress(label: str, count: int) -> None:
+        job.step, job.deleted = label, resumed_from + count
+        job.save(update_fields=["step", "deleted", "updated_at"])
+
+    try:
+        if job.user is not None:
+            run_steps(job_steps(job), chunk_size, progress)
+            if job.delete_user:
+                serialized_write(job.user.delete, operation="delete_account")
+                job.user = None
+            else:
+                bump_data_version(job.user_id)
+                refresh_stale_goals_safely(job.user)
+                if job.budgets:
+                    forget_budget_amounts(job.user_id)
+    except Exception as exc:
+        logger.exception("Deletion job %s failed", job.id)
+        job.status, job.error = "FAILED", str(exc)[:1000]
+    else:
+        job.status = "DONE"
+    job.step, job.finished_at = "", timezone.now()
+    job.save(update_fields=["status", "error", "step", "finished_at", "updated_at"])
+    return job
+
+
+def requeue_stale(now=None) -> int:
+    """Queue RUNNING jobs without progress past the timeout again (their worker died)"""
+    now = now or timezone.now()
+    cutoff = now - timedelta(minutes=settings.DELETION_JOB_TIMEOUT_MINUTES)
+    return DeletionJob.objects.filter(status="RUNNING", updated_at__lt=cutoff).update(status="PENDING", updated_at=now)
+
+
+def deletion_status(token: str) -> dict | None:
+    """Progress of a background deletion: state, step, deleted, total (and error)"""
+    job = DeletionJob.objects.filter(token=token).first()
+    if job is None:
+        return None
+    status = {"state": job.status.lower(), "step": job.step or None, "deleted": job.deleted, "total": job.total}
+    if job.error:
+        status["error"] = job.error
+    return status
@@ -9,6 +9,7 @@ from django.utils import timezone
 from django.core.cache import cache
 
 from ..models import Transaction, Category
+from ..metrics import CACHE_REQUESTS, CATEGORIZATION_DURATION, CATEGORIZED_TRANSACTIONS
 
 
 class TransactionCategorizationService:
@@ -28,8 +29,10 @@ class TransactionCategorizationService:
         # Try cache first
         cached_categories = cache.get(self.CACHE_KEY_CATEGORIES)
         if cached_categories:
+            CACHE_REQUESTS.inc(cache="categories", result="hit")
             self._categories_cache = cached_categories
             return cached_categories
+        CACHE_REQUESTS.inc(cache="categories", result="miss")
         
         # Build categories list with keywords
         categories = []
@@ -47,6 +50,15 @@ class TransactionCategorizationService:
         self._categories_cache = categories
         return categories
     
+    def find_category_id(self, text: str, categories: Optional[List[Dict]] = None) -> Optional[int]:
+        """Return the id of the first active category with a keyword found in text"""
+        text_to_match = text.lower()
+        for category_data in categories if categories is not None else self.get_active_categories():
+            for keyword in category_data['keywords']:
+                if keyword in text_to_match:
+                    return category_data['id']
+        return None
+    
     def categorize_transaction(self, transaction: Transaction) -> bool:
         """
         Categorize a single transaction within 3 seconds (FR04 requirement)
@@ -57,21 +69,8 @@ class TransactionCategorizationService:
         if transaction.is_categorized:
             return True
         
-        # Get transaction text for matching
-        text_to_match = f"{transaction.name} {transaction.memo}".lower()
-        
-        # Get active categories
-        categories = self.get_active_categories()
-        
         # Find matching category
-        matched_category_id = None
-        for category_data in categories:
-            for keyword in category_data['keywords']:
-                if keyword in text_to_match:
-                    matched_category_id = category_data['id']
-                    break
-            if matched_category_id:
-                break
+        matched_category_id = self.find_category_id(f"{transaction.name} {transaction.memo}")
         
         # Apply categorization
         if matched_category_id:
@@ -95,6 +94,8 @@ class TransactionCategorizationService:
         
         # Check timing requirement
         elapsed_time = time.time() - start_time
+        CATEGORIZATION_DURATION.observe(elapsed_time, mode="single")
+        CATEGORIZED_TRANSACTIONS.inc(mode="single", result="matched" if matched_category_id else "uncategorized")
         if elapsed_time > 3.0:
             # Log performance issue but don't fail
             import logging
@@ -137,24 +138,17 @@ class TransactionCategorizationService:
         )
         
         # Categorize in bulk
+        matched = 0
         with db_transaction.atomic():
             for txn in uncategorized_txns:
                 try:
-                    text_to_match = f"{txn.name} {txn.memo}".lower()
-                    
                     # Find matching category
-                    matched_category_id = None
-                    for category_data in categories:
-                        for keyword in category_data['keywords']:
-                            if keyword in text_to_match:
-                                matched_category_id = category_data['id']
-                                break
-                        if matched_category_id:
-                            break
+                    matched_category_id = self.find_category_id(f"{txn.name} {txn.memo}", categories)
                     
                     # Apply category
                     if matched_category_id:
                         txn.category_id = matched_category_id
+                        matched += 1
                     else:
                         txn.category = uncategorized_category
                     
@@ -175,6 +169,9 @@ class TransactionCategorizationService:
             )
         
         elapsed_time = time.time() - start_time
+        CATEGORIZATION_DURATION.observe(elapsed_time, mode="bulk")
+        CATEGORIZED_TRANSACTIONS.inc(matched, mode="bulk", result="matched")
+        CATEGORIZED_TRANSACTIONS.inc(stats['categorized'] - matched, mode="bulk", result="uncategorized")
         avg_time_per_txn = elapsed_time / len(uncategorized_txns) if uncategorized_txns else 0
         
         # Log performance
@@ -0,0 +1,280 @@
+"""
+Dashboard widget payloads
+Each chart endpoint and the combined dashboard endpoint are thin adapters over
+the per-user columnar frame from the analytics engine. Every payload has an
+async twin (``a*_payload``) for the ASGI views that runs the frame load and
+the payload's own queries concurrently.
+"""
+from __future__ import annotations
+
+import asyncio
+from datetime import date, timedelta
+
+import numpy as np
+from django.contrib.auth.models import User
+
+from ..models import Account, Budget, Category
+from .analytics import (
+    NO_CATEGORY,
+    TransactionFrame,
+    aget_frame,
+    cents_to_float,
+    downsample,
+    get_frame,
+    month_label,
+    ordinals_to_strings,
+)
+
+DEFAULT_TREND_POINTS = 120
+MAX_TREND_POINTS = 1000
+
+
+def _next_month(value: date) -> date:
+    if value.month == 12:
+        return date(value.year + 1, 1, 1)
+    return date(value.year, value.month + 1, 1)
+
+
+def _frame_for(user: User, frame: TransactionFrame | None) -> TransactionFrame:
+    return frame if frame is not None else get_frame(user.id)
+
+
+async def _alist(queryset) -> list:
+    return [obj async for obj in queryset]
+
+
+def _current_budgets(user: User, current_month: date):
+    return Budget.objects.filter(user=user, month=current_month).select_related('category')
+
+
+def budgets_payload(user: User, frame: TransactionFrame | None = None) -> dict:
+    """Current month budgets with spent amounts"""
+    frame = _frame_for(user, frame)
+    current_month = date.today().replace(day=1)
+    return _budgets_result(frame, _current_budgets(user, current_month), current_month)
+
+
+async def abudgets_payload(user: User) -> dict:
+    current_month = date.today().replace(day=1)
+    frame, budgets = await asyncio.gather(
+        aget_frame(user.id), _alist(_current_budgets(user, current_month))
+    )
+    return _budgets_result(frame, budgets, current_month)
+
+
+def _budgets_result(frame: TransactionFrame, budgets, current_month: date) -> dict:
+    keys, totals = frame.window(current_month, _next_month(current_month)).expenses().category_totals()
+    spent_by_category = dict(zip(keys.tolist(), totals.tolist()))
+
+    budget_data = []
+    for budget in budgets:
+        spent = abs(cents_to_float(spent_by_category.get(budget.category_id, 0)))
+        amount = float(budget.amount)
+        percentage = spent / amount * 100 if amount > 0 else 0.0
+        budget_data.append({
+            'id': budget.id,
+            'category': budget.category.name,
+            'category_color': budget.category.color,
+            'budgeted': amount,
+            'spent': spent,
+            'remaining': round(amount - spent, 2),
+            'percentage': round(percentage, 1),
+            'over_threshold': percentage >= 80.0,
+        })
+
+    return {
+        'budgets': budget_data,
+        'month': current_month.strftime('%B %Y'),
+    }
+
+
+def _category_totals(frame: TransactionFrame, days: int) -> tuple[np.ndarray, np.ndarray]:
+    """Categorized expense totals since ``days`` days ago, largest spend first"""
+    keys, totals = frame.window(date.today() - timedelta(days=days)).expenses().category_totals()
+    keep = keys != NO_CATEGORY
+    keys, totals = keys[keep], totals[keep]
+    order = np.argsort(totals, kind='stable')
+    return keys[order], totals[order]
+
+
+def spending_by_category_payload(user: User, days: int, frame: TransactionFrame | None = None) -> dict:
+    """Expense totals per category over the last ``days`` days, largest first"""
+    keys, totals = _category_totals(_frame_for(user, frame), days)
+    category_meta = {
+        c['id']: c for c in Category.objects.filter(id__in=keys.tolist()).values('id', 'name', 'color')
+    }
+    return _spending_by_category_result(keys, totals, category_meta, days)
+
+
+async def aspending_by_category_payload(user: User, days: int) -> dict:
+    # The category table is small and shared, so it is read alongside the
+    # frame instead of after it
+    frame, meta_rows = await asyncio.gather(
+        aget_frame(user.id), _alist(Category.objects.values('id', 'name', 'color'))
+    )
+    keys, totals = _category_totals(frame, days)
+    return _spending_by_category_result(keys, totals, {c['id']: c for c in meta_rows}, days)
+
+
+def _spending_by_category_result(keys: np.ndarray, totals: np.ndarray, category_meta: dict, days: int) -> dict:
+    categories, amounts, colors = [], [], []
+    for category_id, total in zip(keys.tolist(), totals.tolist()):
+        meta = category_meta.get(category_id)
+        if not meta:
+            continue
+        categories.append(meta['name'])
+        amounts.append(abs(cents_to_float(total)))
+        colors.append(meta['color'] or '#6366F1')
+
+    return {
+        'categories': categories,
+        'amounts': amounts,
+        'colors': colors,
+        'period_days': days,
+    }
+
+
+def spending_trend_payload(
+    user: User,
+    days: int,
+    bucket: str = 'day',
+    max_points: int = DEFAULT_TREND_POINTS,
+    frame: TransactionFrame | None = None,
+) -> dict:
+    """
+    Zero-filled spending over the last ``days`` days per day, week or month,
+    downsampled to at most ``max_points`` points
+    """
+    return _spending_trend_result(_frame_for(user, frame), days, bucket, max_points)
+
+
+async def aspending_trend_payload(
+    user: User,
+    days: int,
+    bucket: str = 'day',
+    max_points: int = DEFAULT_TREND_POINTS,
+) -> dict:
+    return _spending_trend_result(await aget_frame(user.id), days, bucket, max_points)
+
+
+def _spending_trend_result(frame: TransactionFrame, days: int, bucket: str, max_points: int) -> dict:
+    today = date.today()
+
+    end = today + timedelta(days=1)
+    if len(frame) and frame.days[-1] >= end.toordinal():
+        # Include future-dated (scheduled) transactions like the ORM query did
+        end = date.fromordinal(int(frame.days[-1]) + 1)
+
+    ordinals, totals = frame.expenses().bucketed_totals(today - timedelta(days=days), end, bucket)
+    ordinals, totals, factor = downsample(ordinals, totals, max_points)
+
+    return {
+        'dates': ordinals_to_strings(ordinals),
+        'amounts': [abs(cents_to_float(t)) for t in totals.tolist()],
+        'period_days': days,
+        'bucket': bucket,
+        'downsample_factor': factor,
+    }
+
+
+def income_vs_expenses_payload(user: User, months: int, frame: TransactionFrame | None = None) -> dict:
+    """Monthly income and expenses from ``months`` * 30 days ago through this month"""
+    return _income_vs_expenses_result(_frame_for(user, frame), months)
+
+
+async def aincome_vs_expenses_payload(user: User, months: int) -> dict:
+    return _income_vs_expenses_result(await aget_frame(user.id), months)
+
+
+def _income_vs_expenses_result(frame: TransactionFrame, months: int) -> dict:
+    today = date.today()
+    start = (today - timedelta(days=30 * months)).replace(day=1)
+
+    month_indexes, income, expenses = frame.monthly_totals(start, _next_month(today))
+    monthly_data = [
+        {
+            'month': month_label(index),
+            'income': cents_to_float(inc),
+            'expenses': abs(cents_to_float(exp)),
+        }
+        for index, inc, exp in zip(month_indexes.tolist(), income.tolist(), expenses.tolist())
+    ]
+
+    return {
+        'data': monthly_data,
+    }
+
+
+def account_balance_payload(user: User, frame: TransactionFrame | None = None) -> dict:
+    """All-time balance per account, skipping accounts that net to zero"""
+    return _account_balance_result(_frame_for(user, frame), Account.objects.filter(user=user))
+
+
+async def aaccount_balance_payload(user: User) -> dict:
+    frame, accounts = await asyncio.gather(aget_frame(user.id), _alist(Account.objects.filter(user=user)))
+    return _account_balance_result(frame, accounts)
+
+
+def _account_balance_result(frame: TransactionFrame, accounts) -> dict:
+    keys, totals = frame.account_totals()
+    balances = dict(zip(keys.tolist(), totals.tolist()))
+
+    account_data = []
+    for account in accounts:
+        balance = balances.get(account.id, 0)
+        if balance != 0:
+            account_data.append({
+                'name': account.name or account.account_id,
+                'balance': cents_to_float(balance),
+                'type': account.get_type_display(),
+            })
+
+    return {
+        'accounts': account_data,
+    }
+
+
+def build_dashboard_data(
+    user: User,
+    category_days: int = 30,
+    trend_days: int = 30,
+    months: int = 6,
+) -> dict:
+    """
+    Compute budgets, spending by category, spending trend, income vs expenses
+    and account balances for ``user`` from one load of the transaction frame.
+    """
+    frame = get_frame(user.id)
+    return {
+        'budgets': budgets_payload(user, frame),
+        'spending_by_category': spending_by_category_payload(user, category_days, frame),
+        'spending_trend': spending_trend_payload(user, trend_days, frame=frame),
+        'income_vs_expenses': income_vs_expenses_payload(user, months, frame),
+        'account_balance': account_balance_payload(user, frame),
+    }
+
+
+async def abuild_dashboard_data(
+    user: User,
+    category_days: int = 30,
+    trend_days: int = 30,
+    months: int = 6,
+) -> dict:
+    """build_dashboard_data for async views; the widget queries run concurrently"""
+    current_month = date.today().replace(day=1)
+    frame, budgets, meta_rows, accounts = await asyncio.gather(
+        aget_frame(user.id),
+        _alist(_current_budgets(user, current_month)),
+        _alist(Category.objects.values('id', 'name', 'color')),
+        _alist(Account.objects.filter(user=user)),
+    )
+    keys, totals = _category_totals(frame, category_days)
+    return {
+        'budgets': _budgets_result(frame, budgets, current_month),
+        'spending_by_category': _spending_by_category_result(
+            keys, totals, {c['id']: c for c in meta_rows}, category_days
+        ),
+        'spending_trend': _spending_trend_result(frame, trend_days, 'day', DEFAULT_TREND_POINTS),
+        'income_vs_expenses': _income_vs_expenses_result(frame, months),
+        'account_balance': _account_balance_result(frame, accounts),
+    }
@@ -0,0 +1,87 @@
+"""
+Duplicate transaction detection
+Duplicates are found set-based with window functions over ``PARTITION BY``
+the duplicate key, so one query finds all candidates and deletes run in id
+batches, one transaction per batch.
+
+- exact: same account and FITID. The unique constraint prevents these in
+  new databases, but rows imported before it existed can still hold them.
+  Every row numbered above 1 in its partition is a copy of an older row.
+- fuzzy: same account, posted day, amount and name under different FITIDs,
+  which is what a bank re-export with regenerated FITIDs produces. Two
+  identical purchases on one day are real, so only rows of different
+  imports (``Transaction.import_batch``) match. The import holding the most
+  of a group's rows (the oldest on ties) has the real purchases and the
+  other imports' rows are copies, so a second pass finds nothing. Rows
+  imported before batches were recorded count as one import. Fuzzy matches
+  are a guess and are only deleted on request.
+"""
+from __future__ import annotations
+
+from collections import defaultdict
+
+from django.contrib.auth.models import User
+from django.db import transaction as db_transaction
+from django.db.models import Count, F, Window
+from django.db.models.functions import RowNumber, TruncDate
+
+from ..models import Transaction
+from .batching import DEFAULT_BATCH_SIZE
+
+PARTITIONS = {
+    "exact": lambda: [F("account_id"), F("fitid")],
+    "fuzzy": lambda: [F("account_id"), TruncDate("posted_date"), F("amount"), F("name")],
+}
+
+
+def _exact_ids(user: User) -> list[int]:
+    numbered = Transaction.objects.filter(account__user=user).annotate(
+        row_number=Window(RowNumber(), partition_by=PARTITIONS["exact"](), order_by=F("id").asc())
+    )
+    return list(numbered.filter(row_number__gt=1).order_by("id").values_list("id", flat=True))
+
+
+def _fuzzy_ids(user: User) -> list[int]:
+    candidates = (
+        Transaction.objects.filter(account__user=user)
+        .annotate(
+            day=TruncDate("posted_date"),
+            group_size=Window(Count("id"), partition_by=PARTITIONS["fuzzy"]()),
+        )
+        .filter(group_size__gt=1)
+        .order_by("id")
+        .values_list("id", "account_id", "day", "amount", "name", "import_batch")
+    )
+    rows = defaultdict(list)
+    for pk, *key, batch in candidates:
+        rows[tuple(key)].append((batch, pk))
+    ids = []
+    for group in rows.values():
+        per_import = defaultdict(list)
+        for batch, pk in group:
+            per_import[batch].append(pk)
+        # Ids ascend, so ties go to the oldest import
+        kept = max(per_import.values(), key=len)
+        ids.extend(pk for pks in per_import.values() if pks is not kept for pk in pks)
+    return sorted(ids)
+
+
+def duplicate_ids(user: User, kind: str = "exact") -> list[int]:
+    """Ids of the user's transactions that duplicate another one, by ``kind``"""
+    return _exact_ids(user) if kind == "exact" else _fuzzy_ids(user)
+
+
+def delete_duplicates(user: User, fuzzy: bool = False, batch_size: int = DEFAULT_BATCH_SIZE) -> dict[str, int]:
+    """
+    Delete the user's duplicate transactions, keeping one row of each group;
+    fuzzy matches only when asked for. Each id batch commits on its own.
+    Returns the number deleted per kind.
+    """
+    deleted = {}
+    for kind in ("exact", "fuzzy") if fuzzy else ("exact",):
+        ids = duplicate_ids(user, kind)
+        for start in range(0, len(ids), batch_size):
+            with db_transaction.atomic():
+                Transaction.objects.filter(pk__in=ids[start:start + batch_size]).delete()
+        deleted[kind] = len(ids)
+    return deleted
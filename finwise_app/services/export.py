@@ -0,0 +1,169 @@
+"""
+Streaming data export
+Every section is read with ``values()`` and ``.iterator()`` (a server-side
+cursor on PostgreSQL) and encoded record by record into ~64 KB chunks, so
+memory stays flat whatever the account size and the download starts with
+the first chunk. Formats:
+
+- json: one document, {"user_info": ..., "accounts": [...], ...}
+- ndjson: one record per line, tagged with its kind in "record"
+- csv: the transactions only, one row each
+Archived transactions are included, flagged with ``archived``.
+"""
+from __future__ import annotations
+
+import csv
+import io
+from typing import Iterable, Iterator
+
+from asgiref.sync import sync_to_async
+from django.contrib.auth.models import User
+from django.core.serializers.json import DjangoJSONEncoder
+from django.http import StreamingHttpResponse
+
+from ..models import ArchivedTransaction, Account, Bill, Budget, Category, GoalContribution, Transaction
+from .batching import DEFAULT_BATCH_SIZE
+
+FORMATS = {
+    "json": "application/json",
+    "ndjson": "application/x-ndjson",
+    "csv": "text/csv; charset=utf-8",
+}
+CHUNK_BYTES = 64 * 1024
+
+# NDJSON "record" tag of each section's records
+RECORD_TYPES = {
+    "accounts": "account",
+    "categories": "category",
+    "budgets": "budget",
+    "goal_contributions": "goal_contribution",
+    "bills": "bill",
+    "transactions": "transaction",
+}
+
+ACCOUNT_FIELDS = ("id", "name", "type", "bank_id", "account_id")
+CATEGORY_FIELDS = ("id", "name", "description", "keywords", "color", "is_active")
+BUDGET_FIELDS = ("month", "category__name", "amount", "budget_type", "target_date", "created_at")
+# Manual contributions have no transaction__fitid
+GOAL_CONTRIBUTION_FIELDS = (
+    "goal__month", "goal__category__name", "amount", "contributed_on", "note", "transaction__fitid", "created_at",
+)
+BILL_FIELDS = (
+    "name", "description", "amount", "due_date", "frequency", "status", "category__name",
+    "reminder_days", "reminder_enabled", "last_paid_date", "created_at",
+)
+TRANSACTION_FIELDS = (
+    "posted_date", "amount", "trntype", "name", "memo", "fitid", "checknum", "currency",
+    "account_id", "account__name", "category__name",
+)
+
+_encoder = DjangoJSONEncoder(ensure_ascii=False)
+
+
+def _user_info(user: User) -> dict:
+    return {
+        "username": user.username,
+        "email": user.email,
+        "first_name": user.first_name,
+        "last_name": user.last_name,
+        "date_joined": user.date_joined,
+    }
+
+
+def _rows(queryset, fields) -> Iterator[dict]:
+    return queryset.values(*fields).order_by().iterator(chunk_size=DEFAULT_BATCH_SIZE)
+
+
+def _transactions(user: User) -> Iterator[dict]:
+    hot = _rows(Transaction.objects.filter(account__user=user), TRANSACTION_FIELDS + ("categorized_at",))
+    archived = _rows(ArchivedTransaction.objects.filter(account__user=user), TRANSACTION_FIELDS)
+    for row in hot:
+        row["archived"] = False
+        yield row
+    for row in archived:
+        row["categorized_at"] = None
+        row["archived"] = True
+        yield row
+
+
+def sections(user: User) -> list[tuple[str, Iterable[dict]]]:
+    """(name, records) per export section; records are read lazily"""
+    return [
+        ("accounts", _rows(Account.objects.filter(user=user), ACCOUNT_FIELDS)),
+        # Categories are shared by all users
+        ("categories", _rows(Category.objects.all(), CATEGORY_FIELDS)),
+        ("budgets", _rows(Budget.objects.filter(user=user), BUDGET_FIELDS)),
+        ("goal_contributions", _rows(GoalContribution.objects.filter(user=user), GOAL_CONTRIBUTION_FIELDS)),
+        ("bills", _rows(Bill.objects.filter(user=user), BILL_FIELDS)),
+        ("transactions", _transactions(user)),
+    ]
+
+
+def _json(user: User) -> Iterator[str]:
+    yield '{"user_info": ' + _encoder.encode(_user_info(user))
+    for name, records in sections(user):
+        yield f', "{name}": ['
+        for index, record in enumerate(records):
+            yield ("," if index else "") + _encoder.encode(record)
+        yield "]"
+    yield "}\n"
+
+
+def _ndjson(user: User) -> Iterator[str]:
+    yield _encoder.encode({"record": "user_info", **_user_info(user)}) + "\n"
+    for name, records in sections(user):
+        for record in records:
+            yield _encoder.encode({"record": RECORD_TYPES[name], **record}) + "\n"
+
+
+def _csv(user: User) -> Iterator[str]:
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    header = TRANSACTION_FIELDS + ("categorized_at", "archived")
+    writer.writerow(header)
+    for record in _transactions(user):
+        writer.writerow([record[field] for field in header])
+        if buffer.tell() >= CHUNK_BYTES:
+            yield buffer.getvalue()
+            buffer.seek(0)
+            buffer.truncate()
+    yield buffer.getvalue()
+
+
+def _chunked(pieces: Iterable[str]) -> Iterator[bytes]:
+    """Join small pieces into chunks of about CHUNK_BYTES"""
+    parts, size = [], 0
+    for piece in pieces:
+        parts.append(piece)
+        size += len(piece)
+        if size >= CHUNK_BYTES:
+            yield "".join(parts).encode()
+            parts, size = [], 0
+    if parts:
+        yield "".join(parts).encode()
+
+
+async def _aiter(iterator: Iterator[bytes]):
+    # Under ASGI a sync iterator would be read to the end before sending;
+    # pull chunks one at a time on the request's database thread instead
+    done = object()
+    pull = sync_to_async(next, thread_sensitive=True)
+    while (chunk := await pull(iterator, done)) is not done:
+        yield chunk
+
+
+def export_chunks(user: User, fmt: str) -> Iterator[bytes]:
+    """The user's data in ``fmt`` (one of FORMATS) as ~CHUNK_BYTES byte chunks"""
+    encoders = {"json": _json, "ndjson": _ndjson, "csv": _csv}
+    return _chunked(encoders[fmt](user))
+
+
+def export_response(user: User, fmt: str, filename: str, asynchronous: bool = False) -> StreamingHttpResponse:
+    """StreamingHttpResponse with the user's data in ``fmt`` (one of FORMATS)"""
+    content = export_chunks(user, fmt)
+    response = StreamingHttpResponse(
+        _aiter(content) if asynchronous else content,
+        content_type=FORMATS[fmt],
+    )
+    response["Content-Disposition"] = f'attachment; filename="{filename}.{fmt}"'
+    return response
@@ -0,0 +1,139 @@
+"""
+Background export jobs
+Users queue an ExportJob from the account page; ``run_export_worker``
+claims queued jobs, writes the artifact under EXPORT_ROOT (gzip for the
+streaming formats, the .npz itself for snapshots) and the page polls the
+job until it offers the download.
+
+Limits:
+- one queued or running job per user; asking again returns that job
+- at most EXPORT_MAX_CONCURRENT running jobs across all workers, claimed
+  with one UPDATE that also counts the running jobs, so two workers never
+  take the same job or both take the last slot
+- RUNNING jobs older than EXPORT_JOB_TIMEOUT_MINUTES are failed, so a
+  crashed worker does not hold a slot forever
+- artifacts older than EXPORT_RETENTION_HOURS are deleted and the job
+  marked EXPIRED
+"""
+from __future__ import annotations
+
+import gzip
+import logging
+import os
+from datetime import timedelta
+from pathlib import Path
+
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.db import transaction as db_transaction
+from django.db.models import Count, Subquery
+from django.db.models.functions import Coalesce
+from django.utils import timezone
+
+from ..models import ExportJob
+from .export import export_chunks
+from .snapshot import write_snapshot
+
+logger = logging.getLogger(__name__)
+
+
+def export_root() -> Path:
+    return Path(settings.EXPORT_ROOT)
+
+
+def artifact_path(job: ExportJob) -> Path:
+    return export_root() / job.file_name
+
+
+def request_export(user: User, fmt: str) -> tuple[ExportJob, bool]:
+    """Queue an export for the user, or return their queued/running one; (job, created)"""
+    with db_transaction.atomic():
+        active = ExportJob.objects.filter(user=user, status__in=ExportJob.ACTIVE_STATUSES).first()
+        if active:
+            return active, False
+        return ExportJob.objects.create(user=user, format=fmt), True
+
+
+def claim_next() -> ExportJob | None:
+    """Mark the oldest queued job RUNNING and return it, unless the concurrency cap is reached"""
+    running = Coalesce(Subquery(
+        ExportJob.objects.filter(status="RUNNING").order_by().values("status").annotate(count=Count("pk")).values("count")
+    ), 0)
+    while True:
+        with db_transaction.atomic():
+            # Claimants queue on the active jobs' row locks, so on PostgreSQL
+            # each one's count below includes the claims committed before it
+            list(
+                ExportJob.objects.select_for_update().filter(status__in=ExportJob.ACTIVE_STATUSES)
+                .order_by("pk").values_list("pk")
+            )
+            job = ExportJob.objects.filter(status="PENDING").order_by("created_at", "id").first()
+            if job is None:
+                return None
+            # Counting and claiming in one statement: no worker claims on a
+            # count another one has already made stale
+            claimed = (
+                ExportJob.objects.filter(pk=job.pk, status="PENDING")
+                .alias(running=running).filter(running__lt=settings.EXPORT_MAX_CONCURRENT)
+                .update(status="RUNNING", started_at=timezone.now())
+            )
+        if claimed:
+            job.refresh_from_db()
+            return job
+        if ExportJob.objects.filter(pk=job.pk, status="PENDING").exists():
+            return None
+        # Another worker took it; look again
+
+
+def run_job(job: ExportJob) -> ExportJob:
+    """Write the job's artifact and record the outcome on the job"""
+    if job.format == "snapshot":
+        job.file_name = f"{job.id}-{job.user_id}.npz"
+    else:
+        job.file_name = f"{job.id}-{job.user_id}.{job.format}.gz"
+    path = artifact_path(job)
+    partial = path.with_name(path.name + ".partial")
+
+    try:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        if job.format == "snapshot":
+            with open(partial, "wb") as fh:
+                write_snapshot(job.user, fh)
+        else:
+            with gzip.open(partial, "wb", compresslevel=6) as fh:
+                for chunk in export_chunks(job.user, job.format):
+                    fh.write(chunk)
+        # Only complete artifacts ever appear under the final name
+        os.replace(partial, path)
+    except Exception as exc:
+        logger.exception("Export job %s failed", job.id)
+        partial.unlink(missing_ok=True)
+        job.status, job.error, job.file_name = "FAILED", str(exc)[:1000], ""
+    else:
+        job.status, job.size_bytes = "DONE", path.stat().st_size
+    job.finished_at = timezone.now()
+    job.save(update_fields=["file_name", "status", "error", "size_bytes", "finished_at"])
+    return job
+
+
+def fail_stale(now=None) -> int:
+    """Fail RUNNING jobs that exceeded the timeout (their worker died)"""
+    now = now or timezone.now()
+    cutoff = now - timedelta(minutes=settings.EXPORT_JOB_TIMEOUT_MINUTES)
+    return ExportJob.objects.filter(status="RUNNING", started_at__lt=cutoff).update(
+        status="FAILED", error="Export timed out", finished_at=now
+    )
+
+
+def expire_old(now=None) -> int:
+    """Delete artifacts past the retention period; returns the number of jobs expired"""
+    now = now or timezone.now()
+    cutoff = now - timedelta(hours=settings.EXPORT_RETENTION_HOURS)
+    expired = 0
+    for job in ExportJob.objects.filter(status="DONE", finished_at__lt=cutoff):
+        if job.file_name:
+            artifact_path(job).unlink(missing_ok=True)
+        job.status, job.file_name = "EXPIRED", ""
+        job.save(update_fields=["status", "file_name"])
+        expired += 1
+    return expired
@@ -0,0 +1,274 @@
+"""
+Savings goals
+A GOAL budget saves toward ``amount`` in its category from its month until
+its ``target_date`` (open-ended without one). Money moving in the category
+counts: deposits add to the goal and withdrawals take from it.
+
+- ledger: imported transactions are recorded as GoalContribution rows,
+  next to manual ones (cash set aside, transfers from accounts that are not
+  imported). A transaction counts toward one goal, the latest-starting goal
+  of its category whose window holds it
+- cached progress: ``Budget.saved_amount`` is the goal's ledger total plus
+  the net of archived months (TransactionRollup) in its window. It is kept
+  current on the write paths and pages only read it.
+  ``record_import`` adds an import's contributions to it. Every other
+  write that changes transactions (recategorizing, deleting, archiving,
+  dedupe, admin edits, restores) calls ``refresh_stale_goals`` after its
+  data version bump. As with budget alerts (services.budget_alerts), a
+  figure is current while ``progress_version`` matches the user's data
+  version, and ``refresh_goals`` rebuilds the imported entries and totals
+  of stale goals' categories in one pass
+- ``weekly_plan`` projects, for all of a user's goals at once with numpy,
+  the weekly contribution still needed to reach each target date and when
+  each goal completes at the pace so far
+"""
+from __future__ import annotations
+
+import logging
+from collections import defaultdict
+from datetime import date, datetime
+from decimal import Decimal
+
+import numpy as np
+from django.db import transaction as db_transaction
+from django.db.models import F, Q, Sum
+from django.utils import timezone
+
+from ..models import Budget, GoalContribution, Transaction, TransactionRollup
+from .analytics import get_data_version
+
+logger = logging.getLogger(__name__)
+
+INSERT_BATCH_SIZE = 2000
+
+
+def _local_date(posted: datetime) -> date:
+    # The regex importer hands over naive datetimes, stored as local time
+    if timezone.is_naive(posted):
+        posted = timezone.make_aware(posted)
+    return timezone.localtime(posted).date()
+
+
+def _goal_for(goals: list[Budget], day: date) -> Budget | None:
+    """The goal ``day`` counts toward among one category's goals, latest-starting first"""
+    for goal in goals:
+        if goal.month <= day and (goal.target_date is None or day <= goal.target_date):
+            return goal
+    return None
+
+
+def _by_category(goals) -> dict[int, list[Budget]]:
+    grouped = defaultdict(list)
+    for goal in sorted(goals, key=lambda goal: goal.month, reverse=True):
+        grouped[goal.category_id].append(goal)
+    return grouped
+
+
+def stale_goals(user, goals) -> list[Budget]:
+    """Goals whose cached progress predates the user's last data change"""
+    version = get_data_version(user.id)
+    return [goal for goal in goals if goal.progress_version != version]
+
+
+def refresh_goals(user, goals, version: int | None = None) -> int:
+    """
+    Rebuild the imported ledger entries and saved totals of the categories of
+    ``goals``; the passed objects are updated in place. Returns the number of
+    goals refreshed.
+    """
+    version = get_data_version(user.id) if version is None else version
+    categories = {goal.category_id for goal in goals}
+    if not categories:
+        return 0
+    passed = {goal.id: goal for goal in goals}
+
+    with db_transaction.atomic():
+        # Siblings decide which goal a transaction counts toward, so whole
+        # categories are rebuilt together
+        siblings = [
+            passed.get(goal.id, goal)
+            for goal in Budget.objects.select_for_update().filter(
+                user=user, budget_type="GOAL", category_id__in=categories
+            )
+        ]
+        by_category = _by_category(siblings)
+        start = min(goal.month for goal in siblings)
+
+        rows = []
+        for txn_id, category_id, posted, amount in Transaction.objects.filter(
+            account__user=user,
+            category_id__in=categories,
+            posted_date__gte=timezone.make_aware(datetime.combine(start, datetime.min.time())),
+        ).values_list("id", "category_id", "posted_date", "amount").iterator(chunk_size=INSERT_BATCH_SIZE):
+            day = _local_date(posted)
+            goal = _goal_for(by_category[category_id], day)
+            if goal is not None:
+                rows.append(GoalContribution(
+                    goal_id=goal.id, user_id=user.id, amount=amount, contributed_on=day, transaction_id=txn_id,
+                ))
+
+        GoalContribution.objects.filter(goal__in=siblings, transaction__isnull=False).delete()
+        GoalContribution.objects.bulk_create(rows, batch_size=INSERT_BATCH_SIZE)
+
+        totals = defaultdict(Decimal)
+        for row in (
+            GoalContribution.objects.filter(goal__in=siblings)
+            .values("goal_id").annotate(total=Sum("amount")).order_by()
+        ):
+            totals[row["goal_id"]] += row["total"]
+        # Archived months count whole, toward the goal holding their first day
+        for row in (
+            TransactionRollup.objects.filter(account__user=user, category_id__in=categories, month__gte=start)
+            .values("category_id", "month").annotate(net=Sum(F("income") + F("expenses"))).order_by()
+        ):
+            goal = _goal_for(by_category[row["category_id"]], row["month"])
+            if goal is not None:
+                totals[goal.id] += row["net"]
+
+        now = timezone.now()
+        for goal in siblings:
+            goal.saved_amount = totals[goal.id]
+            goal.progress_version = version
+            goal.progress_updated_at = now
+        Budget.objects.bulk_update(siblings, ["saved_amount", "progress_version", "progress_updated_at"])
+    return len(siblings)
+
+
+def refresh_stale_goals(user) -> int:
+    """Rebuild the user's goals whose progress predates the last data change; call after the write's version bump"""
+    goals = stale_goals(user, Budget.objects.filter(user=user, budget_type="GOAL"))
+    return refresh_goals(user, goals) if goals else 0
+
+
+def refresh_stale_goals_safely(user) -> int:
+    """refresh_stale_goals for write paths that must not fail because of it"""
+    try:
+        return refresh_stale_goals(user)
+    except Exception:
+        logger.exception("Goal progress refresh failed for user %s", user.id)
+        return 0
+
+
+def record_import(user, transactions) -> int:
+    """
+    Add newly imported transactions to the ledger and cached totals. Call
+    right after the import's ``bump_data_version``. Returns the number of
+    contributions recorded.
+    """
+    version = get_data_version(user.id)
+    with db_transaction.atomic():
+        goals = list(Budget.objects.select_for_update().filter(user=user, budget_type="GOAL"))
+        if not goals:
+            return 0
+        # Totals written before this import are current if the only change
+        # since is the import's own version bump
+        stale = {goal.category_id for goal in goals if goal.progress_version != version - 1}
+        current = [goal for goal in goals if goal.category_id not in stale]
+        by_category = _by_category(current)
+
+        rows = []
+        for txn in transactions:
+            if txn.category_id not in by_category:
+                continue
+            day = _local_date(txn.posted_date)
+            goal = _goal_for(by_category[txn.category_id], day)
+            if goal is not None:
+                rows.append(GoalContribution(
+                    goal_id=goal.id, user_id=user.id, amount=txn.amount, contributed_on=day, transaction_id=txn.id,
+                ))
+                goal.saved_amount += txn.amount
+        GoalContribution.objects.bulk_create(rows, batch_size=INSERT_BATCH_SIZE)
+
+        now = timezone.now()
+        for goal in current:
+            goal.progress_version = version
+            goal.progress_updated_at = now
+        Budget.objects.bulk_update(current, ["saved_amount", "progress_version", "progress_updated_at"])
+
+        if stale:
+            # Rebuilt from the transactions, which already include this import
+            refresh_goals(user, [goal for goal in goals if goal.category_id in stale], version)
+    return len(rows)
+
+
+def record_import_safely(user, transactions) -> int:
+    """record_import for the importers: failures are logged, never fail the import"""
+    try:
+        return record_import(user, transactions)
+    except Exception:
+        logger.exception("Goal progress update failed for user %s", user.id)
+        return 0
+
+
+def add_contribution(goal: Budget, amount: Decimal, contributed_on: date, note: str = "") -> GoalContribution:
+    """Record a manual contribution (negative to withdraw) and add it to the cached total"""
+    with db_transaction.atomic():
+        contribution = GoalContribution.objects.create(
+            goal=goal, user_id=goal.user_id, amount=amount, contributed_on=contributed_on, note=note,
+        )
+        # Manual entries leave the data version alone; a stale total is
+        # rebuilt with them included
+        Budget.objects.filter(id=goal.id).update(
+            saved_amount=F("saved_amount") + amount, progress_updated_at=timezone.now()
+        )
+    goal.refresh_from_db(fields=["saved_amount", "progress_updated_at"])
+    return contribution
+
+
+def active_goals(user, today: date | None = None):
+    """Goals of this month and earlier ones whose target date is still ahead"""
+    today = today or timezone.localdate()
+    current_month = today.replace(day=1)
+    return (
+        Budget.objects.filter(user=user, budget_type="GOAL", month__lte=current_month)
+        .filter(Q(month=current_month) | Q(target_date__gte=today))
+        .select_related("category")
+        .order_by("target_date", "category__name")
+    )
+
+
+def weekly_plan(goals: list[Budget], today: date | None = None) -> dict[int, dict]:
+    """
+    {goal id: projection} for all ``goals`` in one vectorized pass:
+    remaining amount, progress, weeks left, weekly contribution needed to
+    reach the target date, pace so far and the completion date it implies
+    """
+    if not goals:
+        return {}
+    today64 = np.datetime64(today or timezone.localdate(), "D")
+
+    amount = np.array([float(goal.amount) for goal in goals])
+    saved = np.array([float(goal.saved_amount) for goal in goals])
+    starts = np.array([goal.month for goal in goals], dtype="datetime64[D]")
+    targets = np.array([goal.target_date or "NaT" for goal in goals], dtype="datetime64[D]")
+
+    remaining = np.clip(amount - saved, 0, None)
+    progress = np.clip(saved / amount * 100, 0, 100)
+    has_target = ~np.isnat(targets)
+
+    days_left = np.where(has_target, (targets - today64).astype("float64"), np.nan)
+    # Past the target date whatever is left is needed now
+    weeks_left = np.maximum(np.ceil(days_left / 7), 1)
+    weekly_needed = np.where(has_target, remaining / weeks_left, np.nan)
+
+    weeks_elapsed = np.maximum((today64 - starts).astype("float64") / 7, 1)
+    pace = np.maximum(saved, 0) / weeks_elapsed
+    with np.errstate(divide="ignore", invalid="ignore"):
+        days_to_go = np.where(pace > 0, np.ceil(remaining / pace * 7), np.nan)
+    projected = today64 + np.nan_to_num(days_to_go).astype("timedelta64[D]")
+    done = remaining == 0
+    on_track = done | (has_target & (pace >= weekly_needed))
+
+    plan = {}
+    for i, goal in enumerate(goals):
+        plan[goal.id] = {
+            "remaining": round(float(remaining[i]), 2),
+            "progress": round(float(progress[i]), 1),
+            "weeks_left": int(weeks_left[i]) if has_target[i] else None,
+            "weekly_needed": round(float(weekly_needed[i]), 2) if has_target[i] else None,
+            "weekly_pace": round(float(pace[i]), 2),
+            "projected_date": None if done[i] or np.isnan(days_to_go[i]) else projected[i].astype(object),
+            "past_target": bool(has_target[i] and days_left[i] < 0 and not done[i]),
+            "on_track": bool(on_track[i]),
+        }
+    return plan
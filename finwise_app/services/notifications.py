@@ -0,0 +1,267 @@
+"""
+Notification outbox
+``notify()`` stores a Notification row instead of sending in the request.
+``run_notification_worker`` claims due rows in batches, groups them by
+channel and hands each group to the channel's transport. Email reuses one
+SMTP connection for the whole batch.
+
+- dedupe: a notification with a ``dedupe_key`` that was already queued is
+  dropped, so repeat alerts (same bill due date, same budget threshold)
+  go out once
+- retries: a failed message is retried after NOTIFICATION_RETRY_SECONDS,
+  doubling each attempt, and marked FAILED after NOTIFICATION_MAX_ATTEMPTS
+- claims: a batch is claimed with a conditional UPDATE under a random token.
+  ``next_attempt_at`` doubles as the lease while SENDING, so rows held by a
+  crashed worker are picked up again when it expires
+- messages the user is waiting on (recovery codes) are sent by the request
+  itself with ``send_now``; the worker only retries them if that fails.
+  Everything else waits for the worker, so it has to be running
+- bodies of SENSITIVE_KINDS are blanked once the message is sent or has
+  failed for good, so codes do not stay readable in the table or the admin
+
+Transports come from settings.NOTIFICATION_TRANSPORTS ({channel: {"BACKEND":
+dotted path, "OPTIONS": kwargs}}). ``send(notifications)`` returns
+{notification id: error} for the ones that failed.
+"""
+from __future__ import annotations
+
+import json
+import logging
+import secrets
+import sys
+import urllib.request
+from datetime import timedelta
+from functools import lru_cache
+
+from django.conf import settings
+from django.core.mail import EmailMessage, get_connection
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import IntegrityError, transaction as db_transaction
+from django.db.models import F, Q
+from django.utils import timezone
+from django.utils.module_loading import import_string
+
+from ..models import Notification
+
+logger = logging.getLogger(__name__)
+
+# How long a claimed batch may take before other workers may retry it
+SEND_LEASE = timedelta(minutes=5)
+MAX_RETRY_DELAY = timedelta(hours=6)
+# Kinds whose body holds a secret
+SENSITIVE_KINDS = ("recovery",)
+
+
+def _payload(notification: Notification) -> dict:
+    return {
+        "id": notification.id,
+        "user_id": notification.user_id,
+        "recipient": notification.recipient,
+        "kind": notification.kind,
+        "subject": notification.subject,
+        "body": notification.body,
+        "created_at": notification.created_at,
+    }
+
+
+class EmailTransport:
+    """Sends through Django's email backend over a single connection per batch"""
+
+    def __init__(self, backend: str | None = None, **options):
+        self.backend = backend
+        self.options = options
+
+    def send(self, notifications: list[Notification]) -> dict[int, str]:
+        errors = {}
+        connection = get_connection(self.backend, fail_silently=False, **self.options)
+        try:
+            connection.open()
+        except Exception as exc:
+            return {notification.id: f"Could not connect: {exc}" for notification in notifications}
+        try:
+            for notification in notifications:
+                message = EmailMessage(
+                    subject=notification.subject,
+                    body=notification.body,
+                    to=[notification.recipient],
+                    connection=connection,
+                )
+                try:
+                    message.send()
+                except Exception as exc:
+                    errors[notification.id] = str(exc)
+        finally:
+            connection.close()
+        return errors
+
+
+class ConsoleTransport:
+    """Writes each notification to stdout; for development"""
+
+    def __init__(self, stream=None):
+        self.stream = stream or sys.stdout
+
+    def send(self, notifications: list[Notification]) -> dict[int, str]:
+        for notification in notifications:
+            self.stream.write(
+                f"[{notification.channel}] to {notification.recipient}: {notification.subject}\n"
+                f"{notification.body}\n{'-' * 40}\n"
+            )
+        self.stream.flush()
+        return {}
+
+
+class FileTransport:
+    """Appends each batch to a file as JSON lines"""
+
+    def __init__(self, path: str):
+        self.path = path
+
+    def send(self, notifications: list[Notification]) -> dict[int, str]:
+        lines = "".join(json.dumps(_payload(n), cls=DjangoJSONEncoder) + "\n" for n in notifications)
+        try:
+            with open(self.path, "a", encoding="utf-8") as fh:
+                fh.write(lines)
+        except OSError as exc:
+            return {notification.id: str(exc) for notification in notifications}
+        return {}
+
+
+class HttpTransport:
+    """POSTs each batch as {"notifications": [...]} to a push endpoint"""
+
+    def __init__(self, url: str, timeout: float = 10.0):
+        self.url = url
+        self.timeout = timeout
+
+    def send(self, notifications: list[Notification]) -> dict[int, str]:
+        body = json.dumps(
+            {"notifications": [_payload(n) for n in notifications]}, cls=DjangoJSONEncoder
+        ).encode()
+        request = urllib.request.Request(
+            self.url, data=body, headers={"Content-Type": "application/json"}, method="POST"
+        )
+        try:
+            with urllib.request.urlopen(request, timeout=self.timeout) as response:
+                response.read()
+        except Exception as exc:
+            return {notification.id: str(exc) for notification in notifications}
+        return {}
+
+
+@lru_cache(maxsize=None)
+def get_transport(channel: str):
+    config = settings.NOTIFICATION_TRANSPORTS[channel]
+    return import_string(config["BACKEND"])(**config.get("OPTIONS", {}))
+
+
+def notify(channel: str, recipient: str, subject: str, body: str, *, user=None,
+           kind: str = "", dedupe_key: str | None = None) -> Notification | None:
+    """Queue a notification; returns None if one with ``dedupe_key`` was already queued"""
+    if dedupe_key and Notification.objects.filter(dedupe_key=dedupe_key).exists():
+        return None
+    try:
+        with db_transaction.atomic():
+            return Notification.objects.create(
+                user=user,
+                channel=channel,
+                recipient=recipient,
+                kind=kind,
+                subject=subject,
+                body=body,
+                dedupe_key=dedupe_key,
+                next_attempt_at=timezone.now(),
+            )
+    except IntegrityError:
+        # Queued concurrently under the same dedupe key
+        return None
+
+
+def claim_batch(limit: int | None = None, now=None) -> list[Notification]:
+    """Claim up to ``limit`` due notifications for this worker"""
+    now = now or timezone.now()
+    limit = limit or settings.NOTIFICATION_BATCH_SIZE
+    due = Notification.objects.filter(
+        Q(status="PENDING") | Q(status="SENDING"), next_attempt_at__lte=now
+    ).order_by("next_attempt_at", "id").values_list("id", flat=True)[:limit]
+    ids = list(due)
+    if not ids:
+        return []
+    token = secrets.token_hex(16)
+    Notification.objects.filter(
+        Q(status="PENDING") | Q(status="SENDING"), id__in=ids, next_attempt_at__lte=now
+    ).update(status="SENDING", claim_token=token, next_attempt_at=now + SEND_LEASE)
+    return list(Notification.objects.filter(claim_token=token, status="SENDING"))
+
+
+def send_now(notification: Notification | None) -> bool:
+    """
+    Deliver a just-queued notification without waiting for the worker; if
+    sending fails it stays queued for a retry. Returns whether it was sent.
+    """
+    if notification is None:
+        return False
+    token = secrets.token_hex(16)
+    now = timezone.now()
+    claimed = Notification.objects.filter(pk=notification.pk, status="PENDING").update(
+        status="SENDING", claim_token=token, next_attempt_at=now + SEND_LEASE
+    )
+    if not claimed:
+        return False
+    notification.refresh_from_db()
+    return deliver([notification], now)["sent"] == 1
+
+
+def retry_delay(attempts: int) -> timedelta:
+    return min(timedelta(seconds=settings.NOTIFICATION_RETRY_SECONDS * 2 ** (attempts - 1)), MAX_RETRY_DELAY)
+
+
+def deliver(notifications: list[Notification], now=None) -> dict[str, int]:
+    """Send claimed notifications, one transport call per channel; returns counts by outcome"""
+    now = now or timezone.now()
+    by_channel: dict[str, list[Notification]] = {}
+    for notification in notifications:
+        by_channel.setdefault(notification.channel, []).append(notification)
+
+    counts = {"sent": 0, "retry": 0, "failed": 0}
+    for channel, batch in by_channel.items():
+        try:
+            errors = get_transport(channel).send(batch)
+        except Exception as exc:
+            logger.exception("Notification transport for %r failed", channel)
+            errors = {notification.id: str(exc) for notification in batch}
+
+        sent_ids = [n.id for n in batch if n.id not in errors]
+        sent = Notification.objects.filter(id__in=sent_ids)
+        sent.update(status="SENT", sent_at=now, attempts=F("attempts") + 1, claim_token="", last_error="")
+        sent.filter(kind__in=SENSITIVE_KINDS).update(body="")
+        counts["sent"] += len(sent_ids)
+
+        for notification in batch:
+            if notification.id not in errors:
+                continue
+            attempts = notification.attempts + 1
+            if attempts >= settings.NOTIFICATION_MAX_ATTEMPTS:
+                status, next_attempt_at = "FAILED", now
+                counts["failed"] += 1
+            else:
+                status, next_attempt_at = "PENDING", now + retry_delay(attempts)
+                counts["retry"] += 1
+            final = {"body": ""} if status == "FAILED" and notification.kind in SENSITIVE_KINDS else {}
+            Notification.objects.filter(id=notification.id).update(
+                status=status,
+                attempts=attempts,
+                next_attempt_at=next_attempt_at,
+                claim_token="",
+                last_error=errors[notification.id][:1000],
+                **final,
+            )
+    return counts
+
+
+def purge_sent(now=None) -> int:
+    """Delete sent notifications past the retention period"""
+    now = now or timezone.now()
+    cutoff = now - timedelta(days=settings.NOTIFICATION_RETENTION_DAYS)
+    deleted, _ = Notification.objects.filter(status="SENT", sent_at__lt=cutoff).delete()
+    return deleted
@@ -4,7 +4,9 @@ from dataclasses import dataclass
 from datetime import datetime
 from decimal import Decimal
 from typing import Iterable, Optional
+import time
 from io import BytesIO
+import uuid
 
 from django.db import transaction as db_transaction
 
@@ -16,6 +18,12 @@ except Exception as e:  # pragma: no cover - import-time failure surfaced to cal
 
 from django.contrib.auth.models import User
 from ..models import Account, Transaction
+from .analytics import bump_data_version
+from .archive import archived_fitids
+from .budget_alerts import check_import_safely
+from .goals import record_import_safely
+from .write_queue import serialized_write
+from ..metrics import IMPORT_DURATION, IMPORT_ROWS, IMPORT_ROWS_PER_SECOND, OFX_PARSE_DURATION
 
 
 @dataclass(frozen=True)
@@ -187,46 +195,79 @@ def parse_ofx(content: bytes) -> tuple[dict, list[ImportedTxn]]:
 
 def import_ofx(content: bytes, user: User) -> tuple[Account, int]:
     """Parse and persist OFX content. Returns (account, created_count)."""
-    acct_info, txns = parse_ofx(content)
-
-    with db_transaction.atomic():
-        account, _ = Account.objects.get_or_create(
-            user=user,
-            type=acct_info["type"],
-            bank_id=acct_info.get("bank_id"),
-            account_id=acct_info.get("account_id") or "",
-            defaults={"name": acct_info.get("name", "")},
-        )
+    import_start = time.perf_counter()
+    with OFX_PARSE_DURATION.time(parser="ofxtools"):
+        acct_info, txns = parse_ofx(content)
+    return save_import(user, acct_info, txns, "ofxtools", import_start)
+
+
+def save_import(user: User, acct_info: dict, txns: list, parser: str, import_start: float) -> tuple[Account, int]:
+    """
+    Persist parsed transactions, run the post-import updates (data version,
+    budget alerts, goal progress) and record the import metrics. Shared by
+    both parsers; ``import_start`` is the ``perf_counter`` before parsing.
+    Returns (account, created_count).
+    """
+    new_transactions: list[Transaction] = []
 
-        created = 0
-        new_transactions = []
-        for t in txns:
-            obj, was_created = Transaction.objects.get_or_create(
-                account=account,
-                fitid=t.fitid,
-                defaults={
-                    "posted_date": t.posted,
-                    "amount": t.amount,
-                    "trntype": t.trntype,
-                    "name": t.name,
-                    "memo": t.memo,
-                    "checknum": t.checknum,
-                    "currency": t.currency,
-                },
+    def persist() -> tuple[Account, int]:
+        with db_transaction.atomic():
+            account, _ = Account.objects.get_or_create(
+                user=user,
+                type=acct_info["type"],
+                bank_id=acct_info.get("bank_id"),
+                account_id=acct_info.get("account_id") or "",
+                defaults={"name": acct_info.get("name", "")},
             )
-            if was_created:
-                created += 1
-                new_transactions.append(obj)
-
-        # Auto-categorize new transactions (FR04 requirement)
-        if new_transactions:
-            from .categorization_service import TransactionCategorizationService
-            categorizer = TransactionCategorizationService()
-            stats = categorizer.categorize_bulk_transactions(new_transactions)
+
+            created = 0
+            batch = uuid.uuid4()
+            # Rows already moved to the archive are not re-imported
+            archived = archived_fitids(account, (t.fitid for t in txns))
+            for t in txns:
+                if t.fitid in archived:
+                    continue
+                obj, was_created = Transaction.objects.get_or_create(
+                    account=account,
+                    fitid=t.fitid,
+                    defaults={
+                        "posted_date": t.posted,
+                        "amount": t.amount,
+                        "trntype": t.trntype,
+                        "name": t.name,
+                        "memo": t.memo,
+                        "checknum": t.checknum,
+                        "currency": t.currency,
+                        "import_batch": batch,
+                    },
+                )
+                if was_created:
+                    created += 1
+                    new_transactions.append(obj)
+
+            # Auto-categorize new transactions (FR04 requirement)
+            if new_transactions:
+                from .categorization_service import TransactionCategorizationService
+                categorizer = TransactionCategorizationService()
+                stats = categorizer.categorize_bulk_transactions(new_transactions)
             
-            import logging
-            logger = logging.getLogger(__name__)
-            logger.info(f"OFX Import: {created} new transactions, "
-                       f"{stats['categorized']} categorized automatically")
+                import logging
+                logger = logging.getLogger(__name__)
+                logger.info(f"OFX Import ({parser}): {created} new transactions, "
+                           f"{stats['categorized']} categorized automatically")
+        return account, created
+
+    account, created = serialized_write(persist, operation="import")
+
+    if created:
+        bump_data_version(user.id)
+        serialized_write(check_import_safely, user, new_transactions, operation="budget_alerts")
+        serialized_write(record_import_safely, user, new_transactions, operation="goal_progress")
+
+    elapsed = time.perf_counter() - import_start
+    IMPORT_DURATION.observe(elapsed, parser=parser)
+    IMPORT_ROWS.inc(created, parser=parser)
+    if elapsed > 0:
+        IMPORT_ROWS_PER_SECOND.observe(len(txns) / elapsed, parser=parser)
 
     return account, created
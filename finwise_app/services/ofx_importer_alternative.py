@@ -8,11 +8,13 @@ from dataclasses import dataclass
 from datetime import datetime
 from decimal import Decimal
 from typing import Iterable, Optional
+import time
 import re
 
-from django.db import transaction as db_transaction
 from django.contrib.auth.models import User
-from ..models import Account, Transaction
+from ..models import Account
+from .ofx_importer import save_import
+from ..metrics import OFX_PARSE_DURATION
 
 
 @dataclass(frozen=True)
@@ -145,46 +147,7 @@ def parse_ofx_alternative(content: bytes) -> tuple[dict, list[ImportedTxn]]:
 
 def import_ofx_alternative(content: bytes, user: User) -> tuple[Account, int]:
     """Parse and persist OFX content using alternative parser. Returns (account, created_count)."""
-    acct_info, txns = parse_ofx_alternative(content)
-
-    with db_transaction.atomic():
-        account, _ = Account.objects.get_or_create(
-            user=user,
-            type=acct_info["type"],
-            bank_id=acct_info.get("bank_id"),
-            account_id=acct_info.get("account_id") or "",
-            defaults={"name": acct_info.get("name", "")},
-        )
-
-        created = 0
-        new_transactions = []
-        for t in txns:
-            obj, was_created = Transaction.objects.get_or_create(
-                account=account,
-                fitid=t.fitid,
-                defaults={
-                    "posted_date": t.posted,
-                    "amount": t.amount,
-                    "trntype": t.trntype,
-                    "name": t.name,
-                    "memo": t.memo,
-                    "checknum": t.checknum,
-                    "currency": t.currency,
-                },
-            )
-            if was_created:
-                created += 1
-                new_transactions.append(obj)
-
-        # Auto-categorize new transactions (FR04 requirement)
-        if new_transactions:
-            from .categorization_service import TransactionCategorizationService
-            categorizer = TransactionCategorizationService()
-            stats = categorizer.categorize_bulk_transactions(new_transactions)
-            
-            import logging
-            logger = logging.getLogger(__name__)
-            logger.info(f"OFX Import (Alternative): {created} new transactions, "
-                       f"{stats['categorized']} categorized automatically")
-
-    return account, created
+    import_start = time.perf_counter()
+    with OFX_PARSE_DURATION.time(parser="regex"):
+        acct_info, txns = parse_ofx_alternative(content)
+    return save_import(user, acct_info, txns, "regex", import_start)
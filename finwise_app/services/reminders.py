@@ -0,0 +1,185 @@
+"""
+Bill reminder scheduler
+A bill's reminder is due at the start of the day ``reminder_days`` before
+its due date. ReminderScheduler keeps a min-heap of (reminder time, bill id)
+for every pending bill across all users. ``run_reminder_scheduler`` sleeps
+until the earliest entry is due, queues what is due in the notification
+outbox and goes back to sleep. Pages list the bills inside their reminder
+window with ``due_reminders``, a due-date range query over the same
+horizon, rather than checking every bill.
+
+Keeping the heap current:
+- the horizon (pending bills due from today up to the largest
+  ``reminder_days``) is loaded with one range query, and reloaded each day
+- between loads, bills saved since the last poll (``updated_at``) are
+  rescheduled or dropped; added, edited, paid and next-occurrence bills
+  all go through ``save()`` so they show up there
+- entries are never removed from the heap; a bill's current time lives in
+  ``_scheduled`` and stale entries are skipped when popped
+- before sending, the bill is re-read and claimed by setting
+  ``reminder_sent_at`` with a conditional UPDATE, so deleted or changed
+  bills are not reminded and two schedulers never send the same reminder
+"""
+from __future__ import annotations
+
+import heapq
+import logging
+from datetime import date, datetime, time, timedelta
+
+from django.db.models import Max
+from django.utils import timezone
+
+from ..models import Bill
+from .notifications import notify
+
+logger = logging.getLogger(__name__)
+
+# Re-read bills saved this long before the newest change already seen, so a
+# transaction that commits after a later one is not missed
+CHANGE_OVERLAP = timedelta(minutes=5)
+# Wait before retrying a reminder whose delivery failed
+RETRY_DELAY = timedelta(minutes=10)
+
+
+def reminder_time(bill: Bill, today: date) -> datetime | None:
+    """When the bill's reminder is due, or None if it should not get one"""
+    if not bill.reminder_enabled or bill.status != "PENDING" or bill.reminder_sent_at:
+        return None
+    if bill.due_date < today:
+        # Overdue bills are shown as such; no late reminder
+        return None
+    remind_on = bill.due_date - timedelta(days=bill.reminder_days)
+    return timezone.make_aware(datetime.combine(remind_on, time.min))
+
+
+def pending_reminders():
+    """Bills that may still need a reminder"""
+    return Bill.objects.filter(status="PENDING", reminder_enabled=True, reminder_sent_at__isnull=True)
+
+
+def due_reminders(bills, today: date):
+    """
+    Pending bills among ``bills`` inside their reminder window, soonest
+    first. Overdue bills are not included, as with ``reminder_time``.
+    """
+    upcoming = bills.filter(status="PENDING", reminder_enabled=True, due_date__gte=today)
+    horizon = upcoming.aggregate(days=Max("reminder_days"))["days"]
+    if horizon is None:
+        return []
+    window = upcoming.filter(due_date__lte=today + timedelta(days=horizon))
+    return [
+        bill for bill in window.select_related("category").order_by("due_date", "name")
+        if (bill.due_date - today).days <= bill.reminder_days
+    ]
+
+
+def send_bill_reminder(bill: Bill) -> None:
+    """Queue the reminder in the notification outbox, by email and push"""
+    days = bill.days_until_due()
+    when = "today" if days == 0 else f"in {days} day{'s' if days != 1 else ''}"
+    subject = f"Reminder: {bill.name} is due {when}"
+    body = (
+        f"Hi {bill.user.username},\n\n"
+        f"Your bill \"{bill.name}\" for ${bill.amount} is due {when} ({bill.due_date:%B %d, %Y}).\n\n"
+        f"You can mark it as paid from the Bills page in FinWise."
+    )
+    # One reminder per bill and due date, even if reminder_sent_at is reset
+    key = f"bill_reminder:{bill.id}:{bill.due_date.isoformat()}"
+    if bill.user.email:
+        notify("email", bill.user.email, subject, body, user=bill.user, kind="bill_reminder", dedupe_key=f"{key}:email")
+    notify("push", f"user:{bill.user_id}", subject, body, user=bill.user, kind="bill_reminder", dedupe_key=f"{key}:push")
+
+
+class ReminderScheduler:
+    """Min-heap of upcoming bill reminders, kept current incrementally"""
+
+    def __init__(self):
+        self._heap: list[tuple[datetime, int]] = []
+        self._scheduled: dict[int, datetime] = {}
+        self._loaded_on: date | None = None
+        self._changes_since: datetime | None = None
+
+    def __len__(self) -> int:
+        return len(self._scheduled)
+
+    def schedule(self, bill: Bill, today: date) -> None:
+        """(Re)schedule the bill's reminder, or drop it if it no longer needs one"""
+        when = reminder_time(bill, today)
+        if when is None:
+            self._scheduled.pop(bill.id, None)
+        elif self._scheduled.get(bill.id) != when:
+            self._scheduled[bill.id] = when
+            heapq.heappush(self._heap, (when, bill.id))
+
+    def load(self, today: date) -> int:
+        """Rebuild the heap from the database; returns the number of reminders scheduled"""
+        self._heap, self._scheduled = [], {}
+        upcoming = pending_reminders().filter(due_date__gte=today)
+        horizon = upcoming.aggregate(days=Max("reminder_days"))["days"] or 0
+        self._changes_since = Bill.objects.aggregate(latest=Max("updated_at"))["latest"] or timezone.now()
+        for bill in upcoming.filter(due_date__lte=today + timedelta(days=horizon)).only(
+            "id", "due_date", "status", "reminder_days", "reminder_enabled", "reminder_sent_at",
+        ):
+            self.schedule(bill, today)
+        self._loaded_on = today
+        return len(self._scheduled)
+
+    def refresh(self, today: date) -> int:
+        """Pick up bills saved since the last refresh; reloads once a day"""
+        if self._loaded_on != today or self._changes_since is None:
+            return self.load(today)
+        changed = Bill.objects.filter(updated_at__gte=self._changes_since - CHANGE_OVERLAP).only(
+            "id", "due_date", "status", "reminder_days", "reminder_enabled", "reminder_sent_at", "updated_at",
+        )
+        count = 0
+        for bill in changed:
+            self.schedule(bill, today)
+            self._changes_since = max(self._changes_since, bill.updated_at)
+            count += 1
+        return count
+
+    def next_due(self) -> datetime | None:
+        """Time of the earliest scheduled reminder"""
+        while self._heap:
+            when, bill_id = self._heap[0]
+            if self._scheduled.get(bill_id) == when:
+                return when
+            heapq.heappop(self._heap)
+        return None
+
+    def pop_due(self, now: datetime) -> list[int]:
+        """Remove and return the ids of bills whose reminder is due"""
+        due = []
+        while (when := self.next_due()) is not None and when <= now:
+            _, bill_id = heapq.heappop(self._heap)
+            del self._scheduled[bill_id]
+            due.append(bill_id)
+        return due
+
+    def send_due(self, now: datetime | None = None) -> int:
+        """Send every reminder that is due; returns the number sent"""
+        now = now or timezone.now()
+        today = timezone.localdate(now)
+        bill_ids = self.pop_due(now)
+        if not bill_ids:
+            return 0
+
+        sent = 0
+        for bill in pending_reminders().filter(id__in=bill_ids).select_related("user"):
+            when = reminder_time(bill, today)
+            if when is None or when > now:
+                # Changed since it was scheduled; the next refresh has it
+                continue
+            claimed = pending_reminders().filter(pk=bill.pk).update(reminder_sent_at=now)
+            if not claimed:
+                continue
+            try:
+                send_bill_reminder(bill)
+            except Exception:
+                logger.exception("Sending the reminder for bill %s failed", bill.id)
+                Bill.objects.filter(pk=bill.pk).update(reminder_sent_at=None)
+                self._scheduled[bill.id] = retry_at = now + RETRY_DELAY
+                heapq.heappush(self._heap, (retry_at, bill.id))
+            else:
+                sent += 1
+        return sent
@@ -0,0 +1,329 @@
+"""
+Columnar snapshots for backup, restore and moving users between instances
+A snapshot is a compressed NumPy ``.npz`` archive with one array per
+column, named ``<table>.<column>``, plus ``meta`` (UTF-8 JSON: format
+version, user fields, row counts). No pickled objects are stored.
+
+Column encodings:
+- integers and flags: int64 / int32 / bool arrays
+- amounts: int64 cents
+- dates: int32 proleptic ordinals, 0 for null
+- datetimes: int64 microseconds since the Unix epoch (UTC), NULL_TIME for null
+- foreign keys: the snapshot's own ids, -1 for null
+- strings: ``<col>.text`` (uint8, UTF-8 of all values concatenated) and
+  ``<col>.offsets`` (int64 character offsets, length rows + 1)
+
+Tables: categories (matched by name on restore, since they are shared),
+accounts, budgets, manual goal contributions, bills, transactions, archived
+transactions and rollups. Contributions recorded from imported transactions
+and goal totals are rebuilt from the transactions on restore.
+
+Version 1 snapshots (no goal target dates or contributions) still restore;
+columns missing from a file restore as null.
+"""
+from __future__ import annotations
+
+import json
+from datetime import date, datetime, timedelta, timezone as dt_timezone
+from decimal import Decimal
+
+import numpy as np
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.db import connections, router
+from django.db import transaction as db_transaction
+from django.utils import timezone
+
+from ..models import (
+    Account,
+    ArchivedTransaction,
+    Bill,
+    Budget,
+    Category,
+    GoalContribution,
+    Transaction,
+    TransactionRollup,
+)
+from .analytics import bump_data_version
+from .batching import DEFAULT_BATCH_SIZE
+from .bill_calendar import extend_calendar
+from .goals import refresh_stale_goals
+
+FORMAT_VERSION = 2
+SUPPORTED_VERSIONS = (1, 2)
+NULL_ID = -1
+NULL_TIME = np.iinfo(np.int64).min
+
+_EPOCH = datetime(1970, 1, 1, tzinfo=dt_timezone.utc)
+_MICROSECOND = timedelta(microseconds=1)
+
+# (column, kind) per table; kinds: int, bool, id (nullable FK or int), cents, date, time, str
+SCHEMA: dict[str, list[tuple[str, str]]] = {
+    "categories": [
+        ("id", "int"), ("name", "str"), ("description", "str"), ("keywords", "str"),
+        ("color", "str"), ("is_active", "bool"),
+    ],
+    "accounts": [
+        ("id", "int"), ("name", "str"), ("type", "str"), ("bank_id", "str"), ("account_id", "str"),
+    ],
+    "budgets": [
+        ("id", "int"), ("category_id", "id"), ("amount", "cents"), ("budget_type", "str"), ("month", "date"),
+        ("target_date", "date"),
+    ],
+    "goal_contributions": [
+        ("goal_id", "id"), ("amount", "cents"), ("contributed_on", "date"), ("note", "str"),
+    ],
+    "bills": [
+        ("name", "str"), ("description", "str"), ("amount", "cents"), ("due_date", "date"),
+        ("series_day", "id"), ("frequency", "str"), ("status", "str"), ("category_id", "id"), ("reminder_days", "int"),
+        ("reminder_enabled", "bool"), ("last_paid_date", "date"),
+    ],
+    "transactions": [
+        ("account_id", "id"), ("category_id", "id"), ("fitid", "str"), ("posted_date", "time"),
+        ("amount", "cents"), ("trntype", "str"), ("name", "str"), ("memo", "str"),
+        ("checknum", "str"), ("currency", "str"), ("is_categorized", "bool"), ("categorized_at", "time"),
+    ],
+    "archived_transactions": [
+        ("account_id", "id"), ("category_id", "id"), ("fitid", "str"), ("posted_date", "time"),
+        ("amount", "cents"), ("trntype", "str"), ("name", "str"), ("memo", "str"),
+        ("checknum", "str"), ("currency", "str"),
+    ],
+    "rollups": [
+        ("account_id", "id"), ("category_id", "id"), ("month", "date"),
+        ("income", "cents"), ("expenses", "cents"), ("count", "int"),
+    ],
+}
+
+USER_FIELDS = ("username", "email", "first_name", "last_name")
+
+
+class SnapshotError(ValueError):
+    """The file is not a snapshot this version can restore"""
+
+
+# Column encoding
+
+def _encode(kind: str, values: list) -> dict[str, np.ndarray]:
+    if kind == "str":
+        values = ["" if v is None else v for v in values]
+        offsets = np.zeros(len(values) + 1, dtype=np.int64)
+        np.cumsum([len(v) for v in values], out=offsets[1:])
+        return {
+            ".text": np.frombuffer("".join(values).encode(), dtype=np.uint8),
+            ".offsets": offsets,
+        }
+    if kind == "int":
+        return {"": np.asarray(values, dtype=np.int64)}
+    if kind == "bool":
+        return {"": np.asarray(values, dtype=bool)}
+    if kind == "id":
+        return {"": np.asarray([NULL_ID if v is None else v for v in values], dtype=np.int64)}
+    if kind == "cents":
+        return {"": np.asarray([int(v * 100) for v in values], dtype=np.int64)}
+    if kind == "date":
+        return {"": np.asarray([0 if v is None else v.toordinal() for v in values], dtype=np.int32)}
+    if kind == "time":
+        return {"": np.asarray(
+            [NULL_TIME if v is None else ((v if v.tzinfo else v.replace(tzinfo=dt_timezone.utc)) - _EPOCH) // _MICROSECOND
+             for v in values],
+            dtype=np.int64,
+        )}
+    raise ValueError(f"Unknown column kind {kind!r}")
+
+
+def _decode(kind: str, arrays, name: str) -> list:
+    if kind == "str":
+        text = arrays[f"{name}.text"].tobytes().decode()
+        offsets = arrays[f"{name}.offsets"].tolist()
+        return [text[start:end] for start, end in zip(offsets, offsets[1:])]
+    column = arrays[name]
+    if kind in ("int", "bool"):
+        return column.tolist()
+    if kind == "id":
+        return [None if v == NULL_ID else v for v in column.tolist()]
+    if kind == "cents":
+        return [Decimal(v).scaleb(-2) for v in column.tolist()]
+    if kind == "date":
+        return [None if v == 0 else date.fromordinal(v) for v in column.tolist()]
+    if kind == "time":
+        # Naive UTC; _insert_columns hands them to the database as such
+        nulls = column == NULL_TIME
+        stamps = np.where(nulls, 0, column).astype("datetime64[us]").tolist()
+        return [None if null else stamp for null, stamp in zip(nulls.tolist(), stamps)]
+    raise ValueError(f"Unknown column kind {kind!r}")
+
+
+def _table_arrays(table: str, rows: list[tuple]) -> dict[str, np.ndarray]:
+    columns = list(zip(*rows)) if rows else [() for _ in SCHEMA[table]]
+    arrays = {}
+    for (name, kind), values in zip(SCHEMA[table], columns):
+        for suffix, array in _encode(kind, list(values)).items():
+            arrays[f"{table}.{name}{suffix}"] = array
+    return arrays
+
+
+def _table_columns(table: str, arrays, count: int) -> dict[str, list]:
+    if not count:
+        return {name: [] for name, _kind in SCHEMA[table]}
+    return {
+        name: _decode(kind, arrays, f"{table}.{name}")
+        if f"{table}.{name}" in arrays or f"{table}.{name}.text" in arrays else [None] * count
+        for name, kind in SCHEMA[table]
+    }
+
+
+def _rows(columns: dict[str, list]) -> list[dict]:
+    return [dict(zip(columns, values)) for values in zip(*columns.values())]
+
+
+# Write
+
+def _querysets(user: User) -> dict:
+    return {
+        "categories": Category.objects.all(),
+        "accounts": Account.objects.filter(user=user),
+        "budgets": Budget.objects.filter(user=user),
+        # Imported contributions are rebuilt from the transactions
+        "goal_contributions": GoalContribution.objects.filter(user=user, transaction__isnull=True),
+        "bills": Bill.objects.filter(user=user),
+        "transactions": Transaction.objects.filter(account__user=user),
+        "archived_transactions": ArchivedTransaction.objects.filter(account__user=user),
+        "rollups": TransactionRollup.objects.filter(account__user=user),
+    }
+
+
+def write_snapshot(user: User, file, include_password: bool = False) -> dict[str, int]:
+    """Write the user's data to ``file`` (path or binary file object); returns row counts"""
+    arrays = {}
+    counts = {}
+    for table, queryset in _querysets(user).items():
+        fields = [name for name, _kind in SCHEMA[table]]
+        rows = list(queryset.order_by("pk").values_list(*fields).iterator(chunk_size=DEFAULT_BATCH_SIZE))
+        counts[table] = len(rows)
+        arrays.update(_table_arrays(table, rows))
+
+    meta = {
+        "format": "finwise-snapshot",
+        "version": FORMAT_VERSION,
+        "created_at": datetime.now(dt_timezone.utc).isoformat(),
+        "user": {field: getattr(user, field) for field in USER_FIELDS},
+        "counts": counts,
+    }
+    if include_password:
+        meta["user"]["password"] = user.password
+    arrays["meta"] = np.frombuffer(json.dumps(meta).encode(), dtype=np.uint8)
+    np.savez_compressed(file, **arrays)
+    return counts
+
+
+# Restore
+
+def read_meta(arrays) -> dict:
+    if "meta" not in arrays:
+        raise SnapshotError("Not a FinWise snapshot (no meta entry)")
+    meta = json.loads(arrays["meta"].tobytes().decode())
+    if meta.get("format") != "finwise-snapshot":
+        raise SnapshotError("Not a FinWise snapshot")
+    if meta.get("version") not in SUPPORTED_VERSIONS:
+        raise SnapshotError(f"Snapshot version {meta.get('version')} is not supported (expected {FORMAT_VERSION})")
+    return meta
+
+
+def _remap(values: list, mapping: dict) -> list:
+    return [None if value is None else mapping[value] for value in values]
+
+
+def _insert_columns(model, columns: dict[str, list], batch_size: int) -> None:
+    """
+    INSERT column-wise data with one executemany per batch. For the large
+    tables this skips model instantiation and bulk_create's per-value field
+    preparation, which dominate restore time; values are adapted once per
+    column with the backend's own adapters instead.
+    """
+    connection = connections[router.db_for_write(model)]
+    ops, quote = connection.ops, connection.ops.quote_name
+    fields = [model._meta.get_field(name) for name in columns]
+
+    prepared = []
+    for field, values in zip(fields, columns.values()):
+        internal_type = field.get_internal_type()
+        if internal_type == "DateTimeField":
+            if settings.USE_TZ and connection.timezone_name != "UTC":
+                # Naive UTC values are only right as-is on a UTC connection
+                values = [value and value.replace(tzinfo=dt_timezone.utc) for value in values]
+            values = [ops.adapt_datetimefield_value(value) for value in values]
+        elif internal_type == "DecimalField":
+            values = [ops.adapt_decimalfield_value(value, field.max_digits, field.decimal_places) for value in values]
+        prepared.append(values)
+
+    sql = "INSERT INTO {} ({}) VALUES ({})".format(
+        quote(model._meta.db_table),
+        ", ".join(quote(field.column) for field in fields),
+        ", ".join(["%s"] * len(fields)),
+    )
+    rows = list(zip(*prepared))
+    with connection.cursor() as cursor:
+        for start in range(0, len(rows), batch_size):
+            cursor.executemany(sql, rows[start:start + batch_size])
+
+
+def restore_snapshot(file, user: User, batch_size: int = DEFAULT_BATCH_SIZE) -> dict[str, int]:
+    """
+    Bulk-load a snapshot into ``user``, who must have no accounts, budgets
+    or bills. Categories are matched by name and created when missing.
+    Returns row counts per table.
+    """
+    with np.load(file, allow_pickle=False) as arrays:
+        counts = read_meta(arrays)["counts"]
+        tables = {table: _table_columns(table, arrays, counts.get(table, 0)) for table in SCHEMA}
+
+    with db_transaction.atomic():
+        if Account.objects.filter(user=user).exists() or Budget.objects.filter(user=user).exists() \
+                or Bill.objects.filter(user=user).exists():
+            raise SnapshotError(f"User {user.username} already has data; restore into an empty user")
+
+        category_ids = {}
+        existing = dict(Category.objects.values_list("name", "id"))
+        for row in _rows(tables["categories"]):
+            old_id = row.pop("id")
+            if row["name"] not in existing:
+                existing[row["name"]] = Category.objects.create(**row).id
+            category_ids[old_id] = existing[row["name"]]
+
+        account_ids = {}
+        for row in _rows(tables["accounts"]):
+            old_id = row.pop("id")
+            row["bank_id"] = row["bank_id"] or None
+            account_ids[old_id] = Account.objects.create(user=user, **row).id
+
+        for table in ("budgets", "bills", "transactions", "archived_transactions", "rollups"):
+            columns = tables[table]
+            columns["category_id"] = _remap(columns["category_id"], category_ids)
+            if "account_id" in columns:
+                columns["account_id"] = _remap(columns["account_id"], account_ids)
+
+        budget_ids = tables["budgets"].pop("id")
+        budgets = Budget.objects.bulk_create(
+            [Budget(user=user, **row) for row in _rows(tables["budgets"])], batch_size=batch_size
+        )
+        goal_ids = {old_id: budget.id for old_id, budget in zip(budget_ids, budgets)}
+        contributions = tables["goal_contributions"]
+        contributions["goal_id"] = _remap(contributions["goal_id"], goal_ids)
+        GoalContribution.objects.bulk_create(
+            [GoalContribution(user=user, **row) for row in _rows(contributions)], batch_size=batch_size
+        )
+        Bill.objects.bulk_create(
+            [Bill(user=user, **row) for row in _rows(tables["bills"])], batch_size=batch_size
+        )
+        extend_calendar(Bill.objects.filter(user=user))
+        TransactionRollup.objects.bulk_create(
+            [TransactionRollup(**row) for row in _rows(tables["rollups"])], batch_size=batch_size
+        )
+        _insert_columns(Transaction, tables["transactions"], batch_size)
+        archived = tables["archived_transactions"]
+        archived["archived_at"] = [timezone.now()] * len(archived["fitid"])
+        _insert_columns(ArchivedTransaction, archived, batch_size)
+
+    bump_data_version(user.id)
+    refresh_stale_goals(user)
+    return {table: counts.get(table, 0) for table in SCHEMA}
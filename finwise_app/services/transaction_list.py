@@ -0,0 +1,136 @@
+"""
+Filtered, keyset-paginated transaction listing
+Pages are addressed by an opaque cursor over (posted_date, id) so deep pages
+cost the same as the first one and no COUNT(*) is ever issued
+"""
+from __future__ import annotations
+
+import base64
+import json
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+
+from django.contrib.auth.models import User
+from django.db.models import Q, QuerySet
+from django.utils import timezone
+
+from ..models import Transaction
+
+DEFAULT_PAGE_SIZE = 25
+MAX_PAGE_SIZE = 100
+
+
+class InvalidCursor(ValueError):
+    """Raised when a pagination cursor cannot be decoded"""
+
+
+@dataclass
+class TransactionFilters:
+    """Dashboard filters parsed from query parameters"""
+    account_filter: str = ''
+    category_filter: str = ''
+    days: int = 30
+    account_id: int | None = None
+    category_id: int | None = None
+    uncategorized: bool = False
+
+    @classmethod
+    def from_query(cls, params) -> "TransactionFilters":
+        filters = cls(
+            account_filter=params.get('account', ''),
+            category_filter=params.get('category', ''),
+        )
+
+        if filters.account_filter:
+            try:
+                filters.account_id = int(filters.account_filter)
+            except (ValueError, TypeError):
+                filters.account_filter = ''
+
+        if filters.category_filter:
+            if filters.category_filter == 'uncategorized':
+                filters.uncategorized = True
+            else:
+                try:
+                    filters.category_id = int(filters.category_filter)
+                except (ValueError, TypeError):
+                    filters.category_filter = ''
+
+        try:
+            filters.days = int(params.get('days', '30'))
+        except (ValueError, TypeError):
+            filters.days = 30
+
+        return filters
+
+    @property
+    def active(self) -> bool:
+        return bool(self.account_id or self.category_id or self.uncategorized or self.days != 30)
+
+
+def filter_transactions(user: User, filters: TransactionFilters) -> QuerySet:
+    """User's transactions with the dashboard's account/category/days filters applied"""
+    queryset = Transaction.objects.filter(account__user=user).select_related("account", "category")
+
+    if filters.account_id:
+        queryset = queryset.filter(account_id=filters.account_id)
+
+    if filters.days > 0:
+        cutoff_date = timezone.now() - timedelta(days=filters.days)
+        queryset = queryset.filter(posted_date__gte=cutoff_date)
+
+    if filters.uncategorized:
+        queryset = queryset.filter(category__isnull=True)
+    elif filters.category_id:
+        queryset = queryset.filter(category_id=filters.category_id)
+
+    return queryset
+
+
+def encode_cursor(txn: Transaction) -> str:
+    payload = json.dumps([txn.posted_date.isoformat(), txn.id], separators=(",", ":"))
+    return base64.urlsafe_b64encode(payload.encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> tuple[datetime, int]:
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        posted, pk = json.loads(base64.urlsafe_b64decode(padded.encode()).decode())
+        return datetime.fromisoformat(posted), int(pk)
+    except (ValueError, TypeError) as e:
+        raise InvalidCursor(f"Invalid cursor: {cursor!r}") from e
+
+
+def paginate(queryset: QuerySet, cursor: str | None = None, limit: int = DEFAULT_PAGE_SIZE) -> tuple[list[Transaction], str | None]:
+    """
+    Return one page of ``queryset`` newest first, plus the cursor for the next page.
+
+    Fetches ``limit + 1`` rows to detect whether another page exists.
+    """
+    limit = max(1, min(limit, MAX_PAGE_SIZE))
+    queryset = queryset.order_by("-posted_date", "-id")
+
+    if cursor:
+        posted, pk = decode_cursor(cursor)
+        queryset = queryset.filter(
+            Q(posted_date__lt=posted) | Q(posted_date=posted, id__lt=pk)
+        )
+
+    rows = list(queryset[:limit + 1])
+    has_more = len(rows) > limit
+    rows = rows[:limit]
+    next_cursor = encode_cursor(rows[-1]) if has_more else None
+    return rows, next_cursor
+
+
+def serialize_transaction(txn: Transaction) -> dict:
+    return {
+        'id': txn.id,
+        'posted_date': txn.posted_date.isoformat(),
+        'account': txn.account.name or txn.account.account_id,
+        'category': txn.category.name if txn.category else None,
+        'category_color': txn.category.color if txn.category else None,
+        'amount': float(txn.amount),
+        'name': txn.name,
+        'memo': txn.memo,
+    }
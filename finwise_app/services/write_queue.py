@@ -0,0 +1,98 @@
+"""
+Single-writer queue for SQLite
+SQLite allows one writer at a time. Bulk writes (imports, recategorization,
+cleanup) are handed to one writer thread per process, so requests in the
+same process queue in order instead of contending for the lock and failing
+with "database is locked"; with WAL enabled readers keep going meanwhile.
+Across processes the busy timeout and BEGIN IMMEDIATE handle contention.
+"""
+from __future__ import annotations
+
+import queue
+import threading
+import time
+from dataclasses import dataclass, field
+from typing import Any, Callable
+
+from django.conf import settings
+from django.db import close_old_connections, connection
+
+from ..metrics import DB_WRITE_DURATION, DB_WRITE_QUEUE_WAIT
+
+
+@dataclass
+class _Job:
+    fn: Callable[..., Any]
+    args: tuple
+    kwargs: dict
+    operation: str
+    enqueued: float = field(default_factory=time.perf_counter)
+    done: threading.Event = field(default_factory=threading.Event)
+    result: Any = None
+    error: BaseException | None = None
+
+
+class WriteQueue:
+    """Runs submitted callables one at a time on a dedicated daemon thread"""
+
+    def __init__(self):
+        self._jobs: "queue.Queue[_Job]" = queue.Queue()
+        self._thread: threading.Thread | None = None
+        self._lock = threading.Lock()
+
+    def _ensure_worker(self) -> None:
+        with self._lock:
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(target=self._work, name="finwise-db-writer", daemon=True)
+                self._thread.start()
+
+    def _work(self) -> None:
+        while True:
+            job = self._jobs.get()
+            DB_WRITE_QUEUE_WAIT.observe(time.perf_counter() - job.enqueued, operation=job.operation)
+            # Same connection hygiene as a request: drop broken or expired connections
+            close_old_connections()
+            try:
+                with DB_WRITE_DURATION.time(operation=job.operation):
+                    job.result = job.fn(*job.args, **job.kwargs)
+            except BaseException as exc:  # re-raised in the submitting thread
+                job.error = exc
+            finally:
+                close_old_connections()
+                job.done.set()
+
+    def in_writer_thread(self) -> bool:
+        return threading.current_thread() is self._thread
+
+    def run(self, fn: Callable[..., Any], *args, operation: str = "write", **kwargs) -> Any:
+        """
+        Run ``fn(*args, **kwargs)`` on the writer thread and return its result,
+        re-raising its exception. Runs inline when serialization is disabled,
+        when already on the writer thread, or when the caller is inside a
+        transaction (the writer's connection could not see its uncommitted rows).
+        """
+        if (
+            not getattr(settings, "SERIALIZE_DB_WRITES", False)
+            or self.in_writer_thread()
+            or connection.in_atomic_block
+        ):
+            return fn(*args, **kwargs)
+
+        self._ensure_worker()
+        job = _Job(fn, args, kwargs, operation)
+        self._jobs.put(job)
+        job.done.wait()
+        if job.error is not None:
+            raise job.error
+        return job.result
+
+    def pending(self) -> int:
+        return self._jobs.qsize()
+
+
+WRITE_QUEUE = WriteQueue()
+
+
+def serialized_write(fn: Callable[..., Any], *args, operation: str = "write", **kwargs) -> Any:
+    """Run a write through the process-wide writer queue"""
+    return WRITE_QUEUE.run(fn, *args, operation=operation, **kwargs)
@@ -24,23 +24,54 @@ class FinWiseCharts {
         });
     }
 
-    initializeCharts() {
+    async initializeCharts() {
+        const chartIds = [
+            'spendingByCategoryChart', 'spendingTrendChart', 'incomeVsExpensesChart',
+            'accountBalanceChart', 'budgetProgressChart'
+        ];
+        const present = chartIds.filter(id => document.getElementById(id));
+
+        // Pages with several charts fetch every widget in one request
+        let combined = null;
+        if (present.length > 1) {
+            try {
+                const response = await fetch('/api/dashboard/');
+                if (response.ok) {
+                    combined = await response.json();
+                }
+            } catch (error) {
+                console.error('Error loading combined dashboard data:', error);
+            }
+        }
+
         // Initialize all charts based on canvas elements present
         if (document.getElementById('spendingByCategoryChart')) {
-            this.loadSpendingByCategory();
+            this.loadSpendingByCategory(30, combined && combined.spending_by_category);
         }
         if (document.getElementById('spendingTrendChart')) {
-            this.loadSpendingTrend();
+            this.loadSpendingTrend(30, combined && combined.spending_trend);
         }
         if (document.getElementById('incomeVsExpensesChart')) {
-            this.loadIncomeVsExpenses();
+            this.loadIncomeVsExpenses(6, combined && combined.income_vs_expenses);
         }
         if (document.getElementById('accountBalanceChart')) {
-            this.loadAccountBalance();
+            this.loadAccountBalance(combined && combined.account_balance);
         }
         if (document.getElementById('budgetProgressChart')) {
-            this.loadBudgetProgress();
+            this.loadBudgetProgress(combined && combined.budgets);
+        }
+    }
+
+    async fetchJson(url, preloaded) {
+        // Use data from the combined endpoint when available
+        if (preloaded) {
+            return preloaded;
+        }
+        const response = await fetch(url);
+        if (!response.ok) {
+            throw new Error(`HTTP error! status: ${response.status}`);
         }
+        return response.json();
     }
 
     getChartDefaults() {
@@ -91,10 +122,9 @@ class FinWiseCharts {
         };
     }
 
-    async loadSpendingByCategory(days = 30) {
+    async loadSpendingByCategory(days = 30, preloaded = null) {
         try {
-            const response = await fetch(`/api/spending-by-category/?days=${days}`);
-            const data = await response.json();
+            const data = await this.fetchJson(`/api/spending-by-category/?days=${days}`, preloaded);
 
             const ctx = document.getElementById('spendingByCategoryChart');
             if (!ctx) return;
@@ -154,15 +184,9 @@ class FinWiseCharts {
         }
     }
 
-    async loadSpendingTrend(days = 30) {
+    async loadSpendingTrend(days = 30, preloaded = null) {
         try {
-            const response = await fetch(`/api/spending-trend/?days=${days}`);
-            
-            if (!response.ok) {
-                throw new Error(`HTTP error! status: ${response.status}`);
-            }
-            
-            const data = await response.json();
+            const data = await this.fetchJson(`/api/spending-trend/?days=${days}`, preloaded);
             console.log('Spending trend data:', data);
 
             const ctx = document.getElementById('spendingTrendChart');
@@ -175,8 +199,8 @@ class FinWiseCharts {
                 this.charts.spendingTrend.destroy();
             }
 
-            // Check if we have data
-            if (!data.dates || data.dates.length === 0) {
+            // Check if we have data (series are zero-filled, so look for any spending)
+            if (!data.dates || data.dates.length === 0 || !data.amounts.some(amount => amount > 0)) {
                 console.warn('No spending trend data available');
                 // Show empty state - preserve canvas for future reloads
                 const canvasParent = ctx.parentElement;
@@ -200,10 +224,11 @@ class FinWiseCharts {
                 emptyState.style.display = 'none';
             }
 
+            const label = this.trendLabel(data.bucket, data.downsample_factor);
             const chartData = {
                 labels: data.dates,
                 datasets: [{
-                    label: 'Daily Spending',
+                    label: label,
                     data: data.amounts,
                     borderColor: '#4dabf7',
                     backgroundColor: 'rgba(77, 171, 247, 0.1)',
@@ -222,6 +247,12 @@ class FinWiseCharts {
                         ...this.getChartDefaults().plugins,
                         legend: {
                             display: false
+                        },
+                        title: {
+                            // Only needed when points cover more than one bucket
+                            display: data.downsample_factor > 1,
+                            text: label,
+                            color: this.getChartDefaults().plugins.legend.labels.color
                         }
                     }
                 }
@@ -249,10 +280,18 @@ class FinWiseCharts {
         }
     }
 
-    async loadIncomeVsExpenses(months = 6) {
+    trendLabel(bucket = 'day', factor = 1) {
+        // Downsampled points are sums over `factor` buckets, so say how long each point is
+        const unit = { day: 'day', week: 'week', month: 'month' }[bucket] || 'day';
+        if (!factor || factor <= 1) {
+            return { day: 'Daily Spending', week: 'Weekly Spending', month: 'Monthly Spending' }[unit];
+        }
+        return `Spending per ${factor} ${unit}s`;
+    }
+
+    async loadIncomeVsExpenses(months = 6, preloaded = null) {
         try {
-            const response = await fetch(`/api/income-vs-expenses/?months=${months}`);
-            const data = await response.json();
+            const data = await this.fetchJson(`/api/income-vs-expenses/?months=${months}`, preloaded);
 
             const ctx = document.getElementById('incomeVsExpensesChart');
             if (!ctx) return;
@@ -304,10 +343,9 @@ class FinWiseCharts {
         }
     }
 
-    async loadAccountBalance() {
+    async loadAccountBalance(preloaded = null) {
         try {
-            const response = await fetch('/api/account-balance/');
-            const data = await response.json();
+            const data = await this.fetchJson('/api/account-balance/', preloaded);
 
             const ctx = document.getElementById('accountBalanceChart');
             if (!ctx) return;
@@ -363,10 +401,9 @@ class FinWiseCharts {
         }
     }
 
-    async loadBudgetProgress() {
+    async loadBudgetProgress(preloaded = null) {
         try {
-            const response = await fetch('/api/budgets/');
-            const data = await response.json();
+            const data = await this.fetchJson('/api/budgets/', preloaded);
 
             const ctx = document.getElementById('budgetProgressChart');
             if (!ctx) return;
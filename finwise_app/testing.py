@@ -0,0 +1,39 @@
+"""
+Test helpers for asserting views stay within their declared query budgets
+"""
+from __future__ import annotations
+
+from django.urls import resolve
+
+from .instrumentation import QueryBudget, collect_request_stats, get_view_budget
+
+
+class QueryBudgetMixin:
+    """
+    Mixin for ``django.test.TestCase`` subclasses.
+
+        class DashboardTests(QueryBudgetMixin, TestCase):
+            def test_dashboard_budget(self):
+                self.client.force_login(self.user)
+                self.assertWithinQueryBudget("/dashboard/")
+    """
+
+    def assertWithinQueryBudget(self, url, budget: QueryBudget | None = None, method="get", client=None, **kwargs):
+        """
+        Request ``url`` and fail if it exceeds ``budget``, defaulting to the
+        budget declared on the view with ``@query_budget``. Returns the response.
+        """
+        client = client or self.client
+        if budget is None:
+            budget = get_view_budget(resolve(url.split("?")[0]).func)
+            if budget is None:
+                self.fail(f"View for {url} declares no query budget")
+
+        with collect_request_stats(keep_sql=True) as stats:
+            response = getattr(client, method)(url, **kwargs)
+
+        violations = stats.violations(budget)
+        if violations:
+            queries = "\n".join(f"  {i}. {sql}" for i, sql in enumerate(stats.queries, start=1))
+            self.fail(f"{url} exceeded its query budget: {'; '.join(violations)}\nQueries:\n{queries}")
+        return response
@@ -0,0 +1,113 @@
+"""
+Query budgets of the pages and APIs declared with ``@query_budget``
+The fixture has several accounts, categories, budgets, goals and bills, so
+a per-row query pattern (N+1) pushes a view past its budget.
+"""
+from datetime import timedelta
+from decimal import Decimal
+
+from django.contrib.auth.models import User
+from django.test import TestCase
+from django.utils import timezone
+
+from finwise_app.models import Account, Bill, Budget, Category, Transaction
+from finwise_app.services.analytics import clear_frames
+from finwise_app.services.bill_calendar import extend_calendar
+from finwise_app.testing import QueryBudgetMixin
+
+ROWS_PER_TABLE = 6
+
+
+class QueryBudgetTests(QueryBudgetMixin, TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user("budgeted", password="pw")
+        today = timezone.localdate()
+        month = today.replace(day=1)
+        now = timezone.now()
+
+        categories = [
+            Category.objects.create(name=f"Category {i}", keywords=f"merchant{i}") for i in range(ROWS_PER_TABLE)
+        ]
+        accounts = [
+            Account.objects.create(user=cls.user, type="BANK", account_id=f"acct-{i}", name=f"Account {i}")
+            for i in range(ROWS_PER_TABLE)
+        ]
+        Transaction.objects.bulk_create([
+            Transaction(
+                account=accounts[i % len(accounts)],
+                category=categories[i % len(categories)],
+                fitid=f"fit-{i}",
+                posted_date=now - timedelta(days=i % 40),
+                amount=Decimal("250.00") if i % 5 == 0 else Decimal("-12.50"),
+                name=f"merchant{i % len(categories)}",
+                is_categorized=True,
+            )
+            for i in range(120)
+        ])
+        for i, category in enumerate(categories):
+            Budget.objects.create(
+                user=cls.user,
+                category=category,
+                month=month,
+                amount=Decimal("100.00"),
+                budget_type="GOAL" if i % 2 else "BUDGET",
+                target_date=today + timedelta(days=90) if i % 2 else None,
+            )
+        for i in range(ROWS_PER_TABLE):
+            Bill.objects.create(
+                user=cls.user,
+                name=f"Bill {i}",
+                amount=Decimal("20.00"),
+                due_date=today + timedelta(days=i * 3 - 6),
+                frequency="MONTHLY" if i % 2 else "WEEKLY",
+                category=categories[i],
+            )
+        extend_calendar(Bill.objects.filter(user=cls.user), today=today)
+
+    def setUp(self):
+        clear_frames()
+        self.client.force_login(self.user)
+
+    def test_dashboard(self):
+        self.assertWithinQueryBudget("/dashboard/")
+
+    def test_dashboard_api(self):
+        self.assertWithinQueryBudget("/api/dashboard/")
+
+    def test_chart_apis(self):
+        for url in (
+            "/api/budgets/",
+            "/api/spending-by-category/?days=30",
+            "/api/spending-trend/?days=90",
+            "/api/income-vs-expenses/?months=6",
+            "/api/account-balance/",
+        ):
+            with self.subTest(url=url):
+                clear_frames()
+                self.assertWithinQueryBudget(url)
+
+    def test_transactions_api(self):
+        self.assertWithinQueryBudget("/api/transactions/")
+        self.assertWithinQueryBudget(f"/api/transactions/?category={Category.objects.first().id}")
+
+    def test_budgets(self):
+        for budget_type in ("BUDGET", "GOAL", "ALL"):
+            with self.subTest(type=budget_type):
+                self.assertWithinQueryBudget(f"/budgets/?type={budget_type}")
+
+    def test_categories(self):
+        self.assertWithinQueryBudget("/categories/")
+
+    def test_bills(self):
+        self.assertWithinQueryBudget("/bills/")
+        self.assertWithinQueryBudget("/bills/?status=OVERDUE")
+
+    def test_bill_reminders(self):
+        self.assertWithinQueryBudget("/bills/reminders/")
+
+    def test_cash_needs_api(self):
+        self.assertWithinQueryBudget("/api/cash-needs/?days=90")
+
+    def test_account(self):
+        self.assertWithinQueryBudget("/account/")
@@ -8,6 +8,7 @@ urlpatterns = [
     path('dashboard/', views.dashboard, name='dashboard'),
     path('import/', views.import_transactions, name='import_transactions'),
     path('logout/', views.logout_view, name='logout'),
+    path('metrics', views.metrics_view, name='metrics'),
     # Account recovery
     path('recover/', views.recover_request, name='recover_request'),
     path('recover/verify/', views.recover_verify, name='recover_verify'),
@@ -18,13 +19,17 @@ urlpatterns = [
     path('budgets/create/', views.create_budget, name='create_budget'),
     path('budgets/<int:budget_id>/update/', views.update_budget, name='update_budget'),
     path('budgets/<int:budget_id>/delete/', views.delete_budget, name='delete_budget'),
+    path('budgets/<int:budget_id>/contribute/', views.add_goal_contribution, name='add_goal_contribution'),
     
     # API endpoints for charts
+    path('api/dashboard/', views.dashboard_api, name='dashboard_api'),
     path('api/budgets/', views.budget_api_data, name='budget_api_data'),
     path('api/spending-by-category/', views.spending_by_category_api, name='spending_by_category_api'),
     path('api/spending-trend/', views.spending_trend_api, name='spending_trend_api'),
     path('api/income-vs-expenses/', views.income_vs_expenses_api, name='income_vs_expenses_api'),
     path('api/account-balance/', views.account_balance_api, name='account_balance_api'),
+    path('api/transactions/', views.transactions_api, name='transactions_api'),
+    path('api/cash-needs/', views.cash_needs_api, name='cash_needs_api'),
     
     # Category management
     path('categories/', views.categories_view, name='categories'),
@@ -38,6 +43,10 @@ urlpatterns = [
     path('account/delete-account/', views.delete_account, name='delete_account'),
     path('account/export-data/', views.export_data, name='export_data'),
     path('account/clean-data/', views.clean_data, name='clean_data'),
+    path('account/deletion/<str:job_id>/', views.deletion_status_api, name='deletion_status'),
+    path('account/exports/', views.request_export, name='request_export'),
+    path('account/exports/<int:job_id>/', views.export_job_status, name='export_job_status'),
+    path('account/exports/<int:job_id>/download/', views.download_export, name='download_export'),
     
     # Bill management
     path('bills/', views.bills, name='bills'),
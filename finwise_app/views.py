@@ -1,13 +1,15 @@
 from django.shortcuts import render, redirect, get_object_or_404
+from django.urls import reverse
 from django.contrib import messages
 from django.views.decorators.http import require_http_methods
 from django.contrib.auth.decorators import login_required
 from django.contrib.auth import authenticate, login, logout
 from django.contrib.auth.models import User
 from django.core.files.uploadedfile import UploadedFile
-from django.core.mail import send_mail
-from django.http import JsonResponse
-from django.db.models import Sum, Q
+from django.core.handlers.asgi import ASGIRequest
+from django.conf import settings
+from django.http import FileResponse, Http404, HttpResponse, JsonResponse
+from django.db.models import Count, F, Sum, Q
 from django.utils import timezone
 from datetime import datetime, date, timedelta
 from decimal import Decimal
@@ -15,7 +17,49 @@ from decimal import Decimal
 from .services.ofx_importer import import_ofx
 from .services.ofx_importer_alternative import import_ofx_alternative
 from .services.categorization_service import TransactionCategorizationService, create_default_categories
-from .models import Account, Transaction, Category, Budget, Bill, AccountRecoveryCode
+from .services.dashboard_service import (
+    DEFAULT_TREND_POINTS,
+    MAX_TREND_POINTS,
+    abuild_dashboard_data,
+    abudgets_payload,
+    aspending_by_category_payload,
+    aspending_trend_payload,
+    aincome_vs_expenses_payload,
+    aaccount_balance_payload,
+)
+from .services.analytics import BUCKETS, bump_data_version
+from .services.write_queue import serialized_write
+from .services.batching import iter_batches
+from .services.archive import archive_transactions, delete_old_transactions
+from .services.duplicates import delete_duplicates
+from .services.export import FORMATS as EXPORT_FORMATS, export_response
+from .services.export_jobs import artifact_path, request_export as queue_export
+from .services.notifications import notify, send_now
+from .services.bills import bill_summary, filter_status, overdue_q
+from .services.bill_calendar import cash_needs, sync_bill
+from .services.reminders import due_reminders
+from .services.budget_alerts import forget_budget_amounts
+from .services.goals import active_goals, add_contribution, refresh_goals, refresh_stale_goals_safely, weekly_plan
+from .services.bulk_delete import (
+    BACKGROUND_THRESHOLD,
+    count_steps,
+    deletion_status,
+    queue_deletion,
+    run_steps,
+    user_data_steps,
+)
+from .db_router import read_from_replica
+from .instrumentation import query_budget
+from .metrics import REGISTRY
+from .services.transaction_list import (
+    DEFAULT_PAGE_SIZE,
+    InvalidCursor,
+    TransactionFilters,
+    filter_transactions,
+    paginate,
+    serialize_transaction,
+)
+from .models import Account, Transaction, TransactionRollup, Category, Budget, Bill, AccountRecoveryCode, ExportJob
 
 def home(request):
     return render(request, 'finwise_app/home.html')
@@ -58,22 +102,22 @@ def recover_request(request):
                     code=code,
                     expires_at=expires_at,
                 )
-                try:
-                    send_mail(
-                        subject="Your FinWise recovery code",
-                        message=(
-                            f"Hi {user.username},\n\n"
-                            f"Your account recovery code is: {code}\n"
-                            f"This code will expire in 15 minutes.\n\n"
-                            f"If you didn't request this, you can ignore this email."
-                        ),
-                        from_email=None,  # uses DEFAULT_FROM_EMAIL
-                        recipient_list=[email],
-                        fail_silently=True,
-                    )
-                except Exception:
-                    # We silently ignore email errors for security; user gets a generic message below
-                    pass
+                # Sent right away since the user is waiting for it; a failed
+                # send stays queued and the notification worker retries it
+                notification = notify(
+                    'email',
+                    email,
+                    subject="Your FinWise recovery code",
+                    body=(
+                        f"Hi {user.username},\n\n"
+                        f"Your account recovery code is: {code}\n"
+                        f"This code will expire in 15 minutes.\n\n"
+                        f"If you didn't request this, you can ignore this email."
+                    ),
+                    user=user,
+                    kind='recovery',
+                )
+                send_now(notification)
 
         messages.success(
             request,
@@ -216,35 +260,12 @@ def register_view(request):
 
     return render(request, 'finwise_app/register.html')
 
+@query_budget(max_queries=12, max_ms=1000)
 @login_required
+@read_from_replica
 def dashboard(request):
     # Get filter parameters
-    account_filter = request.GET.get('account', '')
-    category_filter = request.GET.get('category', '')
-    days_filter = request.GET.get('days', '30')  # Default to 30 days
-
-    selected_account_id: int | None = None
-    if account_filter:
-        try:
-            selected_account_id = int(account_filter)
-        except (ValueError, TypeError):
-            account_filter = ''
-
-    selected_category_id: int | None = None
-    selected_uncategorized = False
-    if category_filter:
-        if category_filter == 'uncategorized':
-            selected_uncategorized = True
-        else:
-            try:
-                selected_category_id = int(category_filter)
-            except (ValueError, TypeError):
-                category_filter = ''
-    
-    try:
-        days_filter = int(days_filter)
-    except (ValueError, TypeError):
-        days_filter = 30
+    filters = TransactionFilters.from_query(request.GET)
     
     # Get all accounts for current user
     accounts = Account.objects.filter(user=request.user).order_by("name", "account_id")[:20]
@@ -256,40 +277,22 @@ def dashboard(request):
         .order_by("name")
     )
     
-    # Get transactions with optional filters
-    recent_query = Transaction.objects.filter(account__user=request.user).select_related("account", "category")
-    
-    # Apply account filter if specified
-    if selected_account_id:
-        recent_query = recent_query.filter(account_id=selected_account_id)
-    
-    # Apply date filter if specified
-    if days_filter > 0:
-        cutoff_date = timezone.now() - timedelta(days=days_filter)
-        recent_query = recent_query.filter(posted_date__gte=cutoff_date)
-
-    # Apply category filter if specified
-    if selected_uncategorized:
-        recent_query = recent_query.filter(category__isnull=True)
-    elif selected_category_id:
-        recent_query = recent_query.filter(category_id=selected_category_id)
-    
-    recent = recent_query.order_by("-posted_date")[:10]
-    filters_active = bool(
-        selected_account_id or selected_category_id or selected_uncategorized or days_filter != 30
-    )
+    # Get first page of transactions with optional filters
+    recent, next_cursor = paginate(filter_transactions(request.user, filters), limit=10)
     
     # Get budget summary for current month if user is logged in
     budget_summary = None
     if request.user.is_authenticated:
         current_month = date.today().replace(day=1)
-        budgets = Budget.objects.filter(user=request.user, month=current_month).select_related('category')
+        budgets = Budget.prefetch_spent_amounts(
+            Budget.objects.filter(user=request.user, month=current_month).select_related('category')
+        )
         
-        if budgets.exists():
+        if budgets:
             budget_summary = {
                 'total_budgeted': sum(b.amount for b in budgets),
                 'total_spent': sum(b.get_spent_amount() for b in budgets),
-                'budgets_count': budgets.count(),
+                'budgets_count': len(budgets),
                 'over_threshold_count': sum(1 for b in budgets if b.is_over_threshold())
             }
     
@@ -297,14 +300,15 @@ def dashboard(request):
         "accounts": accounts, 
         "categories": categories,
         "recent": recent,
+        "next_cursor": next_cursor,
         "budget_summary": budget_summary,
-        "account_filter": account_filter,
-        "selected_account_id": selected_account_id,
-        "category_filter": category_filter,
-        "selected_category_id": selected_category_id,
-        "selected_uncategorized": selected_uncategorized,
-        "days_filter": days_filter,
-        "filters_active": filters_active,
+        "account_filter": filters.account_filter,
+        "selected_account_id": filters.account_id,
+        "category_filter": filters.category_filter,
+        "selected_category_id": filters.category_id,
+        "selected_uncategorized": filters.uncategorized,
+        "days_filter": filters.days,
+        "filters_active": filters.active,
     })
 
 
@@ -356,6 +360,7 @@ def logout_view(request):
     return redirect("home")
 
 
+@query_budget(max_queries=10, max_ms=2000)
 @login_required
 def budgets_view(request):
     """FR05: Display user's budgets and goals with create/edit/delete functionality"""
@@ -377,13 +382,22 @@ def budgets_view(request):
         page_title = "Spending Limits"
     elif budget_type_filter == 'GOAL':
         budgets = []
-        goals = budgets_query.filter(budget_type='GOAL')
+        goals = active_goals(request.user)
         page_title = "Savings Goals"
     else:  # ALL
         budgets = budgets_query.filter(budget_type='BUDGET')
-        goals = budgets_query.filter(budget_type='GOAL')
+        goals = active_goals(request.user)
         page_title = "Budgets & Goals"
     
+    # Spent amounts for all rows in one grouped query
+    budgets = Budget.prefetch_spent_amounts(budgets)
+    
+    # Goal progress is cached on the goals and kept current by the writes
+    goals = list(goals)
+    plan = weekly_plan(goals)
+    for goal in goals:
+        goal.plan = plan[goal.id]
+    
     # Get all categories for creating new budgets
     categories = Category.objects.filter(is_active=True).order_by('name')
     
@@ -395,9 +409,9 @@ def budgets_view(request):
     
     # Calculate summary stats for goals (savings targets)
     total_goal_amount = sum(g.amount for g in goals)
-    total_goal_saved = sum(g.get_spent_amount() for g in goals)  # Reusing method for savings
-    total_goal_progress = total_goal_saved if total_goal_amount > 0 else 0
+    total_goal_saved = sum(max(g.saved_amount, 0) for g in goals)
     goal_completion_pct = (total_goal_saved / total_goal_amount * 100) if total_goal_amount > 0 else 0
+    total_weekly_needed = sum(g.plan['weekly_needed'] or 0 for g in goals)
     
     context = {
         'budgets': budgets,
@@ -411,6 +425,8 @@ def budgets_view(request):
         'total_goal_amount': total_goal_amount,
         'total_goal_saved': total_goal_saved,
         'goal_completion_pct': goal_completion_pct,
+        'total_weekly_needed': total_weekly_needed,
+        'today': timezone.localdate(),
         'budget_type_filter': budget_type_filter,
         'page_title': page_title,
     }
@@ -426,6 +442,7 @@ def create_budget(request):
     amount = request.POST.get('amount')
     month_str = request.POST.get('month')  # Format: YYYY-MM
     budget_type = request.POST.get('budget_type', 'BUDGET')  # BUDGET or GOAL
+    target_date_str = request.POST.get('target_date')  # Goals only: YYYY-MM-DD
     
     try:
         category = get_object_or_404(Category, id=category_id, is_active=True)
@@ -442,18 +459,22 @@ def create_budget(request):
         else:
             budget_month = date.today().replace(day=1)
         
+        target_date = None
+        if budget_type == 'GOAL' and target_date_str:
+            target_date = datetime.strptime(target_date_str, '%Y-%m-%d').date()
+            if target_date < budget_month:
+                messages.error(request, "Target date must not be before the goal's month.")
+                return redirect('budgets')
+        
         # Create or update budget/goal
         budget, created = Budget.objects.update_or_create(
             user=request.user,
             category=category,
             month=budget_month,
-            defaults={'amount': amount, 'budget_type': budget_type}
+            defaults={'amount': amount, 'budget_type': budget_type, 'target_date': target_date}
         )
-        
-        # Update budget_type if it changed
-        if not created and budget.budget_type != budget_type:
-            budget.budget_type = budget_type
-            budget.save()
+        forget_budget_amounts(request.user.id)
+        _sync_goals(request.user, budget)
         
         type_name = "Budget" if budget_type == "BUDGET" else "Goal"
         action = "created" if created else "updated"
@@ -481,7 +502,19 @@ def update_budget(request, budget_id):
             return redirect('budgets')
         
         budget.amount = amount
+        window_changed = False
+        if budget.budget_type == 'GOAL' and 'target_date' in request.POST:
+            target_date_str = request.POST.get('target_date')
+            target_date = datetime.strptime(target_date_str, '%Y-%m-%d').date() if target_date_str else None
+            if target_date is not None and target_date < budget.month:
+                messages.error(request, "Target date must not be before the goal's month.")
+                return redirect('budgets')
+            window_changed = target_date != budget.target_date
+            budget.target_date = target_date
         budget.save()
+        forget_budget_amounts(request.user.id)
+        if window_changed:
+            _sync_goals(request.user, budget)
         
         messages.success(request, f"Budget for {budget.category.name} updated successfully.")
         
@@ -502,6 +535,8 @@ def delete_budget(request, budget_id):
     
     try:
         budget.delete()
+        forget_budget_amounts(request.user.id)
+        _sync_goals(request.user, budget)
         messages.success(request, f"Budget for {category_name} deleted successfully.")
     except Exception as e:
         messages.error(request, f"Error deleting budget: {e}")
@@ -509,191 +544,182 @@ def delete_budget(request, budget_id):
     return redirect('budgets')
 
 
+def _sync_goals(user, budget):
+    """Recompute the goals of a budget's category after a goal is added, changed or removed"""
+    if budget.pk is not None and budget.budget_type != 'GOAL':
+        # Rows that stopped being goals keep no contributions
+        budget.contributions.all().delete()
+    goals = list(Budget.objects.filter(user=user, budget_type='GOAL', category_id=budget.category_id))
+    if goals:
+        serialized_write(refresh_goals, user, goals, operation="goal_progress")
+
+
 @login_required
-def budget_api_data(request):
-    """API endpoint for budget data (for charts/widgets)"""
-    current_month = date.today().replace(day=1)
-    
-    budgets = Budget.objects.filter(
-        user=request.user, 
-        month=current_month
-    ).select_related('category')
+@require_http_methods(["POST"])
+def add_goal_contribution(request, budget_id):
+    """Record money put toward (or taken from) a savings goal outside the imported accounts"""
+    goal = get_object_or_404(Budget, id=budget_id, user=request.user, budget_type='GOAL')
     
-    budget_data = []
-    for budget in budgets:
-        spent = budget.get_spent_amount()
-        percentage = budget.get_percentage_used()
+    try:
+        amount = Decimal(request.POST.get('amount'))
+        if amount == 0:
+            messages.error(request, "Contribution amount must not be zero.")
+            return redirect(f"{reverse('budgets')}?type=GOAL")
+        contributed_on_str = request.POST.get('contributed_on')
+        contributed_on = (
+            datetime.strptime(contributed_on_str, '%Y-%m-%d').date() if contributed_on_str else timezone.localdate()
+        )
+        note = request.POST.get('note', '').strip()[:255]
         
-        budget_data.append({
-            'id': budget.id,
-            'category': budget.category.name,
-            'category_color': budget.category.color,
-            'budgeted': float(budget.amount),
-            'spent': float(spent),
-            'remaining': float(budget.amount - spent),
-            'percentage': round(percentage, 1),
-            'over_threshold': budget.is_over_threshold(),
-        })
+        serialized_write(add_contribution, goal, amount, contributed_on, note, operation="goal_contribution")
+        messages.success(request, f"Contribution of ${amount:.2f} added to {goal.category.name}.")
+        
+    except (ValueError, TypeError, ArithmeticError):
+        messages.error(request, "Invalid contribution entered.")
     
-    return JsonResponse({
-        'budgets': budget_data,
-        'month': current_month.strftime('%B %Y')
-    })
+    return redirect(f"{reverse('budgets')}?type=GOAL")
+
 
+# The chart APIs are async views: under ASGI they wait on the database
+# without holding a worker thread, and their independent queries run
+# concurrently (see the a*_payload functions in dashboard_service).
+# Read-only analytics views read from the replica when one is configured.
 
+@query_budget(max_queries=8, max_ms=1000)
 @login_required
-def spending_by_category_api(request):
+@read_from_replica
+async def budget_api_data(request):
+    """API endpoint for budget data (for charts/widgets)"""
+    user = await request.auser()
+    return JsonResponse(await abudgets_payload(user))
+
+
+@query_budget(max_queries=8, max_ms=1000)
+@login_required
+@read_from_replica
+async def spending_by_category_api(request):
     """API endpoint for spending by category chart"""
     days = int(request.GET.get('days', 30))
-    cutoff_date = timezone.now() - timedelta(days=days)
-    
-    # Get spending by category
-    category_spending = Transaction.objects.filter(
-        account__user=request.user,
-        posted_date__gte=cutoff_date,
-        amount__lt=0,  # Only expenses
-        category__isnull=False
-    ).values(
-        'category__name', 'category__color'
-    ).annotate(
-        total=Sum('amount')
-    ).order_by('total')
-    
-    categories = []
-    amounts = []
-    colors = []
-    
-    for item in category_spending:
-        categories.append(item['category__name'])
-        amounts.append(float(abs(item['total'])))
-        colors.append(item['category__color'] or '#6366F1')
-    
-    return JsonResponse({
-        'categories': categories,
-        'amounts': amounts,
-        'colors': colors,
-        'period_days': days
-    })
+    user = await request.auser()
+    return JsonResponse(await aspending_by_category_payload(user, days))
 
 
+@query_budget(max_queries=8, max_ms=1000)
 @login_required
-def spending_trend_api(request):
-    """API endpoint for spending trend over time"""
-    from django.db.models.functions import TruncDate
-    
+@read_from_replica
+async def spending_trend_api(request):
+    """API endpoint for spending trend over time, bucketed by day, week or month"""
     days = int(request.GET.get('days', 30))
-    cutoff_date = timezone.now() - timedelta(days=days)
-    
-    # Get daily spending using TruncDate (database-agnostic)
-    daily_spending = Transaction.objects.filter(
-        account__user=request.user,
-        posted_date__gte=cutoff_date,
-        amount__lt=0  # Only expenses
-    ).annotate(
-        day=TruncDate('posted_date')
-    ).values('day').annotate(
-        total=Sum('amount')
-    ).order_by('day')
-    
-    dates = []
-    amounts = []
-    
-    for item in daily_spending:
-        if item['day']:  # Check if day is not None
-            dates.append(item['day'].strftime('%Y-%m-%d'))
-            amounts.append(float(abs(item['total'] or 0)))
-    
-    return JsonResponse({
-        'dates': dates,
-        'amounts': amounts,
-        'period_days': days
-    })
+    bucket = request.GET.get('bucket', 'day')
+    if bucket not in BUCKETS:
+        return JsonResponse({'error': f"bucket must be one of: {', '.join(BUCKETS)}"}, status=400)
 
+    try:
+        max_points = int(request.GET.get('max_points', DEFAULT_TREND_POINTS))
+    except (ValueError, TypeError):
+        return JsonResponse({'error': 'max_points must be an integer'}, status=400)
+    max_points = max(2, min(max_points, MAX_TREND_POINTS))
+
+    user = await request.auser()
+    return JsonResponse(await aspending_trend_payload(user, days, bucket=bucket, max_points=max_points))
 
+
+@query_budget(max_queries=8, max_ms=1000)
 @login_required
-def income_vs_expenses_api(request):
+@read_from_replica
+async def income_vs_expenses_api(request):
     """API endpoint for income vs expenses comparison"""
     months = int(request.GET.get('months', 6))
-    
-    # Calculate the starting month
-    current_date = date.today()
-    start_date = (current_date - timedelta(days=30 * months)).replace(day=1)
-    
-    # Get monthly income and expenses
-    monthly_data = []
-    current = start_date
-    
-    while current <= current_date:
-        # Calculate next month
-        if current.month == 12:
-            next_month = date(current.year + 1, 1, 1)
-        else:
-            next_month = date(current.year, current.month + 1, 1)
-        
-        # Get transactions for this month
-        income = Transaction.objects.filter(
-            account__user=request.user,
-            posted_date__gte=datetime.combine(current, datetime.min.time()),
-            posted_date__lt=datetime.combine(next_month, datetime.min.time()),
-            amount__gt=0
-        ).aggregate(total=Sum('amount'))['total'] or Decimal('0')
-        
-        expenses = Transaction.objects.filter(
-            account__user=request.user,
-            posted_date__gte=datetime.combine(current, datetime.min.time()),
-            posted_date__lt=datetime.combine(next_month, datetime.min.time()),
-            amount__lt=0
-        ).aggregate(total=Sum('amount'))['total'] or Decimal('0')
-        
-        monthly_data.append({
-            'month': current.strftime('%b %Y'),
-            'income': float(income),
-            'expenses': float(abs(expenses))
-        })
-        
-        current = next_month
-    
-    return JsonResponse({
-        'data': monthly_data
-    })
+    user = await request.auser()
+    return JsonResponse(await aincome_vs_expenses_payload(user, months))
 
 
+@query_budget(max_queries=8, max_ms=1000)
 @login_required
-def account_balance_api(request):
+@read_from_replica
+async def account_balance_api(request):
     """API endpoint for account balance distribution"""
-    accounts = Account.objects.filter(user=request.user)
-    
-    account_data = []
-    for account in accounts:
-        balance = account.transactions.aggregate(total=Sum('amount'))['total'] or Decimal('0')
-        if balance != 0:  # Only include accounts with balance
-            account_data.append({
-                'name': account.name or account.account_id,
-                'balance': float(balance),
-                'type': account.get_type_display()
-            })
-    
+    user = await request.auser()
+    return JsonResponse(await aaccount_balance_payload(user))
+
+
+@query_budget(max_queries=8, max_ms=1000)
+@login_required
+@read_from_replica
+async def dashboard_api(request):
+    """API endpoint returning every dashboard widget in a single response"""
+    try:
+        category_days = int(request.GET.get('days', 30))
+        trend_days = int(request.GET.get('trend_days', 30))
+        months = int(request.GET.get('months', 6))
+    except (ValueError, TypeError):
+        return JsonResponse({'error': 'days, trend_days and months must be integers'}, status=400)
+
+    user = await request.auser()
+    return JsonResponse(await abuild_dashboard_data(
+        user,
+        category_days=category_days,
+        trend_days=trend_days,
+        months=months,
+    ))
+
+
+@query_budget(max_queries=6, max_ms=1000)
+@login_required
+@read_from_replica
+def transactions_api(request):
+    """API endpoint listing transactions with keyset pagination and dashboard filters"""
+    filters = TransactionFilters.from_query(request.GET)
+    try:
+        limit = int(request.GET.get('limit', DEFAULT_PAGE_SIZE))
+    except (ValueError, TypeError):
+        limit = DEFAULT_PAGE_SIZE
+
+    try:
+        rows, next_cursor = paginate(
+            filter_transactions(request.user, filters),
+            cursor=request.GET.get('cursor') or None,
+            limit=limit,
+        )
+    except InvalidCursor as e:
+        return JsonResponse({'error': str(e)}, status=400)
+
     return JsonResponse({
-        'accounts': account_data
+        'transactions': [serialize_transaction(t) for t in rows],
+        'next_cursor': next_cursor,
     })
 
 
+def metrics_view(request):
+    """Prometheus text-format metrics, restricted to METRICS_ALLOWED_IPS"""
+    if request.META.get('REMOTE_ADDR') not in settings.METRICS_ALLOWED_IPS:
+        return HttpResponse(status=403)
+    return HttpResponse(REGISTRY.render(), content_type='text/plain; version=0.0.4; charset=utf-8')
+
+
+@query_budget(max_queries=8, max_ms=1000)
 @login_required
-@login_required
+@read_from_replica
 def categories_view(request):
     """Manage spending categories - show spending per category for current user"""
     categories = Category.objects.filter(is_active=True).order_by('name')
     
-    # Get transaction counts and spending per category for current user
+    # Get transaction counts and spending per category for current user in one grouped query
+    month_start = date.today().replace(day=1)
     category_stats = {}
-    for category in categories:
-        user_transactions = category.transactions.filter(account__user=request.user)
-        category_stats[category.id] = {
-            'transaction_count': user_transactions.count(),
-            'total_amount': user_transactions.aggregate(total=Sum('amount'))['total'] or Decimal('0'),
-            'recent_amount': user_transactions.filter(
-                posted_date__gte=date.today().replace(day=1)
-            ).aggregate(total=Sum('amount'))['total'] or Decimal('0')
+    rows = Transaction.objects.filter(
+        account__user=request.user,
+        category__isnull=False,
+    ).values('category_id').annotate(
+        transaction_count=Count('id'),
+        total_amount=Sum('amount'),
+        recent_amount=Sum('amount', filter=Q(posted_date__gte=month_start)),
+    ).order_by()
+    for row in rows:
+        category_stats[row['category_id']] = {
+            'transaction_count': row['transaction_count'],
+            'total_amount': row['total_amount'] or Decimal('0'),
+            'recent_amount': row['recent_amount'] or Decimal('0'),
         }
     
     return render(request, 'finwise_app/categories.html', {
@@ -707,19 +733,27 @@ def categories_view(request):
 def recategorize_transactions(request):
     """Manually trigger re-categorization of uncategorized transactions"""
     try:
-        # Find uncategorized transactions
+        # Find the user's uncategorized transactions
         uncategorized = Transaction.objects.filter(
-            Q(category__isnull=True) | Q(is_categorized=False)
+            Q(category__isnull=True) | Q(is_categorized=False), account__user=request.user
         )
         
         if not uncategorized.exists():
             messages.info(request, "No uncategorized transactions found.")
             return redirect('dashboard')
         
-        # Run categorization
+        # Run categorization a batch at a time instead of loading every row
         categorizer = TransactionCategorizationService()
-        stats = categorizer.categorize_bulk_transactions(list(uncategorized))
+        stats = {'total': 0, 'categorized': 0}
+        for batch in iter_batches(uncategorized):
+            batch_stats = serialized_write(
+                categorizer.categorize_bulk_transactions, batch, operation="recategorize"
+            )
+            stats['total'] += batch_stats['total']
+            stats['categorized'] += batch_stats['categorized']
         
+        bump_data_version(request.user.id)
+        serialized_write(refresh_stale_goals_safely, request.user, operation="goal_progress")
         messages.success(
             request, 
             f"Recategorized {stats['categorized']} of {stats['total']} transactions."
@@ -749,6 +783,7 @@ def setup_default_categories(request):
 
 # Account Management Views
 
+@query_budget(max_queries=10, max_ms=1000)
 @login_required
 def account_view(request):
     """Display user account details and data management options"""
@@ -756,23 +791,37 @@ def account_view(request):
     
     # Get account statistics
     user_accounts = Account.objects.filter(user=user)
-    total_transactions = Transaction.objects.filter(account__user=user).count()
     total_categories = Category.objects.filter(is_active=True).count()  # Categories are shared
     total_budgets = Budget.objects.filter(user=user).count()
     
+    # Balance and count per account from recent transactions plus archived rollups
+    totals = {
+        row['account_id']: [row['total'] or Decimal('0'), row['count']]
+        for row in Transaction.objects.filter(account__user=user).values('account_id').annotate(
+            total=Sum('amount'), count=Count('id')
+        ).order_by()
+    }
+    for row in TransactionRollup.objects.filter(account__user=user).values('account_id').annotate(
+        total=Sum(F('income') + F('expenses')), count=Sum('count')
+    ).order_by():
+        entry = totals.setdefault(row['account_id'], [Decimal('0'), 0])
+        entry[0] += row['total'] or Decimal('0')
+        entry[1] += row['count'] or 0
+    
     # Get account balance summary
     account_balances = []
     total_balance = Decimal('0')
+    total_transactions = 0
     
     for account in user_accounts:
-        # Calculate balance from transactions
-        balance = account.transactions.aggregate(total=Sum('amount'))['total'] or Decimal('0')
+        balance, transaction_count = totals.get(account.id, (Decimal('0'), 0))
         total_balance += balance
+        total_transactions += transaction_count
         
         account_balances.append({
             'account': account,
             'balance': balance,
-            'transaction_count': account.transactions.count()
+            'transaction_count': transaction_count
         })
     
     # Recent activity (last 5 transactions)
@@ -793,11 +842,20 @@ def account_view(request):
         'account_age_days': account_age_days,
     }
     
+    # Background deletion started from clean_data, while it is still running
+    deletion_job = request.session.get('deletion_job')
+    if deletion_job and (deletion_status(deletion_job) or {}).get('state') not in ('pending', 'running'):
+        del request.session['deletion_job']
+        deletion_job = None
+    
     context = {
         'user': user,
         'account_balances': account_balances,
         'data_stats': data_stats,
         'recent_transactions': recent_transactions,
+        'deletion_job': deletion_job,
+        'export_jobs': user.export_jobs.all()[:5],
+        'export_formats': ExportJob.FORMAT_CHOICES,
     }
     
     return render(request, 'finwise_app/account.html', context)
@@ -883,14 +941,23 @@ def delete_account(request):
         return redirect('account')
     
     try:
-        # Delete all user data
-        Account.objects.filter(user=user).delete()
-        Category.objects.filter(user=user).delete()
-        Budget.objects.filter(user=user).delete()
-        # Transactions are deleted via cascade when accounts are deleted
+        # Delete the bulky data in chunks first; the user row then cascades
+        # to accounts and the remaining small tables. Categories are shared.
+        steps = user_data_steps(user, transactions=True, budgets=True, bills=True)
+        total = count_steps(steps)
         
-        # Delete user account
-        user.delete()
+        if total >= BACKGROUND_THRESHOLD:
+            # Lock the account now; the deletion worker finishes the job
+            user.is_active = False
+            user.save(update_fields=['is_active'])
+            queue_deletion(user, transactions=True, budgets=True, bills=True, delete_user=True)
+            logout(request)
+            messages.info(request, f"Your account is being deleted ({total} items). This can take a few minutes.")
+            return redirect('home')
+        
+        run_steps(steps)
+        serialized_write(user.delete, operation="delete_account")
+        logout(request)
         
         messages.success(request, "Account deleted successfully.")
         return redirect('home')
@@ -900,81 +967,79 @@ def delete_account(request):
         return redirect('account')
 
 
+@require_http_methods(["GET"])
+def deletion_status_api(request, job_id):
+    """Progress of a background deletion; job tokens are unguessable and carry no user data"""
+    status = deletion_status(job_id)
+    if status is None:
+        return JsonResponse({'error': 'Unknown or expired deletion job'}, status=404)
+    return JsonResponse(status)
+
+
 @login_required
 def export_data(request):
-    """Export all user data as JSON"""
-    import json
-    from django.http import HttpResponse
-    from django.core import serializers
-    
+    """Stream all user data as JSON (default), NDJSON or CSV (?format=)"""
     user = request.user
+    fmt = request.GET.get('format', 'json')
     
-    try:
-        # Collect all user data
-        user_data = {
-            'user_info': {
-                'username': user.username,
-                'email': user.email,
-                'first_name': user.first_name,
-                'last_name': user.last_name,
-                'date_joined': user.date_joined.isoformat(),
-            },
-            'accounts': [],
-            'categories': [],
-            'budgets': [],
-            'transactions': [],
-        }
-        
-        # Export accounts
-        for account in Account.objects.filter(user=user):
-            user_data['accounts'].append({
-                'name': account.name,
-                'account_type': account.account_type,
-                'balance': str(account.balance) if account.balance else '0',
-                'created_at': account.created_at.isoformat() if hasattr(account, 'created_at') else None,
-            })
-        
-        # Export categories
-        for category in Category.objects.filter(user=user):
-            user_data['categories'].append({
-                'name': category.name,
-                'description': category.description,
-                'created_at': category.created_at.isoformat() if hasattr(category, 'created_at') else None,
-            })
-        
-        # Export budgets
-        for budget in Budget.objects.filter(user=user):
-            user_data['budgets'].append({
-                'category': budget.category.name if budget.category else None,
-                'amount': str(budget.amount),
-                'period': budget.period,
-                'created_at': budget.created_at.isoformat() if hasattr(budget, 'created_at') else None,
-            })
-        
-        # Export transactions
-        for transaction in Transaction.objects.filter(account__user=user):
-            user_data['transactions'].append({
-                'date': transaction.date.isoformat(),
-                'description': transaction.description,
-                'amount': str(transaction.amount),
-                'account': transaction.account.name,
-                'category': transaction.category.name if transaction.category else None,
-                'transaction_type': transaction.transaction_type,
-                'categorized_at': transaction.categorized_at.isoformat() if transaction.categorized_at else None,
-            })
-        
-        # Create response
-        response = HttpResponse(
-            json.dumps(user_data, indent=2, ensure_ascii=False),
-            content_type='application/json'
-        )
-        response['Content-Disposition'] = f'attachment; filename="finwise_data_{user.username}_{datetime.now().strftime("%Y%m%d_%H%M%S")}.json"'
-        
-        return response
-        
-    except Exception as e:
-        messages.error(request, f"Error exporting data: {e}")
+    if fmt not in EXPORT_FORMATS:
+        messages.error(request, f"Unknown export format '{fmt}'.")
         return redirect('account')
+    
+    filename = f"finwise_data_{user.username}_{datetime.now().strftime('%Y%m%d_%H%M%S')}"
+    return export_response(user, fmt, filename, asynchronous=isinstance(request, ASGIRequest))
+
+
+def _export_job_payload(job):
+    payload = {
+        'id': job.id,
+        'format': job.format,
+        'status': job.status,
+        'status_display': job.get_status_display(),
+        'size_bytes': job.size_bytes,
+        'created_at': job.created_at.isoformat(),
+        'finished_at': job.finished_at.isoformat() if job.finished_at else None,
+        'error': job.error,
+    }
+    if job.status == 'DONE':
+        payload['download_url'] = reverse('download_export', args=[job.id])
+    return payload
+
+
+@login_required
+@require_http_methods(["POST"])
+def request_export(request):
+    """Queue a background export; the account page shows its progress and download link"""
+    fmt = request.POST.get('format', 'json')
+    if fmt not in dict(ExportJob.FORMAT_CHOICES):
+        messages.error(request, f"Unknown export format '{fmt}'.")
+        return redirect('account')
+    
+    job, created = queue_export(request.user, fmt)
+    if created:
+        messages.success(request, "Your export has been queued. The download link will appear below when it is ready.")
+    else:
+        messages.info(request, "You already have an export in progress; it will appear below when it is ready.")
+    return redirect('account')
+
+
+@login_required
+def export_job_status(request, job_id):
+    """Status of one of the user's background exports"""
+    job = ExportJob.objects.filter(id=job_id, user=request.user).first()
+    if job is None:
+        return JsonResponse({'error': 'Export not found'}, status=404)
+    return JsonResponse(_export_job_payload(job))
+
+
+@login_required
+def download_export(request, job_id):
+    """Download a finished background export"""
+    job = get_object_or_404(ExportJob, id=job_id, user=request.user, status='DONE')
+    path = artifact_path(job)
+    if not job.file_name or not path.exists():
+        raise Http404("Export file is no longer available")
+    return FileResponse(open(path, 'rb'), as_attachment=True, filename=job.download_name())
 
 
 @login_required
@@ -987,76 +1052,59 @@ def clean_data(request):
     clean_categories = request.POST.get('clean_categories') == 'on'
     clean_budgets = request.POST.get('clean_budgets') == 'on'
     clean_duplicates = request.POST.get('clean_duplicates') == 'on'
+    clean_fuzzy_duplicates = request.POST.get('clean_fuzzy_duplicates') == 'on'
     clean_old_data = request.POST.get('clean_old_data') == 'on'
+    archive_old_data = request.POST.get('archive_old_data') == 'on'
     clean_bills = request.POST.get('clean_bills') == 'on'
     
-    try:
-        deleted_count = 0
+    def clean() -> tuple[int, int]:
+        deleted_count = archived_count = 0
         
-        if clean_duplicates:
-            # Remove duplicate transactions based on FITID
-            from django.db.models import Count
-            # Find accounts with duplicate FITIDs
-            duplicates = Transaction.objects.filter(
-                account__user=user
-            ).values(
-                'fitid', 'account'
-            ).annotate(
-                count=Count('id')
-            ).filter(count__gt=1)
-            
-            for duplicate in duplicates:
-                # Keep the first transaction, delete the rest
-                transactions = Transaction.objects.filter(
-                    account__user=user,
-                    fitid=duplicate['fitid'],
-                    account_id=duplicate['account']
-                ).order_by('id')
-                
-                if transactions.count() > 1:
-                    transactions_to_delete = transactions[1:]
-                    count = transactions_to_delete.count()
-                    transactions_to_delete.delete()
-                    deleted_count += count
+        if clean_duplicates or clean_fuzzy_duplicates:
+            # Same FITID; same day, amount and name in another import only
+            # when asked for, since identical purchases on one day are real
+            deleted_count += sum(delete_duplicates(user, fuzzy=clean_fuzzy_duplicates).values())
         
         if clean_old_data:
-            # Remove transactions older than 2 years
-            from datetime import timedelta
-            from django.utils import timezone
-            cutoff_date = timezone.now() - timedelta(days=730)
-            old_transactions = Transaction.objects.filter(
-                account__user=user,
-                posted_date__lt=cutoff_date
-            )
-            deleted_count += old_transactions.count()
-            old_transactions.delete()
+            # Remove transactions older than 2 years, archived ones included
+            deleted_count += delete_old_transactions(user)
+        elif archive_old_data:
+            # Move transactions older than 2 years to the archive; their
+            # monthly totals stay in balances, charts and budgets
+            archived_count = archive_transactions(user)
         
-        if clean_transactions:
-            # Remove all transactions
-            transactions = Transaction.objects.filter(account__user=user)
-            deleted_count += transactions.count()
-            transactions.delete()
+        return deleted_count, archived_count
+
+    # Removing all transactions (archived ones included), budgets or bills
+    # runs in chunks, in the background when there is a lot of it
+    steps = user_data_steps(user, transactions=clean_transactions, budgets=clean_budgets, bills=clean_bills)
+
+    try:
+        deleted_count, archived_count = serialized_write(clean, operation="clean_data")
         
+        total = count_steps(steps)
+        if total >= BACKGROUND_THRESHOLD:
+            request.session['deletion_job'] = queue_deletion(
+                user, transactions=clean_transactions, budgets=clean_budgets, bills=clean_bills
+            ).token
+            messages.info(request, f"Deleting {total} items in the background; progress is shown below.")
+        else:
+            deleted_count += run_steps(steps)
+        if clean_budgets:
+            forget_budget_amounts(user.id)
+
         if clean_categories:
             # Categories are global and shared - don't delete them
             # Instead, just inform the user that categories cannot be cleaned
             messages.info(request, "Categories are shared system-wide and cannot be deleted individually.")
         
-        if clean_budgets:
-            # Remove all budgets
-            budgets = Budget.objects.filter(user=user)
-            deleted_count += budgets.count()
-            budgets.delete()
-        
-        if clean_bills:
-            # Remove all bills
-            bills = Bill.objects.filter(user=user)
-            deleted_count += bills.count()
-            bills.delete()
-        
         if deleted_count > 0:
+            bump_data_version(user.id)
+            serialized_write(refresh_stale_goals_safely, user, operation="goal_progress")
             messages.success(request, f"Successfully cleaned {deleted_count} items from your data.")
-        else:
+        if archived_count > 0:
+            messages.success(request, f"Archived {archived_count} transactions older than 2 years.")
+        if not deleted_count and not archived_count and total < BACKGROUND_THRESHOLD:
             messages.info(request, "No items were cleaned based on your selections.")
             
     except Exception as e:
@@ -1067,6 +1115,7 @@ def clean_data(request):
 
 # Bill Management Views
 
+@query_budget(max_queries=10, max_ms=1000)
 @login_required
 def bills(request):
     """Display all bills for the current user"""
@@ -1079,34 +1128,24 @@ def bills(request):
     # Base queryset
     bills_queryset = Bill.objects.filter(user=user)
     
-    # Apply filters
+    # Apply filters; overdue includes pending bills the sweeper has not reached yet
+    today = timezone.now().date()
     if status_filter:
-        bills_queryset = bills_queryset.filter(status=status_filter)
+        bills_queryset = filter_status(bills_queryset, status_filter, today)
     if frequency_filter:
         bills_queryset = bills_queryset.filter(frequency=frequency_filter)
     
-    # Update overdue bills
-    from django.utils import timezone
-    overdue_bills = bills_queryset.filter(
-        due_date__lt=timezone.now().date(),
-        status='PENDING'
-    )
-    overdue_bills.update(status='OVERDUE')
-    
     # Get bills with additional context
-    bills_list = bills_queryset.order_by('due_date', 'name')
+    bills_list = bills_queryset.select_related('category').order_by('due_date', 'name')
     
     # Calculate summary statistics
-    total_pending = bills_queryset.filter(status='PENDING').count()
-    total_overdue = bills_queryset.filter(status='OVERDUE').count()
-    total_paid_this_month = bills_queryset.filter(
-        status='PAID',
-        last_paid_date__month=timezone.now().month,
-        last_paid_date__year=timezone.now().year
-    ).count()
+    summary = bill_summary(bills_queryset, today)
+    
+    # Bills inside their reminder window
+    bills_needing_reminders = due_reminders(bills_queryset, today)
     
-    # Get bills needing reminders
-    bills_needing_reminders = [bill for bill in bills_list if bill.needs_reminder()]
+    # Payments due over the next 30 days (and overdue ones), from the precomputed calendar
+    upcoming_payments = cash_needs(user, 30, today)
     
     context = {
         'bills': bills_list,
@@ -1114,10 +1153,11 @@ def bills(request):
         'frequency_filter': frequency_filter,
         'bill_status_choices': Bill.STATUS_CHOICES,
         'bill_frequency_choices': Bill.FREQUENCY_CHOICES,
-        'total_pending': total_pending,
-        'total_overdue': total_overdue,
-        'total_paid_this_month': total_paid_this_month,
+        'total_pending': summary['total_pending'],
+        'total_overdue': summary['total_overdue'],
+        'total_paid_this_month': summary['total_paid_this_month'],
         'bills_needing_reminders': bills_needing_reminders,
+        'upcoming_payments': upcoming_payments,
     }
     
     return render(request, 'finwise_app/bills.html', context)
@@ -1164,6 +1204,7 @@ def add_bill(request):
                 reminder_days=reminder_days,
                 reminder_enabled=reminder_enabled,
             )
+            sync_bill(bill)
             
             messages.success(request, f'Bill "{bill.name}" has been added successfully.')
             return redirect('bills')
@@ -1191,6 +1232,8 @@ def edit_bill(request, bill_id):
     
     if request.method == 'POST':
         try:
+            previous_reminder = (bill.due_date, bill.reminder_days)
+            
             # Update bill data
             bill.name = request.POST.get('name', '').strip()
             bill.description = request.POST.get('description', '').strip()
@@ -1207,6 +1250,15 @@ def edit_bill(request, bill_id):
             else:
                 bill.category = None
             
+            # A new due date or reminder window gets a new reminder
+            if (bill.due_date, bill.reminder_days) != previous_reminder:
+                bill.reminder_sent_at = None
+            # A new due date starts a new series
+            if bill.due_date != previous_reminder[0]:
+                bill.series_day = None
+            if bill.status == 'OVERDUE' and bill.due_date >= timezone.now().date():
+                bill.status = 'PENDING'
+            
             # Validation
             if not bill.name:
                 messages.error(request, 'Bill name is required.')
@@ -1217,6 +1269,7 @@ def edit_bill(request, bill_id):
                 return redirect('edit_bill', bill_id=bill.id)
             
             bill.save()
+            sync_bill(bill)
             messages.success(request, f'Bill "{bill.name}" has been updated successfully.')
             return redirect('bills')
             
@@ -1267,7 +1320,10 @@ def mark_bill_paid(request, bill_id):
             from django.utils import timezone
             paid_date = timezone.now().date()
         
-        bill.mark_as_paid(paid_date)
+        next_bill = bill.mark_as_paid(paid_date)
+        sync_bill(bill)
+        if next_bill:
+            sync_bill(next_bill)
         messages.success(request, f'Bill "{bill.name}" has been marked as paid.')
     except Exception as e:
         messages.error(request, f'Error marking bill as paid: {e}')
@@ -1285,6 +1341,7 @@ def mark_bill_pending(request, bill_id):
         bill.status = 'PENDING'
         bill.last_paid_date = None
         bill.save()
+        sync_bill(bill)
         messages.success(request, f'Bill "{bill.name}" has been marked as pending.')
     except Exception as e:
         messages.error(request, f'Error updating bill status: {e}')
@@ -1292,22 +1349,39 @@ def mark_bill_pending(request, bill_id):
     return redirect('bills')
 
 
+@query_budget(max_queries=8, max_ms=1000)
 @login_required
 def bill_reminders(request):
     """Show bills that need reminders"""
     user = request.user
     
-    # Get bills needing reminders
-    bills = Bill.objects.filter(user=user, status='PENDING')
-    bills_needing_reminders = [bill for bill in bills if bill.needs_reminder()]
+    today = timezone.now().date()
+    
+    # Bills inside their reminder window
+    bills_needing_reminders = due_reminders(Bill.objects.filter(user=user), today)
     
-    # Get overdue bills
-    from django.utils import timezone
-    overdue_bills = bills.filter(due_date__lt=timezone.now().date())
+    # Get overdue bills, whether or not the sweeper has marked them yet
+    overdue_bills = Bill.objects.filter(overdue_q(today), user=user).select_related('category')
     
     context = {
         'bills_needing_reminders': bills_needing_reminders,
         'overdue_bills': overdue_bills,
     }
     
-    return render(request, 'finwise_app/bill_reminders.html', context)
\ No newline at end of file
+    return render(request, 'finwise_app/bill_reminders.html', context)
+
+
+@query_budget(max_queries=6, max_ms=1000)
+@login_required
+@read_from_replica
+def cash_needs_api(request):
+    """API endpoint for money needed for bills over the next ?days= days (default 90)"""
+    try:
+        days = int(request.GET.get('days', 90))
+    except (ValueError, TypeError):
+        return JsonResponse({'error': 'days must be an integer'}, status=400)
+    if not 1 <= days <= settings.BILL_CALENDAR_HORIZON_DAYS:
+        return JsonResponse(
+            {'error': f'days must be between 1 and {settings.BILL_CALENDAR_HORIZON_DAYS}'}, status=400
+        )
+    return JsonResponse(cash_needs(request.user, days))
\ No newline at end of file
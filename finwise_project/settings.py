@@ -42,11 +42,13 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    'finwise_app.middleware.QueryInstrumentationMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
     'django.contrib.auth.middleware.AuthenticationMiddleware',
+    'finwise_app.middleware.ReplicaStickinessMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
 ]
@@ -81,6 +83,103 @@ DATABASES = {
     }
 }
 
+# SQLite production profile (FINWISE_DB_PROFILE=sqlite-production)
+# WAL lets readers run while a write is in progress, synchronous=NORMAL is
+# durable across application crashes in WAL mode, mmap and a 64 MB page cache
+# keep hot pages in memory, busy_timeout waits for the write lock instead of
+# failing with "database is locked", and BEGIN IMMEDIATE takes the write lock
+# when a transaction starts rather than failing on lock upgrade mid-way
+DB_PROFILE = os.getenv('FINWISE_DB_PROFILE', 'default')
+SQLITE_PRODUCTION_PRAGMAS = {
+    'journal_mode': 'WAL',
+    'synchronous': 'NORMAL',
+    'mmap_size': int(os.getenv('FINWISE_SQLITE_MMAP_SIZE', str(256 * 1024 * 1024))),
+    'cache_size': int(os.getenv('FINWISE_SQLITE_CACHE_SIZE', '-65536')),  # negative = KiB
+    'busy_timeout': int(os.getenv('FINWISE_SQLITE_BUSY_TIMEOUT_MS', '10000')),
+    'temp_store': 'MEMORY',
+}
+if DB_PROFILE == 'sqlite-production':
+    DATABASES['default']['OPTIONS'] = {
+        'init_command': ';'.join(f'PRAGMA {name}={value}' for name, value in SQLITE_PRODUCTION_PRAGMAS.items()),
+        'transaction_mode': 'IMMEDIATE',
+        'timeout': SQLITE_PRODUCTION_PRAGMAS['busy_timeout'] / 1000,
+    }
+
+# PostgreSQL profile (FINWISE_DB_PROFILE=postgres); needs psycopg 3, plus
+# psycopg[pool] for the default pooled mode. See docs/postgres.md
+#   FINWISE_PG_POOL=pool        psycopg connection pool per process (default)
+#   FINWISE_PG_POOL=persistent  one connection per thread kept for CONN_MAX_AGE,
+#                               health-checked before reuse
+#   FINWISE_PG_POOL=none        connect and disconnect on every request
+PG_POOL_MODE = os.getenv('FINWISE_PG_POOL', 'pool')
+if DB_PROFILE == 'postgres':
+    DATABASES['default'] = {
+        'ENGINE': 'django.db.backends.postgresql',
+        'NAME': os.getenv('FINWISE_PG_NAME', 'finwise'),
+        'USER': os.getenv('FINWISE_PG_USER', 'finwise'),
+        'PASSWORD': os.getenv('FINWISE_PG_PASSWORD', ''),
+        'HOST': os.getenv('FINWISE_PG_HOST', 'localhost'),
+        'PORT': os.getenv('FINWISE_PG_PORT', '5432'),
+        # .iterator() uses server-side cursors; they must be disabled behind a
+        # transaction-pooling pgbouncer
+        'DISABLE_SERVER_SIDE_CURSORS': os.getenv('FINWISE_PG_DISABLE_SERVER_SIDE_CURSORS', 'false').lower() == 'true',
+    }
+    if PG_POOL_MODE == 'pool':
+        DATABASES['default']['OPTIONS'] = {
+            'pool': {
+                'min_size': int(os.getenv('FINWISE_PG_POOL_MIN_SIZE', '2')),
+                'max_size': int(os.getenv('FINWISE_PG_POOL_MAX_SIZE', '10')),
+                'timeout': float(os.getenv('FINWISE_PG_POOL_TIMEOUT', '10')),
+            },
+        }
+    elif PG_POOL_MODE == 'persistent':
+        DATABASES['default']['CONN_MAX_AGE'] = int(os.getenv('FINWISE_PG_CONN_MAX_AGE', '60'))
+        DATABASES['default']['CONN_HEALTH_CHECKS'] = True
+
+# Read replica (optional)
+# Set FINWISE_REPLICA_DB to the replica's database NAME (a second SQLite file,
+# or a second database on the Postgres server) to route the analytics views'
+# reads there; `manage.py sync_replica` refreshes a SQLite stand-in
+REPLICA_DB_NAME = os.getenv('FINWISE_REPLICA_DB', '')
+REPLICA_STICKY_SECONDS = int(os.getenv('FINWISE_REPLICA_STICKY_SECONDS', '30'))
+if REPLICA_DB_NAME:
+    DATABASES['replica'] = {
+        **DATABASES['default'],
+        'NAME': REPLICA_DB_NAME,
+        'TEST': {'MIRROR': 'default'},
+    }
+    if DATABASES['replica']['ENGINE'] == 'django.db.backends.sqlite3':
+        replica_options = dict(DATABASES['replica'].get('OPTIONS', {}))
+        # Refuse writes that were routed to the replica by mistake
+        replica_options['init_command'] = ';'.join(
+            filter(None, [replica_options.get('init_command', ''), 'PRAGMA query_only=ON'])
+        )
+        replica_options.pop('transaction_mode', None)
+        DATABASES['replica']['OPTIONS'] = replica_options
+    DATABASE_ROUTERS = ['finwise_app.db_router.ReadReplicaRouter']
+
+# Cache
+# Per-process local memory unless configured. Replica stickiness, cached
+# budget amounts and job progress hints live here, so deployments with more
+# than one worker process should use a shared backend, e.g.
+#   FINWISE_CACHE_BACKEND=django.core.cache.backends.redis.RedisCache
+#   FINWISE_CACHE_LOCATION=redis://127.0.0.1:6379/1
+# User data versions (finwise_app.services.analytics) are kept in the
+# database and stay consistent across workers either way
+CACHES = {
+    'default': {
+        'BACKEND': os.getenv('FINWISE_CACHE_BACKEND', 'django.core.cache.backends.locmem.LocMemCache'),
+        'LOCATION': os.getenv('FINWISE_CACHE_LOCATION', ''),
+    }
+}
+
+# Run importer, recategorization and cleanup writes on one writer thread per
+# process (finwise_app.services.write_queue); on by default with the SQLite
+# production profile
+SERIALIZE_DB_WRITES = os.getenv(
+    'FINWISE_SERIALIZE_DB_WRITES', 'true' if DB_PROFILE == 'sqlite-production' else 'false'
+).lower() == 'true'
+
 
 # Password validation
 # https://docs.djangoproject.com/en/5.2/ref/settings/#auth-password-validators
@@ -136,3 +235,83 @@ EMAIL_USE_TLS = os.getenv('EMAIL_USE_TLS', 'true').lower() == 'true'
 EMAIL_HOST_USER = os.getenv('EMAIL_HOST_USER', '')
 EMAIL_HOST_PASSWORD = os.getenv('EMAIL_HOST_PASSWORD', '')
 DEFAULT_FROM_EMAIL = os.getenv('DEFAULT_FROM_EMAIL', 'no-reply@finwise.local')
+
+# Metrics
+# Set FINWISE_METRICS_DIR to a directory shared by all worker processes so
+# /metrics reports values aggregated across them; empty keeps them per-process.
+# Live workers rewrite their file every few seconds; files older than
+# METRICS_STALE_SECONDS belong to exited workers and are deleted
+METRICS_DIR = os.getenv('FINWISE_METRICS_DIR', '')
+METRICS_STALE_SECONDS = int(os.getenv('FINWISE_METRICS_STALE_SECONDS', '60'))
+METRICS_ALLOWED_IPS = [ip.strip() for ip in os.getenv('FINWISE_METRICS_ALLOWED_IPS', '127.0.0.1,::1').split(',') if ip.strip()]
+
+# Background exports (finwise_app.services.export_jobs)
+# Artifacts are written by `manage.py run_export_worker` and deleted after
+# the retention period; EXPORT_MAX_CONCURRENT caps running exports across
+# all workers so they cannot take over the database from interactive requests
+EXPORT_ROOT = Path(os.getenv('FINWISE_EXPORT_ROOT', BASE_DIR / 'exports'))
+EXPORT_RETENTION_HOURS = int(os.getenv('FINWISE_EXPORT_RETENTION_HOURS', '24'))
+EXPORT_MAX_CONCURRENT = int(os.getenv('FINWISE_EXPORT_MAX_CONCURRENT', '2'))
+EXPORT_JOB_TIMEOUT_MINUTES = int(os.getenv('FINWISE_EXPORT_JOB_TIMEOUT_MINUTES', '60'))
+
+# Background deletions (finwise_app.services.bulk_delete)
+# Large deletions are run by `manage.py run_deletion_worker`; a running job
+# without progress for this long is queued again so another worker resumes it
+DELETION_JOB_TIMEOUT_MINUTES = int(os.getenv('FINWISE_DELETION_JOB_TIMEOUT_MINUTES', '10'))
+
+# Recurring bill calendar (finwise_app.services.bill_calendar)
+# Active bills are expanded this many days ahead; `manage.py extend_bill_calendar`
+# should run daily. Keep it above the longest window the cash-needs API serves
+BILL_CALENDAR_HORIZON_DAYS = int(os.getenv('FINWISE_BILL_CALENDAR_HORIZON_DAYS', '120'))
+
+# Budget alerts (finwise_app.services.budget_alerts): percentages of a spending
+# budget that trigger a notification when an import crosses them
+BUDGET_ALERT_THRESHOLDS = tuple(
+    int(value) for value in os.getenv('FINWISE_BUDGET_ALERT_THRESHOLDS', '80,100').split(',') if value.strip()
+)
+
+# Notification outbox (finwise_app.services.notifications)
+# Messages are queued in the database and delivered by
+# `manage.py run_notification_worker`, batched per channel; without a running
+# worker only recovery codes (sent by the request itself) go out. Each channel maps
+# to a transport: EmailTransport (follows EMAIL_BACKEND, one connection per
+# batch), ConsoleTransport, FileTransport ('path') or HttpTransport ('url'),
+# e.g. the local stub from `manage.py run_push_stub`
+NOTIFICATION_PUSH_URL = os.getenv('FINWISE_PUSH_URL', '')
+NOTIFICATION_TRANSPORTS = {
+    'email': {'BACKEND': 'finwise_app.services.notifications.EmailTransport'},
+    'push': (
+        {'BACKEND': 'finwise_app.services.notifications.HttpTransport', 'OPTIONS': {'url': NOTIFICATION_PUSH_URL}}
+        if NOTIFICATION_PUSH_URL else
+        {'BACKEND': 'finwise_app.services.notifications.ConsoleTransport'}
+    ),
+}
+NOTIFICATION_BATCH_SIZE = int(os.getenv('FINWISE_NOTIFICATION_BATCH_SIZE', '100'))
+NOTIFICATION_MAX_ATTEMPTS = int(os.getenv('FINWISE_NOTIFICATION_MAX_ATTEMPTS', '6'))
+NOTIFICATION_RETRY_SECONDS = int(os.getenv('FINWISE_NOTIFICATION_RETRY_SECONDS', '30'))  # doubles per attempt
+NOTIFICATION_RETENTION_DAYS = int(os.getenv('FINWISE_NOTIFICATION_RETENTION_DAYS', '30'))
+
+# Logging
+# Per-request query/latency lines from QueryInstrumentationMiddleware go to the
+# 'finwise_app.performance' logger as JSON at DEBUG level when DEBUG is off
+# (FINWISE_PERFORMANCE_LOG_LEVEL=DEBUG shows them); budget overruns are warnings
+LOGGING = {
+    'version': 1,
+    'disable_existing_loggers': False,
+    'handlers': {
+        'console': {
+            'class': 'logging.StreamHandler',
+        },
+    },
+    'loggers': {
+        'finwise_app': {
+            'handlers': ['console'],
+            'level': os.getenv('FINWISE_LOG_LEVEL', 'INFO'),
+        },
+        'finwise_app.performance': {
+            'handlers': ['console'],
+            'level': os.getenv('FINWISE_PERFORMANCE_LOG_LEVEL', 'INFO'),
+            'propagate': False,
+        },
+    },
+}